@@ -1,16 +1,50 @@
 """
-ASGI config for myproject project.
+ASGI config for a_game project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP requests go to Django; WebSocket connections to /ws/auctions/<id>/
+receive live bids for that auction. With AUCTION_SCHEDULER enabled the
+server also runs auction lots on timers for as long as it is up.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
+import asyncio
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "myproject.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "a_game.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from game.auction_stream import AuctionSocket  # noqa: E402  (needs the app registry)
+from game.lot_scheduler import LotScheduler  # noqa: E402
+
+websocket_application = AuctionSocket()
+
+
+async def lifespan(scope, receive, send):
+    scheduler = None
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            if settings.AUCTION_SCHEDULER:
+                scheduler = asyncio.create_task(LotScheduler().run())
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if scheduler is not None:
+                scheduler.cancel()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        await websocket_application(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await lifespan(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -112,3 +112,18 @@ REST_FRAMEWORK = {
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
+
+# Match finalization
+# When enabled, ratings and achievements for completed matches are written to
+# the outbox and applied by `python manage.py process_outbox`
+DEFER_MATCH_PROCESSING = config('DEFER_MATCH_PROCESSING', default=True, cast=bool)
+
+# Live auction events
+# 'local' fans WebSocket events out within one server process; use 'postgres'
+# (LISTEN/NOTIFY) when several ASGI workers serve the same auctions
+AUCTION_BROKER = config('AUCTION_BROKER', default='local')
+
+# Run auction lots on timers inside the ASGI server (with the local broker,
+# scheduler events only reach sockets served by the same process). Otherwise
+# run `python manage.py run_auctions` alongside the server, with AUCTION_BROKER=postgres.
+AUCTION_SCHEDULER = config('AUCTION_SCHEDULER', default=False, cast=bool)
@@ -0,0 +1,82 @@
+# achievement_tracker.py - Detect match achievements from the ball stream
+
+from typing import Dict, Iterable, Optional
+
+
+class AchievementTracker:
+    """
+    Watch balls as they are bowled and note centuries, five-wicket hauls
+    and hat-tricks the moment they happen.
+
+    State is a few counters per player (runs, wickets, consecutive wicket
+    deliveries), so the tracker can be checkpointed with the engine. Awards
+    are collected as plain dicts and written by AchievementSystem at match
+    end.
+    """
+
+    CENTURY_RUNS = 100
+    FIVE_WICKETS = 5
+    HAT_TRICK_WICKETS = 3
+    EXTRAS = ('WD', 'NB')  # Not legal deliveries; they neither extend nor break a hat-trick
+    NOT_BOWLER_WICKETS = ('RUN_OUT',)  # Count for the bowler's figures, not for hat-tricks
+
+    def __init__(self, state: Optional[Dict] = None):
+        self.runs = {}
+        self.wickets = {}
+        self.streaks = {}
+        self.awards = []
+        if state:
+            self.restore(state)
+
+    def record_ball(self, bowler_id: int, batsman_id: int, outcome: str,
+                    runs_off_bat: int, is_wicket: bool, dismissal_type: Optional[str] = None):
+        """Update counters for one ball and note any achievement it completes"""
+        if runs_off_bat:
+            before = self.runs.get(batsman_id, 0)
+            self.runs[batsman_id] = before + runs_off_bat
+            if before < self.CENTURY_RUNS <= self.runs[batsman_id]:
+                self.awards.append({'type': 'CENTURY', 'player_id': batsman_id})
+
+        if is_wicket:
+            self.wickets[bowler_id] = self.wickets.get(bowler_id, 0) + 1
+            if self.wickets[bowler_id] == self.FIVE_WICKETS:
+                self.awards.append({'type': 'FIVE_WICKETS', 'player_id': bowler_id})
+
+        if outcome in self.EXTRAS:
+            return
+
+        # Consecutive legal deliveries by the same bowler, across overs
+        if is_wicket and dismissal_type not in self.NOT_BOWLER_WICKETS:
+            self.streaks[bowler_id] = self.streaks.get(bowler_id, 0) + 1
+            if self.streaks[bowler_id] == self.HAT_TRICK_WICKETS:
+                self.awards.append({'type': 'HAT_TRICK', 'player_id': bowler_id})
+        else:
+            self.streaks[bowler_id] = 0
+
+    def get_state(self) -> Dict:
+        """JSON-serializable state for engine checkpoints"""
+        return {
+            'runs': {str(k): v for k, v in self.runs.items()},
+            'wickets': {str(k): v for k, v in self.wickets.items()},
+            'streaks': {str(k): v for k, v in self.streaks.items()},
+            'awards': list(self.awards)
+        }
+
+    def restore(self, state: Dict):
+        self.runs = {int(k): v for k, v in state.get('runs', {}).items()}
+        self.wickets = {int(k): v for k, v in state.get('wickets', {}).items()}
+        self.streaks = {int(k): v for k, v in state.get('streaks', {}).items()}
+        self.awards = list(state.get('awards', []))
+
+    @classmethod
+    def from_balls(cls, balls: Iterable) -> 'AchievementTracker':
+        """
+        Replay stored balls (in bowling order) through a new tracker, for
+        matches not simulated by EnhancedMatchEngine. Ball rows carry total
+        runs, so byes and leg byes are taken off as the engine does.
+        """
+        tracker = cls()
+        for bowler_id, batsman_id, outcome, runs, is_wicket, dismissal_type in balls:
+            runs_off_bat = 0 if outcome.startswith(('B', 'LB')) or outcome in cls.EXTRAS else runs
+            tracker.record_ball(bowler_id, batsman_id, outcome, runs_off_bat, is_wicket, dismissal_type)
+        return tracker
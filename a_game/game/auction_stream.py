@@ -0,0 +1,253 @@
+# auction_stream.py - Push auction events to WebSocket clients
+
+import asyncio
+import json
+import logging
+import re
+import select
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+import psycopg2
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from .models import Auction
+from .serializers import BidSerializer
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBroker:
+    """
+    In-process fan-out. Each WebSocket subscribes an asyncio queue on the
+    server's event loop; publish() may be called from any thread (sync
+    views run in a worker thread) and hands messages to the loop.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        """Register a queue for a channel; call from the event loop"""
+        queue = asyncio.Queue(self.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(channel, set())
+            subscribers.difference_update({entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(channel, None)
+
+    def publish(self, channel: str, message: Dict):
+        self.deliver(channel, message)
+
+    def deliver(self, channel: str, message: Dict):
+        """Hand a message to every local subscriber of a channel"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self._offer, queue, message)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, message: Dict):
+        # A client too slow to keep up gets a resync instead of a backlog
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            message = {'type': 'resync'}
+        queue.put_nowait(message)
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Fan-out across worker processes through PostgreSQL LISTEN/NOTIFY. Each
+    process runs one listener thread on its own connection and delivers
+    what it hears to its local subscribers, so every worker's clients see
+    every event without another service to run.
+    """
+
+    CHANNEL = 'auction_events'
+    MAX_PAYLOAD = 7999  # NOTIFY rejects payloads of 8000 bytes or more
+    RECONNECT_MIN = 1  # Seconds before the first reconnect attempt
+    RECONNECT_MAX = 30
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True)
+                self._listener.start()
+        return super().subscribe(channel)
+
+    def publish(self, channel: str, message: Dict):
+        payload = json.dumps({'channel': channel, 'message': message}, default=str)
+        # An event too large to notify tells clients to resync from a snapshot instead
+        if len(payload.encode()) > self.MAX_PAYLOAD:
+            payload = json.dumps({'channel': channel, 'message': {'type': 'resync'}})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.CHANNEL, payload])
+
+    def _listen(self):
+        """
+        Keep a LISTEN connection open for the life of the process. A dropped
+        connection is retried with exponential backoff; once LISTEN is
+        re-issued every local subscriber is told to resync, since events
+        published while disconnected were lost.
+        """
+        delay = self.RECONNECT_MIN
+        reconnecting = False
+
+        while True:
+            listener = None
+            try:
+                listener = self._connect()
+                if reconnecting:
+                    logger.info('Auction event listener reconnected')
+                    self._resync_all()
+                delay = self.RECONNECT_MIN
+                reconnecting = False
+                self._drain(listener)
+            except (psycopg2.Error, OSError):
+                logger.exception('Auction event listener lost its connection; retrying in %ss', delay)
+                time.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_MAX)
+                reconnecting = True
+            finally:
+                if listener is not None:
+                    listener.close()
+
+    def _connect(self):
+        db = settings.DATABASES['default']
+        listener = psycopg2.connect(
+            dbname=db['NAME'], user=db['USER'], password=db['PASSWORD'],
+            host=db['HOST'], port=db['PORT']
+        )
+        listener.autocommit = True
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN {self.CHANNEL}')
+        return listener
+
+    def _drain(self, listener):
+        """Deliver notifications until the connection fails"""
+        while True:
+            if select.select([listener], [], [], 5) == ([], [], []):
+                continue
+            listener.poll()
+            while listener.notifies:
+                notify = listener.notifies.pop(0)
+                event = json.loads(notify.payload)
+                self.deliver(event['channel'], event['message'])
+
+    def _resync_all(self):
+        with self._lock:
+            channels = list(self._subscribers)
+        for channel in channels:
+            self.deliver(channel, {'type': 'resync'})
+
+
+class AuctionStream:
+    """
+    Publish auction events to the `auction:<id>` channel once the
+    transaction that caused them commits. The broker is chosen with the
+    AUCTION_BROKER setting: 'local' for a single server process, 'postgres'
+    when several workers serve WebSockets.
+    """
+
+    BROKERS = {'local': LocalBroker, 'postgres': PostgresBroker}
+    _broker = None
+
+    @classmethod
+    def broker(cls) -> LocalBroker:
+        if cls._broker is None:
+            cls._broker = cls.BROKERS[getattr(settings, 'AUCTION_BROKER', 'local')]()
+        return cls._broker
+
+    @staticmethod
+    def channel(auction_id: int) -> str:
+        return f'auction:{auction_id}'
+
+    @classmethod
+    def publish(cls, auction_id: int, event_type: str, **data):
+        message = {'type': event_type, 'auction_id': auction_id, **data}
+        transaction.on_commit(lambda: cls.broker().publish(cls.channel(auction_id), message))
+
+
+class AuctionSocket:
+    """
+    ASGI WebSocket application for /ws/auctions/<id>/. A client receives a
+    snapshot of the current bids on connect, then bid, outbid and
+    lot_closed events as they commit.
+    """
+
+    PATH = re.compile(r'^/ws/auctions/(?P<auction_id>\d+)/?$')
+
+    async def __call__(self, scope, receive, send):
+        match = self.PATH.match(scope['path'])
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        if match is None:
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+
+        # Subscribe before taking the snapshot so no event falls between them
+        auction_id = int(match.group('auction_id'))
+        broker = AuctionStream.broker()
+        channel = AuctionStream.channel(auction_id)
+        queue = broker.subscribe(channel)
+
+        snapshot = await self._snapshot(auction_id)
+        if snapshot is None:
+            broker.unsubscribe(channel, queue)
+            await send({'type': 'websocket.close', 'code': 4404})
+            return
+
+        await send({'type': 'websocket.accept'})
+        await self._send(send, snapshot)
+
+        forward = asyncio.create_task(self._forward(queue, send, auction_id))
+        try:
+            while True:
+                message = await receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+        finally:
+            broker.unsubscribe(channel, queue)
+            forward.cancel()
+
+    async def _forward(self, queue: asyncio.Queue, send, auction_id: int):
+        while True:
+            event = await queue.get()
+            if event['type'] == 'resync':
+                event = await self._snapshot(auction_id)
+            await self._send(send, event)
+
+    @staticmethod
+    async def _send(send, event: Dict):
+        await send({'type': 'websocket.send', 'text': json.dumps(event, default=str)})
+
+    @staticmethod
+    @sync_to_async
+    def _snapshot(auction_id: int) -> Optional[Dict]:
+        from .bidding import BiddingSystem  # bidding publishes through this module
+
+        auction = Auction.objects.filter(id=auction_id).first()
+        if auction is None:
+            return None
+        return {
+            'type': 'snapshot',
+            'auction_id': auction.id,
+            'status': auction.status,
+            'bids': BidSerializer(BiddingSystem.current_bids(auction), many=True).data
+        }
@@ -0,0 +1,98 @@
+# bid_archive.py - Compact superseded bids into the append-only bid history
+
+from datetime import timedelta
+from typing import Dict, Optional
+from django.db import transaction
+from django.db.models import Exists, OuterRef, QuerySet
+from django.utils import timezone
+from .models import Auction, AuctionLot, Bid, BidHistory
+
+
+class BidArchive:
+    """
+    Keep the live bids table down to the bids that still matter: each
+    lot's current highest bid and the bids that won.
+
+    An OUTBID or WITHDRAWN bid never changes again, so compaction copies it
+    to the append-only bid_history table and deletes it from bids in the
+    same transaction, a batch at a time (manage.py compact_bids). Bids a
+    lot still points at (an unsold lot keeps its last highest bid) stay
+    live, as do bids superseded less than MIN_AGE seconds ago, so clients
+    that were just sent one can still fetch it. history() reads an
+    auction's full record back from both tables, and find() a single bid
+    by its original id.
+    """
+
+    BATCH_SIZE = 5000
+    MIN_AGE = 60
+    SUPERSEDED = ('OUTBID', 'WITHDRAWN')
+
+    @classmethod
+    def _superseded(cls, min_age: float) -> QuerySet:
+        return Bid.objects.filter(
+            status__in=cls.SUPERSEDED, updated_at__lt=timezone.now() - timedelta(seconds=min_age)
+        ).exclude(
+            Exists(AuctionLot.objects.filter(highest_bid=OuterRef('pk')))
+        ).order_by('id')
+
+    @classmethod
+    def compact_batch(cls, batch_size: int = BATCH_SIZE, min_age: float = MIN_AGE) -> int:
+        """Archive up to batch_size superseded bids; returns how many were moved"""
+        with transaction.atomic():
+            bids = list(cls._superseded(min_age).select_for_update(skip_locked=True)[:batch_size])
+            if not bids:
+                return 0
+
+            # Ignoring conflicts keeps a rerun after a partial failure harmless
+            BidHistory.objects.bulk_create([
+                BidHistory(
+                    bid_id=bid.id, auction_id=bid.auction_id, player_id=bid.player_id, team_id=bid.team_id,
+                    amount=bid.amount, status=bid.status, created_at=bid.created_at, superseded_at=bid.updated_at
+                )
+                for bid in bids
+            ], ignore_conflicts=True)
+            Bid.objects.filter(id__in=[bid.id for bid in bids]).delete()
+        return len(bids)
+
+    @classmethod
+    def compact(cls, batch_size: int = BATCH_SIZE, min_age: float = MIN_AGE) -> Dict[str, int]:
+        """Archive batches until no superseded bids are left"""
+        totals = {'archived': 0, 'batches': 0}
+        while True:
+            archived = cls.compact_batch(batch_size, min_age)
+            if archived:
+                totals['archived'] += archived
+                totals['batches'] += 1
+            if archived < batch_size:
+                return totals
+
+    @classmethod
+    def history(cls, auction: Auction, player_id: Optional[int] = None) -> QuerySet:
+        """Every bid placed in an auction, live and archived, oldest first"""
+        fields = ['player_id', 'team_id', 'amount', 'status', 'created_at']
+        live = Bid.objects.filter(auction=auction)
+        archived = BidHistory.objects.filter(auction=auction)
+        if player_id is not None:
+            live = live.filter(player_id=player_id)
+            archived = archived.filter(player_id=player_id)
+
+        return live.order_by().values('id', *fields).union(
+            archived.order_by().values('bid_id', *fields), all=True
+        ).order_by('created_at', 'id')
+
+    @classmethod
+    def find(cls, bid_id) -> Optional[Bid]:
+        """An archived bid as an unsaved Bid with its original id, or None"""
+        try:
+            bid_id = int(bid_id)
+        except (TypeError, ValueError):
+            return None
+
+        archived = BidHistory.objects.select_related('auction', 'player', 'team').filter(bid_id=bid_id).first()
+        if archived is None:
+            return None
+        return Bid(
+            id=archived.bid_id, auction=archived.auction, player=archived.player, team=archived.team,
+            amount=archived.amount, status=archived.status,
+            created_at=archived.created_at, updated_at=archived.superseded_at
+        )
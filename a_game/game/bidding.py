@@ -0,0 +1,418 @@
+# bidding.py - Bid acceptance against per-lot highest bids
+
+from datetime import timedelta
+from typing import Dict, List, Optional
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import Auction, AuctionLot, Bid, BudgetReservation, Player, ProxyBid, Team
+from .auction_stream import AuctionStream
+from .team_strength import TeamStrengthCalculator
+
+
+class BiddingSystem:
+    """
+    Accept bids through the auction's lot rows.
+
+    Each (auction, player) lot holds the current highest bid, team and
+    amount, so validating a bid and reading a price are single row lookups
+    instead of scans over every bid placed on the player.
+
+    Accepting a bid is one short transaction on the lot row: a single
+    SELECT ... FOR UPDATE locks the lot and reads the bidding team's budget,
+    then the bid is inserted, the previous highest bid marked OUTBID and
+    the lot advanced. Concurrent bids on a lot queue on its row lock and
+    are validated against the committed winner before them, so two bids
+    can never both be accepted at the same price; bids on different lots
+    do not contend at all.
+
+    Teams may also leave a proxy (a maximum) on a lot. After every accepted
+    bid the lot's proxies are resolved in memory, second-price style: the
+    team with the highest maximum leads at one PROXY_INCREMENT above the
+    runner-up, capped at its maximum and its budget. Only that resulting
+    price is written as a Bid, however many proxies competed.
+
+    Lots run by the LotScheduler close at closes_at; a bid that lands
+    within LATE_BID_SECONDS of the close pushes it back.
+
+    Money a team leads with on running lots is held in its BudgetReservation
+    row: a bid that takes a lot adds to its team's reservation and releases
+    the previous leader's, and selling or closing the lot turns the
+    reservation into a debit of money_left. A team can therefore never lead
+    with more than it has, and checking that is a read of one locked row.
+    """
+
+    PROXY_INCREMENT = 10000
+    LATE_BID_SECONDS = 10  # A bid on an open lot leaves at least this long before it closes
+    CLOSED = ('SOLD', 'UNSOLD')
+
+    @classmethod
+    def open_lots(cls, auction: Auction, players: List[Player]):
+        """Create lots for players entering an auction's pool (existing lots are kept)"""
+        AuctionLot.objects.bulk_create(
+            [AuctionLot(auction=auction, player=player) for player in players],
+            ignore_conflicts=True
+        )
+
+    @staticmethod
+    def _reserved(team_id):
+        """Subquery for a team's reservation (0 before its first bid)"""
+        return Coalesce(
+            Subquery(BudgetReservation.objects.filter(team_id=team_id).values('reserved')[:1]), 0
+        )
+
+    @classmethod
+    def _lock_lot(cls, auction: Auction, player: Player, team: Team) -> AuctionLot:
+        """Lock a lot and read the team's current budget in the same round trip"""
+        lots = AuctionLot.objects.select_for_update().filter(auction=auction, player=player).annotate(
+            team_money_left=Subquery(Team.objects.filter(id=team.id).values('money_left')[:1]),
+            team_reserved=cls._reserved(team.id)
+        )
+        lot = lots.first()
+        if lot is None:
+            # Lots are normally opened with the pool; cover players added some other way
+            cls.open_lots(auction, [player])
+            lot = lots.first()
+        return lot
+
+    @staticmethod
+    def _held(lot: AuctionLot, team_id: int) -> int:
+        """What a team already has reserved on a lot it leads"""
+        return lot.highest_amount if lot.highest_bid_id and lot.highest_team_id == team_id else 0
+
+    @classmethod
+    def _reserve(cls, lot: AuctionLot, team: Team, amount: int):
+        """
+        Move a lot's reservation to a team's new highest bid; raises
+        ValueError if the team cannot cover it. The lot must be locked.
+        """
+        previous_id = lot.highest_team_id if lot.highest_bid_id else None
+        held = cls._held(lot, team.id)
+        team_ids = sorted({team.id, previous_id} - {None})
+
+        # Each reservation is locked with its team row, so money_left cannot go stale
+        # before the check; locked in team order, so two teams taking lots from each
+        # other cannot deadlock
+        rows = BudgetReservation.objects.select_for_update().filter(
+            team_id__in=team_ids
+        ).order_by('team_id').annotate(money_left=F('team__money_left'))
+        reservations = {row.team_id: row for row in rows}
+        if len(reservations) < len(team_ids):
+            BudgetReservation.objects.bulk_create(
+                [BudgetReservation(team_id=team_id) for team_id in team_ids], ignore_conflicts=True
+            )
+            reservations = {row.team_id: row for row in rows.all()}
+
+        reservation = reservations[team.id]
+        if reservation.money_left - reservation.reserved < amount - held:
+            raise ValueError('Insufficient budget')
+
+        BudgetReservation.objects.filter(team_id__in=team_ids).update(
+            reserved=Case(
+                When(team_id=team.id, then=F('reserved') + (amount - held)),
+                default=F('reserved') - lot.highest_amount
+            ),
+            updated_at=timezone.now()
+        )
+
+    @classmethod
+    def _release(cls, amounts: Dict[int, int]):
+        """Release reservations ({team_id: amount}) of lots that have closed"""
+        amounts = {team_id: amount for team_id, amount in amounts.items() if team_id and amount}
+        if amounts:
+            BudgetReservation.objects.filter(team_id__in=amounts).update(
+                reserved=Case(*[
+                    When(team_id=team_id, then=F('reserved') - amount) for team_id, amount in amounts.items()
+                ]),
+                updated_at=timezone.now()
+            )
+
+    @classmethod
+    def _accept(cls, lot: AuctionLot, auction: Auction, player: Player, team: Team, amount: int) -> Bid:
+        """Make a bid the lot's highest; the lot must be locked"""
+        cls._reserve(lot, team, amount)
+        bid = Bid.objects.create(auction=auction, player=player, team=team, amount=amount)
+        if lot.highest_bid_id:
+            Bid.objects.filter(id=lot.highest_bid_id, status='ACTIVE').update(
+                status='OUTBID', updated_at=bid.created_at
+            )
+
+        # A late bid on a running lot pushes its close back
+        if lot.closes_at:
+            lot.closes_at = max(lot.closes_at, bid.created_at + timedelta(seconds=cls.LATE_BID_SECONDS))
+
+        AuctionLot.objects.filter(id=lot.id).update(
+            highest_bid=bid, highest_team=team, highest_amount=amount,
+            bid_count=F('bid_count') + 1, closes_at=lot.closes_at, updated_at=bid.created_at
+        )
+
+        if lot.highest_bid_id and lot.highest_team_id != team.id:
+            AuctionStream.publish(
+                auction.id, 'outbid', player_id=player.id, bid_id=lot.highest_bid_id,
+                team_id=lot.highest_team_id, amount=lot.highest_amount
+            )
+        AuctionStream.publish(
+            auction.id, 'bid', player_id=player.id, bid_id=bid.id,
+            team_id=team.id, team_name=team.name, amount=amount
+        )
+
+        lot.highest_bid = bid
+        lot.highest_team = team
+        lot.highest_amount = amount
+        lot.bid_count += 1
+        return bid
+
+    @classmethod
+    def _resolve_proxies(cls, lot: AuctionLot, auction: Auction, player: Player) -> Optional[Bid]:
+        """
+        Settle the lot's proxies against its current price and write the
+        outcome as at most one bid; the lot must be locked.
+        """
+        proxies = list(
+            ProxyBid.objects.filter(
+                auction=auction, player=player, max_amount__gt=lot.highest_amount
+            ).select_related('team').annotate(
+                team_reserved=cls._reserved(OuterRef('team_id'))
+            ).order_by('created_at', 'id')
+        )
+        if not proxies:
+            return None
+
+        # What each team can go to: its maximum, within what it has not
+        # committed elsewhere. The leader can always hold the current price.
+        price = lot.highest_amount
+        leader_id = lot.highest_team_id
+        limits = {
+            proxy.team_id: min(
+                proxy.max_amount,
+                proxy.team.money_left - proxy.team_reserved + cls._held(lot, proxy.team_id)
+            )
+            for proxy in proxies
+        }
+        teams = {proxy.team_id: proxy.team for proxy in proxies}
+        if leader_id:
+            limits[leader_id] = max(limits.get(leader_id, 0), price)
+
+        # Highest limit wins; ties go to the leader, then the earliest proxy
+        order = dict.fromkeys(([leader_id] if leader_id else []) + [proxy.team_id for proxy in proxies])
+        ranked = sorted(order, key=lambda team_id: -limits[team_id])
+        winner_id = ranked[0]
+        runner_up = limits[ranked[1]] if len(ranked) > 1 else None
+
+        if winner_id == leader_id:
+            # Holding the lead only moves the price if a challenger pushed it
+            if runner_up is None or runner_up <= price:
+                return None
+            new_price = min(limits[winner_id], runner_up + cls.PROXY_INCREMENT)
+        else:
+            new_price = min(limits[winner_id], max(runner_up or 0, price) + cls.PROXY_INCREMENT)
+
+        if new_price <= price:
+            return None
+        winner = teams.get(winner_id) or lot.highest_team
+        try:
+            with transaction.atomic():
+                return cls._accept(lot, auction, player, winner, new_price)
+        except ValueError:
+            return None  # The winner's budget was committed elsewhere since it was read
+
+    @classmethod
+    def place_bid(cls, auction: Auction, player: Player, team: Team, amount: int) -> Bid:
+        """
+        Accept a bid if it beats the lot's highest bid; raises ValueError
+        otherwise. Proxies answer straight away, so the returned bid may
+        already be OUTBID.
+        """
+        with transaction.atomic():
+            lot = cls._lock_lot(auction, player, team)
+            if lot.status in cls.CLOSED:
+                raise ValueError('Lot is closed')
+            if amount <= lot.highest_amount:
+                raise ValueError(f'Bid must be higher than current highest bid of ${lot.highest_amount}')
+
+            bid = cls._accept(lot, auction, player, team, amount)
+            cls._resolve_proxies(lot, auction, player)
+            if lot.highest_bid_id != bid.id:
+                bid.status = 'OUTBID'
+        return bid
+
+    @classmethod
+    def place_proxy_bid(cls, auction: Auction, player: Player, team: Team, max_amount: int) -> Dict:
+        """
+        Set (or raise) a team's maximum for a lot and resolve the lot's
+        proxies; raises ValueError if the maximum cannot lead.
+        """
+        with transaction.atomic():
+            lot = cls._lock_lot(auction, player, team)
+            if lot.status in cls.CLOSED:
+                raise ValueError('Lot is closed')
+            if lot.team_money_left - lot.team_reserved + cls._held(lot, team.id) < max_amount:
+                raise ValueError('Insufficient budget')
+            if max_amount <= lot.highest_amount:
+                raise ValueError(f'Maximum must be higher than current highest bid of ${lot.highest_amount}')
+
+            proxy, _ = ProxyBid.objects.update_or_create(
+                auction=auction, player=player, team=team, defaults={'max_amount': max_amount}
+            )
+            cls._resolve_proxies(lot, auction, player)
+
+        return {
+            'proxy': proxy,
+            'leading': lot.highest_team_id == team.id,
+            'highest_bid': lot.highest_bid,
+            'highest_amount': lot.highest_amount
+        }
+
+    @classmethod
+    def finalize(cls, bid: Bid) -> Player:
+        """
+        Sell a lot to its active bid. The bid's status change and the team's
+        debit are conditional writes, so a bid finalized twice at once, or
+        a team that can no longer afford it, is rejected with ValueError.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock the lot first, as bids do, so a bid cannot land mid-sale
+            lot = AuctionLot.objects.select_for_update().filter(
+                auction_id=bid.auction_id, player_id=bid.player_id
+            ).first()
+            if lot is not None and lot.status in cls.CLOSED:
+                raise ValueError('Lot is closed')
+            # QuerySet.update() skips auto_now, so status changes set updated_at themselves
+            if not Bid.objects.filter(id=bid.id, status='ACTIVE').update(status='WON', updated_at=now):
+                raise ValueError('Only active bids can be finalized')
+            if not Team.objects.filter(id=bid.team_id, money_left__gte=bid.amount).update(
+                money_left=F('money_left') - bid.amount, updated_at=now
+            ):
+                raise ValueError('Insufficient budget')
+            if lot is not None and lot.highest_bid_id:
+                cls._release({lot.highest_team_id: lot.highest_amount})
+
+            # Saved (not updated) so the team strength signals see the move
+            player = bid.player
+            player.team_id = bid.team_id
+            player.sold_price = bid.amount
+            player.save(update_fields=['team', 'sold_price', 'updated_at'])
+
+            # Mark other bids for this player as outbid
+            Bid.objects.filter(
+                auction_id=bid.auction_id, player_id=bid.player_id, status='ACTIVE'
+            ).exclude(id=bid.id).update(status='OUTBID', updated_at=now)
+            if lot is not None:
+                AuctionLot.objects.filter(id=lot.id).update(status='SOLD', updated_at=now)
+
+            AuctionStream.publish(
+                bid.auction_id, 'lot_closed', player_id=bid.player_id, bid_id=bid.id,
+                team_id=bid.team_id, amount=bid.amount
+            )
+
+        bid.status = 'WON'
+        return player
+
+    @classmethod
+    def pass_lot(cls, lot: AuctionLot):
+        """
+        Close a locked lot without a sale: its leading bid is outbid and the
+        leader's reservation released. Call inside the lot's transaction.
+        """
+        if lot.status not in cls.CLOSED and lot.highest_bid_id:
+            Bid.objects.filter(id=lot.highest_bid_id, status='ACTIVE').update(
+                status='OUTBID', updated_at=timezone.now()
+            )
+            cls._release({lot.highest_team_id: lot.highest_amount})
+        lot.status = 'UNSOLD'
+        lot.save(update_fields=['status', 'updated_at'])
+        AuctionStream.publish(lot.auction_id, 'lot_unsold', player_id=lot.player_id)
+
+    @classmethod
+    def close_auction(cls, auction: Auction) -> Dict:
+        """
+        Sell every lot still running in an auction to its active bid, in a
+        fixed number of statements: one query reads the winners, then
+        players, team budgets, bids and lots are each written in bulk. A
+        team that cannot pay for all its lots buys them in pool order until
+        its budget runs out; the rest go unsold. Raises ValueError if the
+        auction is already over.
+        """
+        with transaction.atomic():
+            auction = Auction.objects.select_for_update().get(id=auction.id)
+            if auction.status in ('COMPLETED', 'CANCELLED'):
+                raise ValueError(f'Auction is already {auction.status.lower()}')
+
+            running = AuctionLot.objects.filter(auction=auction).exclude(status__in=cls.CLOSED)
+            winners = list(
+                running.select_for_update().filter(highest_bid__status='ACTIVE').order_by('id').values_list(
+                    'id', 'player_id', 'player__team_id', 'highest_bid_id', 'highest_team_id', 'highest_amount'
+                )
+            )
+
+            budgets = dict(
+                Team.objects.select_for_update().filter(
+                    id__in={team_id for *_, team_id, _ in winners}
+                ).order_by('id').values_list('id', 'money_left')
+            )
+            sales = []
+            spent = {}
+            for lot_id, player_id, old_team_id, bid_id, team_id, amount in winners:
+                if spent.get(team_id, 0) + amount <= budgets[team_id]:
+                    spent[team_id] = spent.get(team_id, 0) + amount
+                    sales.append((lot_id, player_id, old_team_id, bid_id, team_id, amount))
+
+            # Every running lot's reservation is released; sold ones become debits
+            held = {}
+            for *_, team_id, amount in winners:
+                held[team_id] = held.get(team_id, 0) + amount
+            cls._release(held)
+
+            now = timezone.now()
+            Player.objects.bulk_update(
+                [
+                    Player(id=player_id, team_id=team_id, sold_price=amount, updated_at=now)
+                    for _, player_id, _, _, team_id, amount in sales
+                ],
+                ['team', 'sold_price', 'updated_at']
+            )
+            if spent:
+                Team.objects.filter(id__in=spent).update(
+                    money_left=Case(*[
+                        When(id=team_id, then=F('money_left') - total) for team_id, total in spent.items()
+                    ]),
+                    updated_at=now
+                )
+
+            won_bids = [bid_id for _, _, _, bid_id, _, _ in sales]
+            Bid.objects.filter(auction=auction, status='ACTIVE').update(
+                status=Case(When(id__in=won_bids, then=Value('WON')), default=Value('OUTBID')),
+                updated_at=now
+            )
+            unsold = running.count() - len(sales)
+            running.update(
+                status=Case(When(id__in=[lot_id for lot_id, *_ in sales], then=Value('SOLD')), default=Value('UNSOLD')),
+                updated_at=now
+            )
+
+            auction.status = 'COMPLETED'
+            auction.end_time = now
+            auction.save(update_fields=['status', 'end_time', 'updated_at'])
+
+            # The bulk writes skip the Player signals, so invalidate strengths here
+            TeamStrengthCalculator.invalidate(
+                {team_id for *_, team_id, _ in sales} | {old_team_id for _, _, old_team_id, *_ in sales}
+            )
+
+            # Counts only: a sales list outgrows a NOTIFY payload, so clients resync for detail
+            AuctionStream.publish(auction.id, 'auction_closed', sold=len(sales), unsold=unsold)
+            AuctionStream.publish(auction.id, 'auction_completed')
+
+        return {'sold': len(sales), 'unsold': unsold, 'spent': spent}
+
+    @classmethod
+    def current_bids(cls, auction: Auction) -> List[Bid]:
+        """Highest active bid on every lot of an auction"""
+        lots = AuctionLot.objects.filter(
+            auction=auction, highest_bid__status='ACTIVE'
+        ).select_related(
+            'highest_bid__auction', 'highest_bid__player', 'highest_bid__team'
+        ).order_by('player_id')
+        return [lot.highest_bid for lot in lots]
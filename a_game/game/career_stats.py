@@ -0,0 +1,251 @@
+# career_stats.py - Materialized career statistics per user and per player
+
+from typing import Dict, Iterable, Tuple
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from .models import (
+    Ball, Match, Player, PlayerPerformance, CareerStats, UserCareerStats, PlayerCareerStats
+)
+
+
+class CareerStatsCalculator:
+    """
+    Keep the user_career_stats and player_career_stats tables in step with
+    PlayerPerformance rows.
+
+    Each match adds its performances to a whole-career row (season 0) and a
+    row for the match's season (the year it was created), for every player
+    and for the owner of each team. Counters are incremented with F()
+    expressions so concurrent matches never overwrite each other. Balls
+    bowled are counted from the match's legal Ball rows.
+    """
+
+    COUNTERS = [
+        'matches', 'innings', 'runs', 'balls_faced', 'fours', 'sixes', 'dismissals',
+        'balls_bowled', 'runs_conceded', 'wickets', 'maidens',
+        'catches', 'stumpings', 'run_outs'
+    ]
+
+    CAREER = 0
+    EXTRA_OUTCOMES = ('WD', 'NB')  # Deliveries that don't count toward the over
+
+    @classmethod
+    def legal_balls(cls, balls) -> Dict[Tuple[int, int], int]:
+        """Legal deliveries per (match_id, bowler_id) in a Ball queryset"""
+        rows = balls.exclude(outcome__in=cls.EXTRA_OUTCOMES).values_list(
+            'over__innings__match_id', 'bowler_id'
+        ).annotate(count=Count('id')).order_by()
+        return {(match_id, bowler_id): count for match_id, bowler_id, count in rows}
+
+    @staticmethod
+    def is_dismissed(how_out: str) -> bool:
+        return bool(how_out) and how_out != 'not out'
+
+    @classmethod
+    def performance_totals(cls, runs_scored: int, balls_faced: int, fours: int, sixes: int,
+                           how_out: str, runs_conceded: int, wickets_taken: int, maidens: int,
+                           catches: int, stumpings: int, run_outs: int,
+                           balls_bowled: int = 0) -> Dict[str, int]:
+        """Counter increments (plus score for highest_score) for one performance"""
+        dismissed = cls.is_dismissed(how_out)
+        return {
+            'matches': 1,
+            'innings': 1 if balls_faced > 0 or dismissed else 0,
+            'runs': runs_scored,
+            'balls_faced': balls_faced,
+            'fours': fours,
+            'sixes': sixes,
+            'dismissals': 1 if dismissed else 0,
+            'balls_bowled': balls_bowled,
+            'runs_conceded': runs_conceded,
+            'wickets': wickets_taken,
+            'maidens': maidens,
+            'catches': catches,
+            'stumpings': stumpings,
+            'run_outs': run_outs,
+            'highest_score': runs_scored
+        }
+
+    @classmethod
+    def _accumulate(cls, totals: Dict, key: Tuple, increments: Dict[str, int]):
+        row = totals.setdefault(key, dict.fromkeys(cls.COUNTERS + ['highest_score'], 0))
+        for field in cls.COUNTERS:
+            row[field] += increments[field]
+        row['highest_score'] = max(row['highest_score'], increments['highest_score'])
+
+    @classmethod
+    def _collect(cls, rows: Iterable[Tuple], balls: Dict[Tuple[int, int], int]) -> Tuple[Dict, Dict]:
+        """
+        Fold (player_id, owner_id, match_id, season, *performance values)
+        rows, plus legal balls per (match_id, bowler_id), into per-player
+        and per-user totals keyed by (id, season). A user's match is
+        counted once, not once per player they fielded.
+        """
+        player_totals = {}
+        user_totals = {}
+        user_matches = set()
+        for player_id, owner_id, match_id, season, *values in rows:
+            increments = cls.performance_totals(*values, balls_bowled=balls.get((match_id, player_id), 0))
+            for period in (cls.CAREER, season):
+                cls._accumulate(player_totals, (player_id, period), increments)
+            if not owner_id:
+                continue
+
+            first_of_match = (owner_id, match_id) not in user_matches
+            user_matches.add((owner_id, match_id))
+            increments = dict(increments, matches=1 if first_of_match else 0)
+            for period in (cls.CAREER, season):
+                cls._accumulate(user_totals, (owner_id, period), increments)
+        return player_totals, user_totals
+
+    @classmethod
+    def _apply(cls, model, owner_field: str, totals: Dict):
+        """
+        Add totals to existing rows, creating the missing ones first, with a
+        single UPDATE whose increments are picked per row by CASE. Rows are
+        locked in key order first so concurrent matches lock them in the
+        same order.
+        """
+        if not totals:
+            return
+
+        keys = sorted(totals)
+        model.objects.bulk_create(
+            [model(**{owner_field: key_id, 'season': season}) for key_id, season in keys],
+            ignore_conflicts=True
+        )
+        rows = model.objects.select_for_update().filter(**{
+            f'{owner_field}__in': {key_id for key_id, _ in keys},
+            'season__in': {season for _, season in keys}
+        }).order_by(owner_field, 'season').values_list('id', owner_field, 'season')
+        row_ids = {(key_id, season): row_id for row_id, key_id, season in rows}
+
+        def increment(field):
+            return Case(
+                *[When(id=row_ids[key], then=Value(totals[key][field])) for key in keys],
+                default=Value(0), output_field=IntegerField()
+            )
+
+        updates = {
+            field: F(field) + increment(field)
+            for field in cls.COUNTERS
+            if any(totals[key][field] for key in keys)
+        }
+        updates['highest_score'] = Greatest(F('highest_score'), increment('highest_score'))
+        model.objects.filter(id__in=[row_ids[key] for key in keys]).update(**updates)
+
+    @classmethod
+    def record_match(cls, match: Match, performances: Iterable[PlayerPerformance]):
+        """Add a completed match's performances; call inside the match's transaction"""
+        owners = {match.team1_id: match.team1.owner_id, match.team2_id: match.team2.owner_id}
+        season = match.created_at.year
+
+        player_totals, user_totals = cls._collect(
+            (
+                (
+                    p.player_id, owners.get(p.team_id), match.id, season,
+                    p.runs_scored, p.balls_faced, p.fours, p.sixes, p.how_out,
+                    p.runs_conceded, p.wickets_taken, p.maidens,
+                    p.catches, p.stumpings, p.run_outs
+                )
+                for p in performances
+            ),
+            cls.legal_balls(Ball.objects.filter(over__innings__match=match))
+        )
+
+        with transaction.atomic():
+            cls._apply(PlayerCareerStats, 'player_id', player_totals)
+            cls._apply(UserCareerStats, 'user_id', user_totals)
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 1000) -> Dict[str, int]:
+        """Rebuild both tables from every completed match's performances"""
+        rows = PlayerPerformance.objects.filter(match__status='COMPLETED').values_list(
+            'player_id', 'team__owner_id', 'match_id', 'match__created_at',
+            'runs_scored', 'balls_faced', 'fours', 'sixes', 'how_out',
+            'runs_conceded', 'wickets_taken', 'maidens',
+            'catches', 'stumpings', 'run_outs'
+        )
+        player_totals, user_totals = cls._collect(
+            (
+                (player_id, owner_id, match_id, created_at.year, *values)
+                for player_id, owner_id, match_id, created_at, *values in rows.iterator(chunk_size=10000)
+            ),
+            cls.legal_balls(Ball.objects.filter(over__innings__match__status='COMPLETED'))
+        )
+
+        with transaction.atomic():
+            PlayerCareerStats.objects.all().delete()
+            UserCareerStats.objects.all().delete()
+            PlayerCareerStats.objects.bulk_create(
+                [PlayerCareerStats(player_id=key_id, season=season, **row)
+                 for (key_id, season), row in player_totals.items()],
+                batch_size=batch_size
+            )
+            UserCareerStats.objects.bulk_create(
+                [UserCareerStats(user_id=key_id, season=season, **row)
+                 for (key_id, season), row in user_totals.items()],
+                batch_size=batch_size
+            )
+
+        return {'player_rows': len(player_totals), 'user_rows': len(user_totals)}
+
+    @classmethod
+    def _career_and_seasons(cls, rows: Iterable) -> Tuple[CareerStats, list]:
+        career = None
+        seasons = []
+        for row in rows:
+            if row.season == cls.CAREER:
+                career = row
+            else:
+                seasons.append(row)
+        return career, seasons
+
+    @classmethod
+    def for_user(cls, user: User) -> Tuple[UserCareerStats, list]:
+        """A user's career row and season rows (newest first), in one query"""
+        career, seasons = cls._career_and_seasons(
+            UserCareerStats.objects.filter(user=user).order_by('-season')
+        )
+        return career or UserCareerStats(user=user), seasons
+
+    @classmethod
+    def for_player(cls, player: Player) -> Tuple[PlayerCareerStats, list]:
+        """A player's career row and season rows (newest first), in one query"""
+        career, seasons = cls._career_and_seasons(
+            PlayerCareerStats.objects.filter(player=player).order_by('-season')
+        )
+        return career or PlayerCareerStats(player=player), seasons
+
+    @classmethod
+    def summary(cls, stats) -> Dict:
+        """Serializable summary of a career stats row"""
+        return {
+            'season': stats.season or None,
+            'matches': stats.matches,
+            'batting': {
+                'innings': stats.innings,
+                'runs': stats.runs,
+                'balls_faced': stats.balls_faced,
+                'highest_score': stats.highest_score,
+                'average': round(stats.batting_average, 2),
+                'strike_rate': round(stats.strike_rate, 2),
+                'fours': stats.fours,
+                'sixes': stats.sixes
+            },
+            'bowling': {
+                'balls_bowled': stats.balls_bowled,
+                'runs_conceded': stats.runs_conceded,
+                'wickets': stats.wickets,
+                'maidens': stats.maidens,
+                'average': round(stats.bowling_average, 2),
+                'economy': round(stats.economy, 2)
+            },
+            'fielding': {
+                'catches': stats.catches,
+                'stumpings': stats.stumpings,
+                'run_outs': stats.run_outs
+            }
+        }
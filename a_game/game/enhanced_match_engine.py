@@ -1,15 +1,26 @@
 # enhanced_match_engine.py - Enhanced match simulation with detailed ball-by-ball tracking
 
 import random
+from datetime import timedelta
 from typing import Dict, List, Tuple, Optional
 from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
 from .models import (
     Player, Team, BowlingAttributes, BattingAttributes, 
     WicketKeepingAttributes, FieldingAttributes,
     PitchCondition, WeatherCondition, Match, Tournament,
-    Innings, Over, Ball, PlayerPerformance
+    Innings, Over, Ball, PlayerPerformance, SimulationCheckpoint
 )
 from .rating_system import RatingSystem, AchievementSystem
+from .career_stats import CareerStatsCalculator
+from .achievement_tracker import AchievementTracker
+from .outbox import MatchOutbox
+
+class SimulationConflict(Exception):
+    """Another run holds the match (see EnhancedMatchEngine.claim)"""
 
 class EnhancedMatchEngine:
     """
@@ -52,9 +63,31 @@ class EnhancedMatchEngine:
         'RUN_OUT': 0.10,
         'HIT_WICKET': 0.05
     }
+    
+    CHECKPOINT_INTERVAL = 5  # Overs between engine state checkpoints
+    LEASE_SECONDS = 60  # An IN_PROGRESS match untouched this long is taken to be abandoned
+    
+    STAT_FIELDS = [
+        'runs_scored', 'balls_faced', 'fours', 'sixes', 'overs_bowled',
+        'runs_conceded', 'wickets_taken', 'maidens', 'catches', 'stumpings',
+        'run_outs', 'how_out', 'batting_position'
+    ]
 
-    def __init__(self, match: Match):
+    def __init__(self, match: Match, seed: Optional[int] = None,
+                 playing_elevens: Optional[Dict[int, List[Player]]] = None,
+                 checkpoints: bool = True, defer_processing: Optional[bool] = None):
         self.match = match
+        self.rng = random.Random(seed)
+        self.checkpoints = checkpoints
+        
+        # Hand ratings/achievements to the outbox consumer (default: DEFER_MATCH_PROCESSING)
+        if defer_processing is None:
+            defer_processing = getattr(settings, 'DEFER_MATCH_PROCESSING', False)
+        self.defer_processing = defer_processing
+        
+        # Playing elevens keyed by team id; may be shared between engines
+        self.playing_elevens = playing_elevens if playing_elevens is not None else {}
+        self._pending_balls = []
         self.team1 = match.team1
         self.team2 = match.team2
         self.pitch_condition = match.pitch_condition
@@ -64,6 +97,7 @@ class EnhancedMatchEngine:
         # Initialize player performances
         self.player_stats = {}
         self._initialize_player_stats()
+        self.achievements = AchievementTracker()
     
     def _initialize_player_stats(self):
         """Initialize performance tracking for all players"""
@@ -89,8 +123,15 @@ class EnhancedMatchEngine:
                 }
 
     def get_playing_eleven(self, team: Team) -> List[Player]:
-        """Get the playing eleven from the team"""
-        players = list(team.players.all())
+        """Get the playing eleven from the team (selected once per team)"""
+        if team.id not in self.playing_elevens:
+            self.playing_elevens[team.id] = self.select_playing_eleven(team)
+        return self.playing_elevens[team.id]
+
+    @staticmethod
+    def select_playing_eleven(team: Team, players: Optional[List[Player]] = None) -> List[Player]:
+        """Pick the eleven by first_eleven flag, then overall_skill"""
+        players = list(team.players.all()) if players is None else list(players)
         
         if not players:
             raise ValueError(f"Team {team.name} has no players")
@@ -163,8 +204,11 @@ class EnhancedMatchEngine:
         # Update player statistics
         self._update_ball_stats(bowler, batsman, runs, is_wicket, outcome, extras)
         
-        # Create ball record
-        ball_obj = Ball.objects.create(
+        runs_off_bat = 0 if outcome in ['WD', 'NB'] else runs - extras.get('byes', 0) - extras.get('leg_byes', 0)
+        self.achievements.record_ball(bowler.id, batsman.id, outcome, runs_off_bat, is_wicket, dismissal_type)
+        
+        # Queue ball record; written in bulk when the over completes
+        self._pending_balls.append(Ball(
             over=over_obj,
             ball_number=ball_number,
             bowler=bowler,
@@ -174,7 +218,7 @@ class EnhancedMatchEngine:
             is_wicket=is_wicket,
             dismissal_type=dismissal_type,
             fielder=fielder
-        )
+        ))
         
         return outcome, runs, is_wicket, {
             'dismissal_type': dismissal_type,
@@ -199,7 +243,7 @@ class EnhancedMatchEngine:
             bowled_idx = dismissal_types.index('BOWLED')
             weights[bowled_idx] *= 1.3
         
-        return random.choices(dismissal_types, weights=weights)[0]
+        return self.rng.choices(dismissal_types, weights=weights)[0]
 
     def _select_fielder(self, dismissal_type: str, wicketkeeper: Optional[Player], 
                        fielding_team: Team) -> Optional[Player]:
@@ -209,7 +253,7 @@ class EnhancedMatchEngine:
         elif dismissal_type == 'CAUGHT':
             # Random fielder from the team
             fielders = self.get_playing_eleven(fielding_team)
-            return random.choice(fielders)
+            return self.rng.choice(fielders)
         return None
 
     def _update_ball_stats(self, bowler: Player, batsman: Player, runs: int, 
@@ -246,7 +290,8 @@ class EnhancedMatchEngine:
                      fielding_avg: int = 50) -> Dict:
         """Simulate a complete over with detailed tracking"""
         
-        over_obj = Over.objects.create(
+        # Saved once the over is complete, together with its balls
+        over_obj = Over(
             innings=innings_obj,
             over_number=over_number,
             bowler=bowler
@@ -283,10 +328,12 @@ class EnhancedMatchEngine:
                 # For simulation, we'll continue with same batsman
                 break
         
-        # Update over object
+        # Save over object and its balls
         over_obj.runs_scored = total_runs
         over_obj.wickets = wickets
         over_obj.save()
+        Ball.objects.bulk_create(self._pending_balls)
+        self._pending_balls = []
         
         return {
             'over_number': over_number,
@@ -298,15 +345,20 @@ class EnhancedMatchEngine:
 
     def simulate_innings(self, batting_team: Team, bowling_team: Team, 
                         innings_type: str, target_score: Optional[int] = None, 
-                        max_overs: int = 20) -> Dict:
-        """Simulate a complete innings with detailed tracking"""
+                        max_overs: int = 20, progress: Optional[Dict] = None) -> Dict:
+        """
+        Simulate a complete innings with detailed tracking.
+        
+        When ``progress`` is given (restored from a checkpoint), the innings
+        continues from the over after the last checkpointed one; its
+        over_summaries then cover only the overs bowled in this run.
+        """
         
-        # Create innings object
-        innings_obj = Innings.objects.create(
+        # Create innings object (or pick up the one being resumed)
+        innings_obj, _ = Innings.objects.get_or_create(
             match=self.match,
-            batting_team=batting_team,
-            bowling_team=bowling_team,
-            innings_type=innings_type
+            innings_type=innings_type,
+            defaults={'batting_team': batting_team, 'bowling_team': bowling_team}
         )
         
         batting_eleven = self.get_playing_eleven(batting_team)
@@ -333,60 +385,173 @@ class EnhancedMatchEngine:
         fielding_avg = sum(fielding_scores) // len(fielding_scores) if fielding_scores else 50
         
         # Initialize innings tracking
-        total_runs = 0
-        total_wickets = 0
-        overs_bowled = 0
-        current_batsman_idx = 0
-        over_summaries = []
-        
-        while (overs_bowled < max_overs and 
-               total_wickets < 10 and 
-               current_batsman_idx < len(batting_eleven) and
-               (target_score is None or total_runs < target_score)):
+        if progress is None:
+            progress = {
+                'total_runs': 0,
+                'total_wickets': 0,
+                'overs_bowled': 0,
+                'current_batsman_idx': 0,
+                'over_summaries': []
+            }
+        progress.setdefault('over_summaries', [])
+        
+        while (progress['overs_bowled'] < max_overs and 
+               progress['total_wickets'] < 10 and 
+               progress['current_batsman_idx'] < len(batting_eleven) and
+               (target_score is None or progress['total_runs'] < target_score)):
             
             # Select bowler (rotate)
-            bowler = bowlers[overs_bowled % len(bowlers)]
+            bowler = bowlers[progress['overs_bowled'] % len(bowlers)]
             
             # Current batsman
-            if current_batsman_idx < len(batting_eleven):
-                batsman = batting_eleven[current_batsman_idx]
-            else:
-                break
+            batsman = batting_eleven[progress['current_batsman_idx']]
             
             # Simulate over
             over_summary = self.simulate_over(
-                bowler, batsman, innings_obj, overs_bowled + 1, 
+                bowler, batsman, innings_obj, progress['overs_bowled'] + 1, 
                 wicketkeeper, fielding_avg
             )
-            over_summaries.append(over_summary)
+            progress['over_summaries'].append(over_summary)
             
-            total_runs += over_summary['runs']
-            total_wickets += over_summary['wickets']
+            progress['total_runs'] += over_summary['runs']
+            progress['total_wickets'] += over_summary['wickets']
             
             if over_summary['wickets'] > 0:
-                current_batsman_idx += 1
+                progress['current_batsman_idx'] += 1
             
-            overs_bowled += 1
+            progress['overs_bowled'] += 1
             
-            if target_score and total_runs >= target_score:
-                break
+            if self.checkpoints and progress['overs_bowled'] % self.CHECKPOINT_INTERVAL == 0:
+                self.save_checkpoint(innings_type, progress)
         
         # Update innings object
-        innings_obj.total_runs = total_runs
-        innings_obj.wickets_lost = total_wickets
-        innings_obj.overs_bowled = Decimal(str(overs_bowled))
+        innings_obj.total_runs = progress['total_runs']
+        innings_obj.wickets_lost = progress['total_wickets']
+        innings_obj.overs_bowled = Decimal(str(progress['overs_bowled']))
         innings_obj.save()
         
         return {
-            'innings_obj': innings_obj,
-            'total_runs': total_runs,
-            'total_wickets': total_wickets,
-            'overs_bowled': overs_bowled,
-            'over_summaries': over_summaries,
+            'innings_id': innings_obj.id,
+            'innings_type': innings_type,
+            'total_runs': progress['total_runs'],
+            'total_wickets': progress['total_wickets'],
+            'overs_bowled': progress['overs_bowled'],
+            'over_summaries': progress['over_summaries'],
             'batting_team': batting_team.name,
             'bowling_team': bowling_team.name
         }
 
+    @classmethod
+    def claim(cls, match: Match) -> bool:
+        """
+        Take the match for one simulation run. A scheduled match, or one left
+        IN_PROGRESS by a run whose lease (updated_at, renewed at every
+        checkpoint) has expired, is claimed with a conditional update; False
+        means another run holds it.
+        """
+        now = timezone.now()
+        claimed = Match.objects.filter(id=match.id).filter(
+            Q(status='SCHEDULED')
+            | Q(status='IN_PROGRESS', updated_at__lt=now - timedelta(seconds=cls.LEASE_SECONDS))
+        ).update(status='IN_PROGRESS', updated_at=now)
+        if claimed:
+            match.status = 'IN_PROGRESS'
+            match.updated_at = now
+        return bool(claimed)
+
+    def save_checkpoint(self, innings_type: str, progress: Dict):
+        """Persist the engine state after a completed over"""
+        version, internal_state, gauss_next = self.rng.getstate()
+        first_innings = self._first_innings
+        
+        # Totals and the cursor only: the saved Over rows are the record of earlier overs
+        state = {
+            'first_batting_id': self._first_batting.id,
+            'rng_state': [version, list(internal_state), gauss_next],
+            'progress': {k: v for k, v in progress.items() if k != 'over_summaries'},
+            'first_innings': first_innings and {k: v for k, v in first_innings.items() if k != 'over_summaries'},
+            'player_stats': {
+                str(player_id): {field: stats[field] for field in self.STAT_FIELDS}
+                for player_id, stats in self.player_stats.items()
+            },
+            'achievements': self.achievements.get_state()
+        }
+        
+        SimulationCheckpoint.objects.update_or_create(
+            match=self.match,
+            defaults={
+                'innings_type': innings_type,
+                'overs_completed': progress['overs_bowled'],
+                'state': state
+            }
+        )
+        # Renew the run's lease on the match
+        Match.objects.filter(id=self.match.id).update(updated_at=timezone.now())
+
+    def _restore_checkpoint(self, checkpoint: SimulationCheckpoint) -> Dict:
+        """Restore RNG, player statistics and achievement counters from a checkpoint"""
+        state = checkpoint.state
+        version, internal_state, gauss_next = state['rng_state']
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+        
+        for player_id, saved_stats in state['player_stats'].items():
+            if int(player_id) in self.player_stats:
+                self.player_stats[int(player_id)].update(saved_stats)
+        self.achievements.restore(state.get('achievements', {}))
+        
+        return state
+
+    @staticmethod
+    def _stored_over_summaries(innings_id: int, through_over: int) -> List[Dict]:
+        """Over summaries rebuilt from the saved Over and Ball rows, for overs bowled before a resume"""
+        overs = Over.objects.filter(innings_id=innings_id, over_number__lte=through_over).select_related(
+            'bowler'
+        ).prefetch_related(
+            Prefetch('balls', queryset=Ball.objects.select_related('batsman', 'fielder').order_by('ball_number'))
+        ).order_by('over_number')
+        
+        extra_names = {'WD': 'wides', 'NB': 'no_balls', 'B': 'byes', 'LB': 'leg_byes'}
+        return [
+            {
+                'over_number': over.over_number,
+                'bowler': over.bowler.name,
+                'balls': [
+                    {
+                        'outcome': ball.outcome,
+                        'runs': ball.runs,
+                        'is_wicket': ball.is_wicket,
+                        'batsman': ball.batsman.name,
+                        'details': {
+                            'dismissal_type': ball.dismissal_type,
+                            'fielder': ball.fielder.name if ball.fielder else None,
+                            'extras': {extra_names[ball.outcome]: ball.runs} if ball.outcome in extra_names else {}
+                        }
+                    }
+                    for ball in over.balls.all()
+                ],
+                'runs': over.runs_scored,
+                'wickets': over.wickets
+            }
+            for over in overs
+        ]
+
+    def _discard_uncheckpointed_rows(self, checkpoint: Optional[SimulationCheckpoint]):
+        """Delete innings/over rows written after the last checkpoint"""
+        innings = Innings.objects.filter(match=self.match)
+        
+        if checkpoint is None:
+            innings.delete()
+            return
+        
+        if checkpoint.innings_type == 'FIRST':
+            innings.filter(innings_type='SECOND').delete()
+        
+        Over.objects.filter(
+            innings__match=self.match,
+            innings__innings_type=checkpoint.innings_type,
+            over_number__gt=checkpoint.overs_completed
+        ).delete()
+
     def simulate_ball_outcome(self, bowler: Player, batsman: Player, 
                             wicketkeeper: Optional[Player] = None, 
                             fielding_avg: int = 50) -> str:
@@ -396,48 +561,91 @@ class EnhancedMatchEngine:
             "W": 4.5, "WD": 2.5, "NB": 0.5, "B": 0.25, "LB": 0.75
         }
         
-        return random.choices(list(base_weights.keys()), weights=list(base_weights.values()))[0]
+        return self.rng.choices(list(base_weights.keys()), weights=list(base_weights.values()))[0]
 
     def create_player_performances(self):
-        """Create PlayerPerformance records for all players"""
-        for player_id, stats in self.player_stats.items():
-            if stats['balls_faced'] > 0 or stats['overs_bowled'] > 0 or stats['catches'] > 0:
-                PlayerPerformance.objects.create(
-                    match=self.match,
-                    player=stats['player'],
-                    team=stats['team'],
-                    runs_scored=stats['runs_scored'],
-                    balls_faced=stats['balls_faced'],
-                    fours=stats['fours'],
-                    sixes=stats['sixes'],
-                    batting_position=stats['batting_position'],
-                    how_out=stats['how_out'],
-                    overs_bowled=Decimal(str(stats['overs_bowled'])),
-                    runs_conceded=stats['runs_conceded'],
-                    wickets_taken=stats['wickets_taken'],
-                    maidens=stats['maidens'],
-                    catches=stats['catches'],
-                    stumpings=stats['stumpings'],
-                    run_outs=stats['run_outs']
-                )
+        """Create PlayerPerformance records for all players and add them to career stats"""
+        performances = [
+            PlayerPerformance(
+                match=self.match,
+                player=stats['player'],
+                team=stats['team'],
+                runs_scored=stats['runs_scored'],
+                balls_faced=stats['balls_faced'],
+                fours=stats['fours'],
+                sixes=stats['sixes'],
+                batting_position=stats['batting_position'],
+                how_out=stats['how_out'],
+                overs_bowled=Decimal(str(stats['overs_bowled'])),
+                runs_conceded=stats['runs_conceded'],
+                wickets_taken=stats['wickets_taken'],
+                maidens=stats['maidens'],
+                catches=stats['catches'],
+                stumpings=stats['stumpings'],
+                run_outs=stats['run_outs']
+            )
+            for stats in self.player_stats.values()
+            if stats['balls_faced'] > 0 or stats['overs_bowled'] > 0 or stats['catches'] > 0
+        ]
+        PlayerPerformance.objects.bulk_create(performances)
+        CareerStatsCalculator.record_match(self.match, performances)
 
-    def simulate_match(self, max_overs: int = 20) -> Dict:
-        """Simulate a complete match with detailed statistics"""
+    def simulate_match(self, max_overs: int = 20, resume: bool = True,
+                       compact: bool = False) -> Dict:
+        """
+        Simulate a complete match with detailed statistics.
+        
+        If a checkpoint exists for the match (and ``resume`` is set), the
+        simulation continues from it instead of starting over. With
+        ``compact`` the result omits over summaries and per-player stats;
+        ball detail is then read back from the stored ``Ball`` rows.
+        The run claims the match first, so two requests can never simulate
+        (or discard the rows of) the same match at once; the one that loses
+        gets SimulationConflict.
+        """
+        if not self.claim(self.match):
+            raise SimulationConflict(f'Match {self.match.id} is already being simulated')
+        
+        checkpoint = None
+        if resume:
+            checkpoint = SimulationCheckpoint.objects.filter(match=self.match).first()
+        self._discard_uncheckpointed_rows(checkpoint)
+        
+        state = self._restore_checkpoint(checkpoint) if checkpoint else None
         
         # Toss
-        first_batting = random.choice([self.team1, self.team2])
+        if state:
+            first_batting = self.team1 if state['first_batting_id'] == self.team1.id else self.team2
+        else:
+            first_batting = self.rng.choice([self.team1, self.team2])
         second_batting = self.team2 if first_batting == self.team1 else self.team1
+        self._first_batting = first_batting
+        self._first_innings = None
         
         # First innings
-        first_innings = self.simulate_innings(
-            first_batting, second_batting, 'FIRST', max_overs=max_overs
-        )
+        if state and state['first_innings']:
+            first_innings = state['first_innings']
+        else:
+            first_innings = self.simulate_innings(
+                first_batting, second_batting, 'FIRST', max_overs=max_overs,
+                progress=state['progress'] if state else None
+            )
         target_score = first_innings['total_runs'] + 1
+        self._first_innings = first_innings
         
         # Second innings
+        second_progress = state['progress'] if state and state['first_innings'] else None
+        if second_progress is None and self.checkpoints:
+            self.save_checkpoint('SECOND', {
+                'total_runs': 0,
+                'total_wickets': 0,
+                'overs_bowled': 0,
+                'current_batsman_idx': 0
+            })
         second_innings = self.simulate_innings(
             second_batting, first_batting, 'SECOND', 
-            target_score=target_score, max_overs=max_overs
+            target_score=target_score, max_overs=max_overs,
+            progress=second_progress
         )
         
         # Determine winner
@@ -453,54 +661,136 @@ class EnhancedMatchEngine:
             runs_margin = first_innings['total_runs'] - second_innings['total_runs']
             margin = f"by {runs_margin} runs"
         
-        # Update match
-        self.match.status = 'COMPLETED'
-        self.match.winner = winner
-        
-        if first_batting == self.team1:
-            self.match.team1_score = first_innings['total_runs']
-            self.match.team1_wickets = first_innings['total_wickets']
-            self.match.team1_overs = Decimal(str(first_innings['overs_bowled']))
-            self.match.team2_score = second_innings['total_runs']
-            self.match.team2_wickets = second_innings['total_wickets']
-            self.match.team2_overs = Decimal(str(second_innings['overs_bowled']))
-        else:
-            self.match.team1_score = second_innings['total_runs']
-            self.match.team1_wickets = second_innings['total_wickets']
-            self.match.team1_overs = Decimal(str(second_innings['overs_bowled']))
-            self.match.team2_score = first_innings['total_runs']
-            self.match.team2_wickets = first_innings['total_wickets']
-            self.match.team2_overs = Decimal(str(first_innings['overs_bowled']))
-        
-        self.match.save()
-        
-        # Create player performance records
-        self.create_player_performances()
-        
-        # Update ratings
-        rating_changes = RatingSystem.update_ratings_after_match(self.match)
-        
-        # Check achievements
-        AchievementSystem.check_match_achievements(self.match)
-        
-        for user_id, (old_rating, new_rating) in rating_changes.items():
-            from django.contrib.auth.models import User
-            user = User.objects.get(id=user_id)
-            AchievementSystem.check_rating_achievements(user, old_rating, new_rating)
-        
-        return {
+        # Store the result; finalization is all-or-nothing so a retry never
+        # applies ratings twice
+        with transaction.atomic():
+            # Update match
+            self.match.status = 'COMPLETED'
+            self.match.winner = winner
+            
+            if first_batting == self.team1:
+                self.match.team1_score = first_innings['total_runs']
+                self.match.team1_wickets = first_innings['total_wickets']
+                self.match.team1_overs = Decimal(str(first_innings['overs_bowled']))
+                self.match.team2_score = second_innings['total_runs']
+                self.match.team2_wickets = second_innings['total_wickets']
+                self.match.team2_overs = Decimal(str(second_innings['overs_bowled']))
+            else:
+                self.match.team1_score = second_innings['total_runs']
+                self.match.team1_wickets = second_innings['total_wickets']
+                self.match.team1_overs = Decimal(str(second_innings['overs_bowled']))
+                self.match.team2_score = first_innings['total_runs']
+                self.match.team2_wickets = first_innings['total_wickets']
+                self.match.team2_overs = Decimal(str(first_innings['overs_bowled']))
+            
+            self.match.save()
+            
+            # Create player performance records
+            self.create_player_performances()
+            
+            players = {
+                player_id: (stats['player'].name, stats['team'].id)
+                for player_id, stats in self.player_stats.items()
+            }
+            
+            if self.defer_processing:
+                # Ratings and achievements are applied by the outbox consumer
+                MatchOutbox.publish_match_completed(self.match, self.achievements, players)
+                rating_changes = {}
+            else:
+                # Update ratings
+                rating_changes = RatingSystem.update_ratings_after_match(self.match)
+                
+                # Achievements detected while the balls were bowled, plus rating milestones
+                AchievementSystem.award_match(self.match, self.achievements, players, rating_changes)
+            
+            SimulationCheckpoint.objects.filter(match=self.match).delete()
+            
+        result = {
             'match_id': self.match.id,
             'team1': self.team1.name,
             'team2': self.team2.name,
             'winner': winner.name,
             'margin': margin,
-            'first_innings': first_innings,
-            'second_innings': second_innings,
             'pitch_condition': self.pitch_condition.name if self.pitch_condition else None,
             'weather_condition': self.weather_condition.name if self.weather_condition else None,
             'rating_changes': {
                 user_id: {'old': float(old), 'new': float(new)} 
                 for user_id, (old, new) in rating_changes.items()
             },
-            'player_performances': list(self.player_stats.values())
+            'ratings_pending': self.defer_processing
         }
+        
+        if compact:
+            result['scorecard'] = {
+                'team1': {
+                    'score': self.match.team1_score,
+                    'wickets': self.match.team1_wickets,
+                    'overs': float(self.match.team1_overs)
+                },
+                'team2': {
+                    'score': self.match.team2_score,
+                    'wickets': self.match.team2_wickets,
+                    'overs': float(self.match.team2_overs)
+                }
+            }
+            result['innings'] = [
+                {k: v for k, v in innings.items() if k != 'over_summaries'}
+                for innings in (first_innings, second_innings)
+            ]
+            return result
+        
+        # A resumed innings has summaries only for this run's overs; earlier ones come from the rows
+        for innings in (first_innings, second_innings):
+            summaries = innings.get('over_summaries', [])
+            missing = innings['overs_bowled'] - len(summaries)
+            if missing > 0:
+                innings['over_summaries'] = self._stored_over_summaries(innings['innings_id'], missing) + summaries
+        
+        result['first_innings'] = first_innings
+        result['second_innings'] = second_innings
+        result['player_performances'] = [
+            {
+                'player_id': stats['player'].id,
+                'player_name': stats['player'].name,
+                'team_id': stats['team'].id,
+                'team_name': stats['team'].name,
+                **{field: stats[field] for field in self.STAT_FIELDS}
+            }
+            for stats in self.player_stats.values()
+        ]
+        return result
+
+    @classmethod
+    def simulate_matches(cls, matches: List[Match], max_overs: int = 20) -> List[Dict]:
+        """
+        Simulate several matches, each committed in its own transaction.
+        
+        Involved teams are loaded once with their players prefetched, and
+        each team's playing eleven is shared by every engine it appears in.
+        Returns one outcome per match, in order: status COMPLETED with its
+        compact result, or FAILED with the error. A failed match is rolled
+        back on its own and left to retry, so the outcomes show exactly
+        which part of the batch was stored.
+        """
+        team_ids = {m.team1_id for m in matches} | {m.team2_id for m in matches}
+        teams = Team.objects.select_related('owner__cricket_profile').prefetch_related(
+            'players'
+        ).in_bulk(team_ids)
+        
+        playing_elevens = {}
+        outcomes = []
+        
+        # One transaction per match: locks are held for a match, not the whole batch
+        for match in matches:
+            match.team1 = teams[match.team1_id]
+            match.team2 = teams[match.team2_id]
+            try:
+                with transaction.atomic():
+                    engine = cls(match, playing_elevens=playing_elevens, checkpoints=False)
+                    result = engine.simulate_match(max_overs=max_overs, compact=True)
+                outcomes.append({'match_id': match.id, 'status': 'COMPLETED', 'result': result})
+            except Exception as e:
+                outcomes.append({'match_id': match.id, 'status': 'FAILED', 'error': str(e)})
+        
+        return outcomes
@@ -0,0 +1,185 @@
+# leaderboard.py - Ranked index over user ratings
+
+import math
+from decimal import Decimal
+from typing import Dict, List, Optional
+from django.db import transaction
+from django.db.models import Case, F, Q, Sum, When
+from .models import UserProfile, LeaderboardBucket, LeaderboardEntry
+
+
+class Leaderboard:
+    """
+    Maintain the leaderboard: one entry per user holding its rating, ranked
+    by rating (highest first) then user id, plus a count of entries per
+    whole rating point (LeaderboardBucket).
+
+    Ranks are not stored, so a rating change rewrites only the user's entry
+    and at most two bucket counts. A user's rank is the sum of the bucket
+    counts above its rating point (a few thousand rows at most, however
+    many users there are) plus its place among the entries in its own
+    point, counted on the (rating, user) index. A page finds the bucket it
+    starts in the same way and reads on from there, skipping only earlier
+    entries of that one rating point.
+    """
+
+    MAX_PAGE_SIZE = 100
+    ORDER = ('-rating', 'user_id')
+
+    @staticmethod
+    def _bucket(rating: Decimal) -> int:
+        return math.floor(rating)
+
+    @staticmethod
+    def _ahead_of(rating: Decimal, user_id: int) -> Q:
+        """Entries ranked above (rating, user_id)"""
+        return Q(rating__gt=rating) | Q(rating=rating, user_id__lt=user_id)
+
+    @staticmethod
+    def _behind(rating: Decimal, user_id: int) -> Q:
+        """Entries ranked below (rating, user_id)"""
+        return Q(rating__lt=rating) | Q(rating=rating, user_id__gt=user_id)
+
+    @staticmethod
+    def _count(buckets) -> int:
+        return buckets.aggregate(total=Sum('entries'))['total'] or 0
+
+    @classmethod
+    def _shift(cls, changes: Dict[int, int]):
+        """Apply entry count changes to buckets ({bucket: delta}) in one update"""
+        changes = {bucket: delta for bucket, delta in changes.items() if delta}
+        if not changes:
+            return
+        LeaderboardBucket.objects.bulk_create(
+            [LeaderboardBucket(rating=bucket) for bucket in sorted(changes)], ignore_conflicts=True
+        )
+        LeaderboardBucket.objects.filter(rating__in=changes).update(entries=Case(*[
+            When(rating=bucket, then=F('entries') + delta) for bucket, delta in changes.items()
+        ]))
+
+    @classmethod
+    def total(cls) -> int:
+        """Number of ranked users"""
+        return cls._count(LeaderboardBucket.objects.all())
+
+    @classmethod
+    def rank(cls, rating: Decimal, user_id: int) -> int:
+        """1-based rank of (rating, user_id)"""
+        bucket = cls._bucket(rating)
+        above = cls._count(LeaderboardBucket.objects.filter(rating__gt=bucket))
+        within = LeaderboardEntry.objects.filter(rating__gte=rating, rating__lt=bucket + 1).filter(
+            cls._ahead_of(rating, user_id)
+        ).count()
+        return above + within + 1
+
+    @classmethod
+    def move(cls, user_id: int, new_rating: Decimal) -> LeaderboardEntry:
+        """Set a user's rating, adding the user if it is not ranked yet"""
+        new_rating = Decimal(str(new_rating))
+        with transaction.atomic():
+            entry = LeaderboardEntry.objects.select_for_update().filter(user_id=user_id).first()
+            if entry is None:
+                entry = LeaderboardEntry.objects.create(user_id=user_id, rating=new_rating)
+                cls._shift({cls._bucket(new_rating): 1})
+                return entry
+
+            old_bucket, new_bucket = cls._bucket(entry.rating), cls._bucket(new_rating)
+            entry.rating = new_rating
+            entry.save(update_fields=['rating'])
+            if old_bucket != new_bucket:
+                cls._shift({old_bucket: -1, new_bucket: 1})
+            return entry
+
+    @classmethod
+    def add(cls, user_id: int, rating: Decimal) -> LeaderboardEntry:
+        """Put a user on the leaderboard at its rating"""
+        return cls.move(user_id, rating)
+
+    @classmethod
+    def remove(cls, user_id: int):
+        """Take a user off the leaderboard"""
+        with transaction.atomic():
+            entry = LeaderboardEntry.objects.select_for_update().filter(user_id=user_id).first()
+            if entry is not None:
+                entry.delete()
+                cls._shift({cls._bucket(entry.rating): -1})
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 1000) -> int:
+        """Rebuild the whole leaderboard from user profiles, e.g. after a rating replay"""
+        ratings = UserProfile.objects.values_list('user_id', 'current_rating')
+        counts = {}
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardBucket.objects.all().delete()
+            entries = []
+            for user_id, rating in ratings.iterator(chunk_size=10000):
+                bucket = cls._bucket(rating)
+                counts[bucket] = counts.get(bucket, 0) + 1
+                entries.append(LeaderboardEntry(user_id=user_id, rating=rating))
+            LeaderboardEntry.objects.bulk_create(entries, batch_size=batch_size)
+            LeaderboardBucket.objects.bulk_create(
+                [LeaderboardBucket(rating=bucket, entries=count) for bucket, count in counts.items()],
+                batch_size=batch_size
+            )
+        return len(entries)
+
+    @staticmethod
+    def _number(entries: List[LeaderboardEntry], first_rank: int) -> List[LeaderboardEntry]:
+        """Set consecutive ranks on entries already in leaderboard order"""
+        for rank, entry in enumerate(entries, start=first_rank):
+            entry.rank = rank
+        return entries
+
+    @classmethod
+    def page(cls, page: int = 1, page_size: int = 20) -> List[LeaderboardEntry]:
+        """Entries ranked ((page - 1) * page_size, page * page_size]"""
+        page_size = max(1, min(page_size, cls.MAX_PAGE_SIZE))
+        start = (max(page, 1) - 1) * page_size
+        
+        # Find the bucket the page starts in; only that bucket's earlier entries are skipped
+        skipped = 0
+        for bucket, count in LeaderboardBucket.objects.filter(entries__gt=0).order_by('-rating').values_list(
+            'rating', 'entries'
+        ):
+            if skipped + count > start:
+                entries = list(
+                    LeaderboardEntry.objects.filter(rating__lt=bucket + 1).select_related('user')
+                    .order_by(*cls.ORDER)[start - skipped:start - skipped + page_size]
+                )
+                return cls._number(entries, start + 1)
+            skipped += count
+        return []
+
+    @classmethod
+    def position(cls, user_id: int, around: int = 0) -> Optional[Dict]:
+        """
+        A user's rank and percentile, with `around` neighbours either side.
+        Percentile is the share of other users ranked below.
+        """
+        entry = LeaderboardEntry.objects.filter(user_id=user_id).select_related('user').first()
+        if entry is None:
+            return None
+
+        entry.rank = cls.rank(entry.rating, user_id)
+        total = cls.total()
+        around = max(0, min(around, cls.MAX_PAGE_SIZE // 2))
+        neighbours = []
+        if around:
+            entries = LeaderboardEntry.objects.select_related('user')
+            ahead = list(
+                entries.filter(rating__gte=entry.rating).filter(cls._ahead_of(entry.rating, user_id))
+                .order_by('rating', '-user_id')[:around]
+            )[::-1]
+            behind = list(
+                entries.filter(rating__lte=entry.rating).filter(cls._behind(entry.rating, user_id))
+                .order_by(*cls.ORDER)[:around]
+            )
+            neighbours = cls._number(ahead + [entry] + behind, entry.rank - len(ahead))
+
+        return {
+            'entry': entry,
+            'total': total,
+            'percentile': round(100 * (total - entry.rank) / (total - 1), 2) if total > 1 else 100.0,
+            'neighbours': neighbours
+        }
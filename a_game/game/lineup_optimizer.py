@@ -0,0 +1,282 @@
+# lineup_optimizer.py - Search for the strongest playing eleven against an opponent
+
+from math import comb
+from typing import Dict, List, Optional, Tuple
+from django.db.models import Prefetch, prefetch_related_objects
+from .models import Player, Team, Match, PitchCondition, WeatherCondition
+from .match_engine import MatchEngine
+from .enhanced_match_engine import EnhancedMatchEngine
+
+
+class LineupOptimizer:
+    """
+    Pick the playing eleven and batting order with the best expected run
+    margin against an opponent under the given conditions.
+
+    Candidates are scored analytically from MatchEngine's per-ball outcome
+    probabilities (no balls are simulated). The search starts from the
+    default eleven and repeatedly applies the best squad/eleven swap until
+    no swap improves the margin, then refines the batting order. Only the
+    MAX_BENCH strongest reserves (by overall_skill) are tried as swaps, so a
+    pass costs at most 11 * MAX_BENCH evaluations however large the squad.
+    Over expectations and whole-eleven scores are cached across candidates.
+    """
+
+    MIN_BOWLERS = 5
+    MAX_ITERATIONS = 20
+    MAX_BENCH = 14  # Reserves considered for swaps
+    EXTRA_OUTCOMES = ('Wide', 'No Ball')
+    BYE_OUTCOMES = ('Bye', 'Leg Bye')
+    BYE_EXPECTED_RUNS = 1.85  # Mean of MatchEngine's bye/leg bye runs
+
+    PLAYER_ATTRIBUTES = [
+        'bowling_attributes', 'batting_attributes',
+        'wicketkeeping_attributes', 'fielding_attributes'
+    ]
+
+    def __init__(self, team: Team, opponent: Team,
+                 pitch_condition: Optional[PitchCondition] = None,
+                 weather_condition: Optional[WeatherCondition] = None,
+                 max_overs: int = 20):
+        self.team = team
+        self.opponent = opponent
+        self.pitch_condition = pitch_condition
+        self.weather_condition = weather_condition
+        self.max_overs = max_overs
+
+        # Unsaved match only carries the conditions into the outcome model
+        self.engine = MatchEngine(Match(
+            team1=team, team2=opponent,
+            pitch_condition=pitch_condition, weather_condition=weather_condition
+        ))
+
+        prefetch_related_objects(
+            [team, opponent],
+            Prefetch('players', queryset=Player.objects.select_related(*self.PLAYER_ATTRIBUTES))
+        )
+        self.squad = list(team.players.all())
+        self.opponent_eleven = EnhancedMatchEngine.select_playing_eleven(opponent)
+
+        squad_bowlers = sum(1 for p in self.squad if self._is_bowler(p))
+        self.min_bowlers = min(self.MIN_BOWLERS, squad_bowlers)
+
+        # Caches of partial evaluations
+        self._over_cache = {}
+        self._batting_value_cache = {}
+        self._evaluations = {}
+        self.pruned = 0
+
+    @staticmethod
+    def _is_bowler(player: Player) -> bool:
+        return bool(player.bowling and player.bowling > 0)
+
+    @staticmethod
+    def _is_keeper(player: Player) -> bool:
+        return bool(player.wicketkeeping and player.wicketkeeping > 0)
+
+    def _bowling_setup(self, eleven: List[Player]) -> Tuple[List[Player], Optional[Player], int]:
+        """Bowlers, wicketkeeper and fielding average, chosen as MatchEngine does"""
+        wicketkeeper = next((p for p in eleven if self._is_keeper(p)), None)
+        bowlers = [p for p in eleven if self._is_bowler(p)] or list(eleven[:6])
+        fielding_scores = [p.fielding for p in eleven if p.fielding is not None]
+        fielding_avg = sum(fielding_scores) // len(fielding_scores) if fielding_scores else 50
+        return bowlers, wicketkeeper, fielding_avg
+
+    def _over_expectation(self, bowler: Player, batsman: Player,
+                          wicketkeeper: Optional[Player],
+                          fielding_avg: int) -> Tuple[float, List[float]]:
+        """
+        Expected runs in one over and the probability of 0-6 wickets in it.
+        """
+        key = (bowler.id, batsman.id, wicketkeeper.id if wicketkeeper else None, fielding_avg)
+
+        if key not in self._over_cache:
+            probabilities = self.engine.expected_outcome_probabilities(
+                bowler, batsman, wicketkeeper, fielding_avg
+            )
+            extra_p = sum(probabilities[o] for o in self.EXTRA_OUTCOMES)
+            valid_p = 1 - extra_p
+
+            runs_per_ball = sum(int(o) * p for o, p in probabilities.items() if o.isdigit())
+            runs_per_ball += self.BYE_EXPECTED_RUNS * sum(probabilities[o] for o in self.BYE_OUTCOMES)
+            wicket_p = probabilities['W'] / valid_p
+
+            # Six legal balls, plus one run per wide/no ball bowled on the way
+            expected_runs = 6 * runs_per_ball / valid_p + 6 * extra_p / valid_p
+            wickets = [
+                comb(6, k) * wicket_p ** k * (1 - wicket_p) ** (6 - k)
+                for k in range(7)
+            ]
+            self._over_cache[key] = (expected_runs, wickets)
+
+        return self._over_cache[key]
+
+    def expected_innings_runs(self, batting_order: List[Player],
+                              bowling_eleven: List[Player]) -> float:
+        """
+        Expected innings total, following MatchEngine's innings rules: bowlers
+        rotate every over and the next batsman comes in after an over in
+        which a wicket fell.
+        """
+        bowlers, wicketkeeper, fielding_avg = self._bowling_setup(bowling_eleven)
+
+        # (batsman index, wickets) -> probability the innings is in that state
+        states = {(0, 0): 1.0}
+        expected = 0.0
+
+        for over in range(self.max_overs):
+            bowler = bowlers[over % len(bowlers)]
+            next_states = {}
+
+            for (batsman_idx, wickets), probability in states.items():
+                if wickets >= 10 or batsman_idx >= len(batting_order):
+                    continue  # Innings over
+
+                runs, wicket_distribution = self._over_expectation(
+                    bowler, batting_order[batsman_idx], wicketkeeper, fielding_avg
+                )
+                expected += probability * runs
+
+                for fallen, p_fallen in enumerate(wicket_distribution):
+                    if fallen == 0:
+                        state = (batsman_idx, wickets)
+                    else:
+                        state = (batsman_idx + 1, min(10, wickets + fallen))
+                    next_states[state] = next_states.get(state, 0.0) + probability * p_fallen
+
+            states = next_states
+            if not states:
+                break
+
+        return expected
+
+    def evaluate(self, eleven: List[Player]) -> Tuple[float, float, float]:
+        """Return (expected margin, runs scored, runs conceded) for an ordered eleven"""
+        key = tuple(p.id for p in eleven)
+
+        if key not in self._evaluations:
+            scored = self.expected_innings_runs(eleven, self.opponent_eleven)
+            conceded = self.expected_innings_runs(self.opponent_eleven, eleven)
+            self._evaluations[key] = (scored - conceded, scored, conceded)
+
+        return self._evaluations[key]
+
+    def _batting_value(self, player: Player) -> float:
+        """Expected runs per dismissal against the opponent's attack"""
+        if player.id not in self._batting_value_cache:
+            bowlers, wicketkeeper, fielding_avg = self._bowling_setup(self.opponent_eleven)
+            runs = 0.0
+            wickets = 0.0
+            for bowler in bowlers:
+                over_runs, distribution = self._over_expectation(
+                    bowler, player, wicketkeeper, fielding_avg
+                )
+                runs += over_runs
+                wickets += sum(k * p for k, p in enumerate(distribution))
+            self._batting_value_cache[player.id] = runs / max(wickets, 1e-6)
+
+        return self._batting_value_cache[player.id]
+
+    def _order_batting(self, eleven: List[Player]) -> List[Player]:
+        """Order an eleven by expected runs per dismissal, best first"""
+        return sorted(eleven, key=self._batting_value, reverse=True)
+
+    def _is_viable(self, candidate: List[Player], current: List[Player]) -> bool:
+        """
+        Prune swaps that move away from a balanced side: losing a bowler
+        while short of MIN_BOWLERS, or dropping the only wicketkeeper.
+        """
+        candidate_bowlers = sum(1 for p in candidate if self._is_bowler(p))
+        current_bowlers = sum(1 for p in current if self._is_bowler(p))
+        if candidate_bowlers < min(self.min_bowlers, current_bowlers):
+            return False
+        if any(self._is_keeper(p) for p in current) and not any(self._is_keeper(p) for p in candidate):
+            return False
+        return True
+
+    def _refine_batting_order(self, eleven: List[Player]) -> List[Player]:
+        """Swap neighbouring batsmen while that improves the margin"""
+        best = list(eleven)
+        improved = True
+
+        while improved:
+            improved = False
+            for i in range(len(best) - 1):
+                candidate = list(best)
+                candidate[i], candidate[i + 1] = candidate[i + 1], candidate[i]
+                if self.evaluate(candidate)[0] > self.evaluate(best)[0]:
+                    best = candidate
+                    improved = True
+
+        return best
+
+    def optimize(self) -> Dict:
+        """
+        Search for the best eleven and batting order.
+
+        Returns:
+            Dictionary with the chosen eleven (in batting order), its
+            expected runs scored/conceded, and the default eleven's figures
+        """
+        if not self.squad:
+            raise ValueError(f"Team {self.team.name} has no players")
+
+        current = EnhancedMatchEngine.select_playing_eleven(self.team)
+        current_margin, current_scored, current_conceded = self.evaluate(current)
+
+        best = self._order_batting(current)
+        if self.evaluate(current)[0] > self.evaluate(best)[0]:
+            best = current
+
+        current_ids = {p.id for p in current}
+        reserves = sorted(
+            (p for p in self.squad if p.id not in current_ids),
+            key=lambda p: p.overall_skill,
+            reverse=True
+        )[:self.MAX_BENCH]
+        candidates = current + reserves
+
+        for _ in range(self.MAX_ITERATIONS):
+            selected_ids = {p.id for p in best}
+            bench = [p for p in candidates if p.id not in selected_ids]
+            best_candidate = None
+            best_margin = self.evaluate(best)[0]
+
+            for out_player in best:
+                for in_player in bench:
+                    candidate = [in_player if p.id == out_player.id else p for p in best]
+                    if not self._is_viable(candidate, best):
+                        self.pruned += 1
+                        continue
+
+                    candidate = self._order_batting(candidate)
+                    margin = self.evaluate(candidate)[0]
+                    if margin > best_margin:
+                        best_candidate = candidate
+                        best_margin = margin
+
+            if best_candidate is None:
+                break
+            best = best_candidate
+
+        best = self._refine_batting_order(best)
+        margin, scored, conceded = self.evaluate(best)
+
+        return {
+            'team': self.team.name,
+            'opponent': self.opponent.name,
+            'pitch_condition': self.pitch_condition.name if self.pitch_condition else None,
+            'weather_condition': self.weather_condition.name if self.weather_condition else None,
+            'playing_eleven': best,
+            'expected_runs_scored': round(scored, 2),
+            'expected_runs_conceded': round(conceded, 2),
+            'expected_margin': round(margin, 2),
+            'current_eleven': {
+                'player_ids': [p.id for p in current],
+                'expected_runs_scored': round(current_scored, 2),
+                'expected_runs_conceded': round(current_conceded, 2),
+                'expected_margin': round(current_margin, 2)
+            },
+            'candidates_evaluated': len(self._evaluations),
+            'candidates_pruned': self.pruned
+        }
@@ -0,0 +1,218 @@
+# lot_scheduler.py - Run auction lots on timers
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from .models import Auction, AuctionLot
+from .auction_stream import AuctionStream
+from .bidding import BiddingSystem
+
+logger = logging.getLogger(__name__)
+
+
+class LotScheduler:
+    """
+    Run every ACTIVE auction one lot at a time, in pool order.
+
+    A lot opens for lot_seconds (LOT_SECONDS by default), is called "going once" and "going twice"
+    CALL_SECONDS apart before it closes, and is sold to its highest bid
+    (or left unsold) when the time is up; the auction's next lot then
+    opens. Bids only move the lot's closes_at in the database, so each
+    timer re-reads it when it fires and re-arms if the close was pushed
+    back.
+
+    All lots share one event loop: a timer is an entry in the loop's heap,
+    not a thread, so a single process handles thousands of running lots.
+    Database work runs on Django's sync thread. Run one scheduler per
+    deployment (manage.py run_auctions, or in the ASGI process with
+    AUCTION_SCHEDULER=True).
+    """
+
+    LOT_SECONDS = 30
+    CALL_SECONDS = 5
+    SCAN_SECONDS = 2  # How often to look for auctions that have just gone ACTIVE
+    TOLERANCE = 0.05  # Timer jitter allowed when deciding which call is due
+
+    # Sync steps (run on the database thread)
+
+    @classmethod
+    def open_next_lot(cls, auction_id: int, lot_seconds: int = LOT_SECONDS) -> Optional[Tuple[int, datetime]]:
+        """
+        Open an auction's next pending lot for lot_seconds, or complete the
+        auction when none are left. Returns (lot_id, closes_at) of the open lot.
+        """
+        with transaction.atomic():
+            auction = Auction.objects.select_for_update().filter(id=auction_id, status='ACTIVE').first()
+            if auction is None:
+                return None
+
+            lot = AuctionLot.objects.filter(auction=auction, status='OPEN').first()
+            if lot is not None:
+                return lot.id, lot.closes_at
+
+            # Players added to the pool outside the API still get a lot
+            pool = auction.players_pool.through.objects.filter(auction=auction).order_by('id')
+            BiddingSystem.open_lots(auction, [entry.player for entry in pool.select_related('player')])
+
+            lot = AuctionLot.objects.filter(auction=auction, status='PENDING').order_by('id').first()
+            if lot is None:
+                auction.status = 'COMPLETED'
+                auction.end_time = timezone.now()
+                auction.save(update_fields=['status', 'end_time', 'updated_at'])
+                AuctionStream.publish(auction.id, 'auction_completed')
+                return None
+
+            lot.status = 'OPEN'
+            lot.closes_at = timezone.now() + timedelta(seconds=lot_seconds)
+            lot.save(update_fields=['status', 'closes_at', 'updated_at'])
+            AuctionStream.publish(
+                auction.id, 'lot_opened', player_id=lot.player_id,
+                highest_amount=lot.highest_amount, closes_at=lot.closes_at.isoformat()
+            )
+            return lot.id, lot.closes_at
+
+    @classmethod
+    def close_lot(cls, lot_id: int) -> Optional[datetime]:
+        """
+        Close a lot whose time is up: finalize its highest bid, or mark it
+        unsold. Returns the new closes_at instead if a late bid moved it.
+        """
+        with transaction.atomic():
+            lot = AuctionLot.objects.select_for_update().select_related('highest_bid').filter(
+                id=lot_id, status='OPEN'
+            ).first()
+            if lot is None:
+                return None
+            if lot.closes_at > timezone.now():
+                return lot.closes_at
+
+            bid = lot.highest_bid
+            if bid is not None and bid.status == 'ACTIVE':
+                try:
+                    BiddingSystem.finalize(bid)
+                    return None
+                except ValueError:
+                    pass  # The team can no longer pay; the lot goes unsold
+
+            BiddingSystem.pass_lot(lot)
+            return None
+
+    @classmethod
+    def lot_state(cls, lot_id: int) -> Optional[Tuple[int, datetime]]:
+        """(auction_id, closes_at) of an open lot"""
+        return AuctionLot.objects.filter(id=lot_id, status='OPEN').values_list(
+            'auction_id', 'closes_at'
+        ).first()
+
+    @classmethod
+    def announce(cls, lot_id: int, call: str):
+        lot = AuctionLot.objects.filter(id=lot_id).values(
+            'auction_id', 'player_id', 'highest_amount', 'closes_at'
+        ).first()
+        if lot:
+            AuctionStream.publish(
+                lot['auction_id'], call, player_id=lot['player_id'],
+                highest_amount=lot['highest_amount'], closes_at=lot['closes_at'].isoformat()
+            )
+
+    @classmethod
+    def auctions_to_start(cls) -> List[int]:
+        """ACTIVE auctions with no open lot: just started, or left between lots"""
+        open_lot = AuctionLot.objects.filter(auction=OuterRef('pk'), status='OPEN')
+        return list(Auction.objects.filter(status='ACTIVE').exclude(Exists(open_lot)).values_list('id', flat=True))
+
+    @classmethod
+    def open_lots_now(cls) -> List[Tuple[int, int, datetime]]:
+        return list(AuctionLot.objects.filter(status='OPEN').values_list('id', 'auction_id', 'closes_at'))
+
+    # Event loop
+
+    def __init__(self, lot_seconds: int = LOT_SECONDS):
+        self.lot_seconds = lot_seconds
+        self.timers: Dict[int, asyncio.TimerHandle] = {}
+        self.calls: Dict[int, int] = {}  # lot_id -> calls announced (0, 1 going once, 2 going twice)
+        self.tasks = set()
+
+    async def run(self):
+        """Run lots until cancelled"""
+        while True:
+            try:
+                await self.scan()
+            except Exception:
+                # A failed scan (e.g. a dropped connection) is retried on the next one
+                logger.exception('Auction lot scan failed')
+            await asyncio.sleep(self.SCAN_SECONDS)
+
+    async def scan(self):
+        # Lots without a timer: open before a restart, or whose timer failed
+        for lot_id, auction_id, closes_at in await sync_to_async(self.open_lots_now)():
+            if lot_id not in self.timers:
+                self._arm(lot_id, closes_at)
+        for auction_id in await sync_to_async(self.auctions_to_start)():
+            await self._start_next(auction_id)
+
+    async def _start_next(self, auction_id: int):
+        opened = await sync_to_async(self.open_next_lot)(auction_id, self.lot_seconds)
+        if opened and opened[0] not in self.timers:
+            self._arm(*opened)
+
+    def _arm(self, lot_id: int, closes_at: datetime):
+        """Set the lot's timer for its next call, or for its close"""
+        remaining = (closes_at - timezone.now()).total_seconds()
+        calls = self.calls.get(lot_id, 0)
+        if calls == 0:
+            delay = remaining - 2 * self.CALL_SECONDS
+        elif calls == 1:
+            delay = remaining - self.CALL_SECONDS
+        else:
+            delay = remaining
+
+        loop = asyncio.get_running_loop()
+        self.timers[lot_id] = loop.call_at(loop.time() + max(delay, 0), self._spawn, lot_id)
+
+    def _spawn(self, lot_id: int):
+        task = asyncio.create_task(self._fire(lot_id))
+        self.tasks.add(task)
+        task.add_done_callback(lambda done: self._done(lot_id, done))
+
+    def _done(self, lot_id: int, task: asyncio.Task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error('Timer for lot %s failed', lot_id, exc_info=task.exception())
+            self._forget(lot_id)  # The next scan re-arms it
+
+    async def _fire(self, lot_id: int):
+        state = await sync_to_async(self.lot_state)(lot_id)
+        if state is None:  # Sold or closed by hand in the meantime
+            self._forget(lot_id)
+            return
+
+        auction_id, closes_at = state
+        remaining = (closes_at - timezone.now()).total_seconds()
+        if remaining <= self.TOLERANCE:
+            extended = await sync_to_async(self.close_lot)(lot_id)
+            if extended:
+                self.calls[lot_id] = 0
+                self._arm(lot_id, extended)
+                return
+            self._forget(lot_id)
+            await self._start_next(auction_id)
+            return
+
+        # Which call is due now; a late bid restarts the calling
+        due = 2 if remaining <= self.CALL_SECONDS + self.TOLERANCE else (
+            1 if remaining <= 2 * self.CALL_SECONDS + self.TOLERANCE else 0
+        )
+        if due and due != self.calls.get(lot_id, 0):
+            await sync_to_async(self.announce)(lot_id, 'going_twice' if due == 2 else 'going_once')
+        self.calls[lot_id] = due
+        self._arm(lot_id, closes_at)
+
+    def _forget(self, lot_id: int):
+        self.timers.pop(lot_id, None)
+        self.calls.pop(lot_id, None)
@@ -0,0 +1,45 @@
+# game/management/commands/compact_bids.py
+import time
+from django.core.management.base import BaseCommand
+from game.bid_archive import BidArchive
+
+class Command(BaseCommand):
+    help = 'Move superseded bids from the live bids table into the bid history'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BidArchive.BATCH_SIZE,
+            help=f'Bids archived per transaction (default: {BidArchive.BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=BidArchive.MIN_AGE,
+            help=f'Only archive bids superseded at least this many seconds ago (default: {BidArchive.MIN_AGE})'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Compact once and exit instead of polling'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=60.0,
+            help='Seconds between compactions (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            totals = BidArchive.compact(batch_size=options['batch_size'], min_age=options['min_age'])
+            if totals['archived']:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Archived {totals['archived']} bids in {totals['batches']} batches"
+                    )
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
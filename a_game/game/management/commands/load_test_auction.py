@@ -0,0 +1,324 @@
+# game/management/commands/load_test_auction.py
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, F, Max, Sum
+from django.test import Client
+from django.utils import timezone
+from game.models import Auction, AuctionLot, Bid, BudgetReservation, Player, Team
+from game.bidding import BiddingSystem
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the bid API: seed an auction with sample teams and players, '
+        'let one bidder agent per team bid against POST /api/bids/, then report '
+        'throughput, latency, rejections and consistency violations. Requests run '
+        'in-process against the configured database, so point it at a disposable one.'
+    )
+
+    STRATEGIES = ['incremental', 'jump', 'mixed']
+    INCREMENT = 10000
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--teams',
+            type=int,
+            default=50,
+            help='Bidding teams, one agent each (default: 50)'
+        )
+        parser.add_argument(
+            '--players',
+            type=int,
+            default=500,
+            help='Players in the auction pool (default: 500)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30.0,
+            help='Seconds to keep bidding (default: 30)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Requests in flight at once (default: 16)'
+        )
+        parser.add_argument(
+            '--think-ms',
+            type=int,
+            default=0,
+            help='Longest random pause an agent takes between bids (default: 0)'
+        )
+        parser.add_argument(
+            '--strategy',
+            choices=self.STRATEGIES,
+            default='mixed',
+            help='incremental: raise by the minimum step; jump: bid halfway to the valuation; '
+                 'mixed: a random one per agent (default: mixed)'
+        )
+        parser.add_argument(
+            '--no-close',
+            action='store_true',
+            help='Leave the auction open instead of closing it and checking the sales'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed for valuations and agent choices'
+        )
+
+    def handle(self, *args, **options):
+        if options['teams'] < 2 or options['players'] < 1:
+            raise CommandError('Need at least 2 teams and 1 player')
+        random.seed(options['seed'])
+
+        auction, teams, players = self.seed_auction(options['teams'], options['players'])
+        starting_money = {team.id: team.money_left for team in teams}
+        self.stdout.write(
+            f'Auction {auction.id}: {len(teams)} agents bidding on {len(players)} lots '
+            f"for {options['duration']:g}s"
+        )
+
+        self.auction_id = auction.id
+        self.results = []
+        self.prices = {player.id: (0, None) for player in players}  # What agents have seen: (amount, team_id)
+        self.client = threading.local()
+
+        # Rejections and failures are counted in the report instead of logged one by one
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+        started = time.perf_counter()
+        asyncio.run(self.run_agents(teams, players, options))
+        elapsed = time.perf_counter() - started
+
+        violations = self.check_bidding(auction)
+        if not options['no_close']:
+            auction.close()
+            violations += self.check_sales(auction, starting_money)
+
+        self.report(elapsed, violations)
+        if violations:
+            raise CommandError(f'{len(violations)} consistency violations')
+
+    # Setup
+
+    def seed_auction(self, teams_count, players_count):
+        last_team = Team.objects.aggregate(last=Max('id'))['last'] or 0
+        last_player = Player.objects.aggregate(last=Max('id'))['last'] or 0
+        call_command('create_sample_data', teams=teams_count, players=players_count, stdout=StringIO())
+
+        teams = list(Team.objects.filter(id__gt=last_team).order_by('id'))
+        players = list(Player.objects.filter(id__gt=last_player).order_by('id'))
+        auction = Auction.objects.create(
+            name=f'Load test {timezone.now():%Y-%m-%d %H:%M:%S}',
+            status='ACTIVE',
+            start_time=timezone.now()
+        )
+        auction.participating_teams.add(*teams)
+        auction.players_pool.add(*players)
+        BiddingSystem.open_lots(auction, players)
+        return auction, teams, players
+
+    def valuations(self, players):
+        """An agent's private value for each player: base price scaled by skill, with its own taste"""
+        return {
+            player.id: int(player.base_price * player.overall_skill / 50 * random.uniform(0.5, 1.5))
+            for player in players
+        }
+
+    # Agents
+
+    async def run_agents(self, teams, players, options):
+        deadline = time.perf_counter() + options['duration']
+        executor = ThreadPoolExecutor(options['concurrency'])
+        try:
+            agents = []
+            for team in teams:
+                strategy = options['strategy']
+                if strategy == 'mixed':
+                    strategy = random.choice(['incremental', 'jump'])
+                agents.append(self.agent(
+                    team, strategy, self.valuations(players), executor, deadline, options['think_ms']
+                ))
+            await asyncio.gather(*agents)
+        finally:
+            executor.shutdown(wait=True)
+
+    async def agent(self, team, strategy, valuations, executor, deadline, think_ms):
+        loop = asyncio.get_running_loop()
+        ceiling = None  # Learned from budget rejections; forgotten after a while
+        ceiling_until = 0.0
+
+        while time.perf_counter() < deadline:
+            if think_ms:
+                await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+            if ceiling is not None and time.perf_counter() > ceiling_until:
+                ceiling = None
+
+            wanted = []
+            for player_id, value in valuations.items():
+                amount, leader_id = self.prices[player_id]
+                bid = self.next_bid(strategy, amount, value)
+                if leader_id != team.id and bid is not None and (ceiling is None or bid <= ceiling):
+                    wanted.append((player_id, bid))
+            if not wanted:
+                await asyncio.sleep(0.05)  # Nothing worth it now; wait for prices to move
+                continue
+
+            player_id, amount = random.choice(wanted)
+            status_code, body, latency = await loop.run_in_executor(
+                executor, self.post_bid, team.id, player_id, amount
+            )
+            self.record(team, player_id, amount, status_code, body, latency)
+            if status_code == 400 and body.get('error') == 'Insufficient budget':
+                ceiling = amount - 1
+                ceiling_until = time.perf_counter() + 1
+
+    def next_bid(self, strategy, amount, value):
+        """What an agent offers for a lot at `amount`, or None if it is past its valuation"""
+        minimum = amount + self.INCREMENT
+        if minimum > value:
+            return None
+        if strategy == 'jump':
+            return max(minimum, (amount + value) // 2)
+        return minimum
+
+    def post_bid(self, team_id, player_id, amount):
+        """Send one bid through the full request stack; runs on an executor thread"""
+        client = getattr(self.client, 'instance', None)
+        if client is None:
+            host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h and not h.startswith('.')), 'localhost')
+            client = self.client.instance = Client(SERVER_NAME=host)
+
+        payload = {'auction': self.auction_id, 'player': player_id, 'team': team_id, 'amount': amount}
+        started = time.perf_counter()
+        try:
+            response = client.post('/api/bids/', json.dumps(payload), content_type='application/json')
+            status_code, body = response.status_code, response.json() if response.content else {}
+        except Exception as e:
+            status_code, body = 0, {'error': type(e).__name__}
+        return status_code, body, time.perf_counter() - started
+
+    def record(self, team, player_id, amount, status_code, body, latency):
+        if status_code == 201:
+            outcome = 'accepted'
+            if body['status'] == 'ACTIVE':
+                self.prices[player_id] = max(self.prices[player_id], (amount, team.id), key=lambda price: price[0])
+        elif status_code == 400:
+            error = body.get('error') if isinstance(body, dict) else None
+            if error is None:
+                outcome = 'rejected: invalid request'
+            else:
+                # Learn the price from "higher than current highest bid of $X"
+                current = re.search(r'\$(\d+)', error)
+                if current and int(current.group(1)) > self.prices[player_id][0]:
+                    self.prices[player_id] = (int(current.group(1)), None)
+                outcome = f"rejected: {error.split(' of $')[0]}"
+        else:
+            outcome = f'error: {status_code or body["error"]}'
+        self.results.append((outcome, latency))
+
+    # Checks
+
+    def check_bidding(self, auction):
+        """Invariants that must hold for an open auction"""
+        violations = []
+
+        for lot in AuctionLot.objects.filter(auction=auction, highest_bid__isnull=False).select_related('highest_bid'):
+            bid = lot.highest_bid
+            if (bid.amount, bid.team_id) != (lot.highest_amount, lot.highest_team_id):
+                violations.append(f'Lot {lot.id} records ${lot.highest_amount} but its highest bid {bid.id} is ${bid.amount}')
+            if bid.status != 'ACTIVE':
+                violations.append(f'Lot {lot.id} is led by bid {bid.id} with status {bid.status}')
+
+        highest = Bid.objects.filter(auction=auction).values('player_id').annotate(top=Max('amount'))
+        recorded = dict(AuctionLot.objects.filter(auction=auction).values_list('player_id', 'highest_amount'))
+        for row in highest:
+            if row['top'] != recorded.get(row['player_id']):
+                violations.append(f"Player {row['player_id']} has a ${row['top']} bid above the lot's ${recorded.get(row['player_id'])}")
+
+        for row in Bid.objects.filter(auction=auction, status='ACTIVE').values('player_id').annotate(n=Count('id')).filter(n__gt=1):
+            violations.append(f"Player {row['player_id']} has {row['n']} active bids")
+
+        leading = dict(
+            AuctionLot.objects.filter(auction=auction, highest_bid__status='ACTIVE').values(
+                'highest_team_id'
+            ).annotate(total=Sum('highest_amount')).values_list('highest_team_id', 'total')
+        )
+        team_ids = auction.participating_teams.values_list('id', flat=True)
+        for reservation in BudgetReservation.objects.filter(team_id__in=team_ids).select_related('team'):
+            if reservation.reserved != leading.get(reservation.team_id, 0):
+                violations.append(
+                    f'Team {reservation.team_id} has ${reservation.reserved} reserved but leads with '
+                    f'${leading.get(reservation.team_id, 0)}'
+                )
+            if reservation.reserved > reservation.team.money_left:
+                violations.append(
+                    f'Team {reservation.team_id} leads with ${reservation.reserved}, more than its '
+                    f'${reservation.team.money_left}'
+                )
+        return violations
+
+    def check_sales(self, auction, starting_money):
+        """Invariants that must hold once the auction is closed"""
+        violations = []
+        won = Bid.objects.filter(auction=auction, status='WON')
+
+        for row in won.values('player_id').annotate(n=Count('id')).filter(n__gt=1):
+            violations.append(f"Player {row['player_id']} has {row['n']} won bids")
+
+        for bid in won.exclude(player__team_id=F('team_id')).select_related('player'):
+            violations.append(f'Player {bid.player_id} was won by team {bid.team_id} but plays for {bid.player.team_id}')
+        for bid in won.exclude(player__sold_price=F('amount')).select_related('player'):
+            violations.append(f'Player {bid.player_id} was won for ${bid.amount} but sold for ${bid.player.sold_price}')
+
+        spent = dict(won.values('team_id').annotate(total=Sum('amount')).values_list('team_id', 'total'))
+        for team_id, money_left in Team.objects.filter(id__in=starting_money).values_list('id', 'money_left'):
+            if money_left < 0:
+                violations.append(f'Team {team_id} overspent: ${money_left} left')
+            if starting_money[team_id] - money_left != spent.get(team_id, 0):
+                violations.append(
+                    f'Team {team_id} was debited ${starting_money[team_id] - money_left} '
+                    f'for ${spent.get(team_id, 0)} of players'
+                )
+        return violations
+
+    # Report
+
+    def report(self, elapsed, violations):
+        latencies = sorted(latency for _, latency in self.results)
+        total = len(self.results)
+        outcomes = {}
+        for outcome, _ in self.results:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        rejected = sum(count for outcome, count in outcomes.items() if outcome.startswith('rejected'))
+
+        def percentile(p):
+            return latencies[min(int(p / 100 * total), total - 1)] * 1000 if total else 0
+
+        self.stdout.write(f'Requests:    {total} in {elapsed:.1f}s ({total / elapsed:.0f}/s)')
+        self.stdout.write(
+            f'Latency ms:  p50 {percentile(50):.1f}  p90 {percentile(90):.1f}  '
+            f'p99 {percentile(99):.1f}  max {percentile(100):.1f}'
+        )
+        self.stdout.write(f"Accepted:    {outcomes.get('accepted', 0)}")
+        self.stdout.write(f'Rejected:    {rejected} ({rejected / total:.1%})' if total else 'Rejected:    0')
+        for outcome, count in sorted(outcomes.items(), key=lambda item: -item[1]):
+            if outcome != 'accepted':
+                self.stdout.write(f'  {outcome}: {count}')
+
+        if violations:
+            for violation in violations:
+                self.stdout.write(self.style.ERROR(violation))
+        else:
+            self.stdout.write(self.style.SUCCESS('No consistency violations'))
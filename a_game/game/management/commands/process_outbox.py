@@ -0,0 +1,40 @@
+# game/management/commands/process_outbox.py
+import time
+from django.core.management.base import BaseCommand
+from game.outbox import MatchOutbox
+
+class Command(BaseCommand):
+    help = 'Apply ratings and achievements for completed matches waiting in the outbox'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=MatchOutbox.BATCH_SIZE,
+            help=f'Events applied per transaction (default: {MatchOutbox.BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox and exit instead of polling'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait when the outbox is empty (default: 2)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            totals = MatchOutbox.process(batch_size=options['batch_size'])
+            if totals['processed'] or totals['failed']:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Processed {totals['processed']} events in {totals['batches']} batches "
+                        f"({totals['failed']} failed)"
+                    )
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
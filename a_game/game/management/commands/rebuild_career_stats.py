@@ -0,0 +1,22 @@
+# game/management/commands/rebuild_career_stats.py
+from django.core.management.base import BaseCommand
+from game.career_stats import CareerStatsCalculator
+
+class Command(BaseCommand):
+    help = 'Rebuild the user and player career statistics tables from match performances'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        summary = CareerStatsCalculator.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {summary['player_rows']} player and {summary['user_rows']} user career stat rows"
+            )
+        )
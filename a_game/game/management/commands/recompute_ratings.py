@@ -0,0 +1,23 @@
+# game/management/commands/recompute_ratings.py
+from django.core.management.base import BaseCommand
+from game.rating_system import RatingReplay
+
+class Command(BaseCommand):
+    help = 'Recompute all user ratings by replaying completed matches in order'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RatingReplay.BATCH_SIZE,
+            help=f'Rows per bulk write (default: {RatingReplay.BATCH_SIZE})'
+        )
+
+    def handle(self, *args, **options):
+        summary = RatingReplay.run(batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Replayed {summary['matches_replayed']} matches, updated "
+                f"{summary['profiles_updated']} profiles and wrote {summary['history_rows']} history rows"
+            )
+        )
@@ -0,0 +1,29 @@
+# game/management/commands/run_auctions.py
+import asyncio
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from game.lot_scheduler import LotScheduler
+
+class Command(BaseCommand):
+    help = 'Run lots of ACTIVE auctions on timers, selling each to its highest bid'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lot-seconds',
+            type=int,
+            default=LotScheduler.LOT_SECONDS,
+            help=f'How long each lot stays open (default: {LotScheduler.LOT_SECONDS})'
+        )
+
+    def handle(self, *args, **options):
+        # Events published here must reach the ASGI workers' WebSocket clients
+        if settings.AUCTION_BROKER != 'postgres':
+            raise CommandError(
+                'run_auctions needs AUCTION_BROKER=postgres; with the local broker, '
+                'set AUCTION_SCHEDULER=True to run lots inside the ASGI server instead'
+            )
+        self.stdout.write(self.style.SUCCESS('Running auction lots (Ctrl+C to stop)'))
+        try:
+            asyncio.run(LotScheduler(lot_seconds=options['lot_seconds']).run())
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,33 @@
+# game/management/commands/run_matchmaker.py
+import time
+from django.core.management.base import BaseCommand
+from game.matchmaking import Matchmaker
+
+class Command(BaseCommand):
+    help = 'Pair queued teams by owner rating and create their matches'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single pass and exit instead of polling'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds between passes (default: 1)'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = Matchmaker.run()
+            if result['matched']:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Created {result['matched']} matches ({result['queued']} teams still queued)"
+                    )
+                )
+            if options['once']:
+                return
+            time.sleep(options['interval'])
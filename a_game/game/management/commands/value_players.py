@@ -0,0 +1,35 @@
+# game/management/commands/value_players.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from game.models import Auction, Player
+from game.player_valuation import PlayerValuator
+
+class Command(BaseCommand):
+    help = 'Compute simulated valuations for players whose inputs changed since they were last valued'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--auction',
+            type=int,
+            help="Only value this auction's player pool (default: every player)"
+        )
+
+    def handle(self, *args, **options):
+        players = Player.objects.all()
+        if options['auction']:
+            try:
+                players = Auction.objects.get(id=options['auction']).players_pool.all()
+            except Auction.DoesNotExist:
+                raise CommandError(f"Auction {options['auction']} not found")
+        
+        started = time.perf_counter()
+        try:
+            valuations = PlayerValuator.for_players(players)
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Valued {len(valuations)} players in {time.perf_counter() - started:.1f}s'
+            )
+        )
@@ -42,6 +42,21 @@ class MatchEngine:
         }
     }
     
+    # Base probabilities from real cricket statistics
+    BASE_WEIGHTS = {
+        "0": 35.9,
+        "1": 36.9, 
+        "2": 4.7,
+        "3": 0.3,
+        "4": 9.6,
+        "6": 4.1,
+        "W": 4.5,
+        "Wide": 2.5,
+        "No Ball": 0.5,
+        "Bye": 0.25,
+        "Leg Bye": 0.75
+    }
+    
     DELIVERY_TYPES = {
         'OFF_SPIN': ['off_break', 'arm_ball', 'doosra', 'carrom_ball'],
         'LEG_SPIN': ['leg_break', 'googly', 'slider', 'flipper', 'top_spin'],
@@ -111,19 +126,7 @@ class MatchEngine:
             String representing the outcome (e.g., "0", "4", "6", "W", etc.)
         """
         # Base probabilities from real cricket statistics
-        base_weights = {
-            "0": 35.9,
-            "1": 36.9, 
-            "2": 4.7,
-            "3": 0.3,
-            "4": 9.6,
-            "6": 4.1,
-            "W": 4.5,
-            "Wide": 2.5,
-            "No Ball": 0.5,
-            "Bye": 0.25,
-            "Leg Bye": 0.75
-        }
+        base_weights = dict(self.BASE_WEIGHTS)
         
         # Get player attributes - using try/except for safer access
         try:
@@ -172,11 +175,23 @@ class MatchEngine:
         """
         Adjust outcome probabilities based on player attributes and conditions.
         """
-        adjusted_weights = weights.copy()
-        
         # Determine bowler type and select delivery
         delivery_type, delivery_skill, batting_skill = self._select_delivery(bowling, batting)
         
+        return self._apply_impact_factors(
+            weights, delivery_type, delivery_skill, batting_skill,
+            wicketkeeping, fielding_avg
+        )
+    
+    def _apply_impact_factors(self, weights: Dict[str, float], delivery_type: str,
+                              delivery_skill: int, batting_skill: int,
+                              wicketkeeping: Optional[WicketKeepingAttributes],
+                              fielding_avg: int) -> Dict[str, float]:
+        """
+        Apply skill, condition and fielding impact factors for one delivery.
+        """
+        adjusted_weights = weights.copy()
+        
         # Apply impact factors
         factors_and_skills = [
             (self.IMPACT_FACTORS['bowling'], delivery_skill),
@@ -214,7 +229,21 @@ class MatchEngine:
             Tuple of (delivery_type, bowling_skill, batting_skill)
         """
         bowler_type = bowling.bowler_type
-        deliveries = self.DELIVERY_TYPES.get(bowler_type, ['variation'])
+        delivery_options = self._delivery_options(bowling, batting)
+        
+        # Select delivery based on weights
+        deliveries, bowl_skills, bat_skills, weights = zip(*delivery_options)
+        selected_idx = random.choices(range(len(deliveries)), weights=weights)[0]
+        
+        return bowler_type, bowl_skills[selected_idx], bat_skills[selected_idx]
+    
+    def _delivery_options(self, bowling: BowlingAttributes,
+                          batting: BattingAttributes) -> List[Tuple[str, int, int, int]]:
+        """
+        Get (delivery, bowling_skill, batting_skill, selection_weight) for
+        every delivery available to the bowler.
+        """
+        deliveries = self.DELIVERY_TYPES.get(bowling.bowler_type, ['variation'])
         
         # Get skills for all possible deliveries
         delivery_options = []
@@ -226,11 +255,54 @@ class MatchEngine:
             weight = bowl_skill - bat_skill + 50  # Normalize to positive
             delivery_options.append((delivery, bowl_skill, bat_skill, max(1, weight)))
         
-        # Select delivery based on weights
-        deliveries, bowl_skills, bat_skills, weights = zip(*delivery_options)
-        selected_idx = random.choices(range(len(deliveries)), weights=weights)[0]
+        return delivery_options
+    
+    def expected_outcome_probabilities(self, bowler: Player, batsman: Player,
+                                       wicketkeeper: Optional[Player] = None,
+                                       fielding_avg: int = 50) -> Dict[str, float]:
+        """
+        Get the probability of each outcome for one ball, averaged over the
+        bowler's delivery choice instead of sampling it.
         
-        return bowler_type, bowl_skills[selected_idx], bat_skills[selected_idx]
+        Returns:
+            Dictionary of outcome -> probability (summing to 1)
+        """
+        base_weights = dict(self.BASE_WEIGHTS)
+        
+        try:
+            bowling_attr = bowler.bowling_attributes
+        except:
+            bowling_attr = None
+            
+        try:
+            batting_attr = batsman.batting_attributes
+        except:
+            batting_attr = None
+            
+        try:
+            wicketkeeping_attr = wicketkeeper.wicketkeeping_attributes if wicketkeeper else None
+        except:
+            wicketkeeping_attr = None
+        
+        if not bowling_attr or not batting_attr:
+            total = sum(base_weights.values())
+            return {outcome: weight / total for outcome, weight in base_weights.items()}
+        
+        delivery_options = self._delivery_options(bowling_attr, batting_attr)
+        total_selection = sum(option[3] for option in delivery_options)
+        
+        probabilities = {outcome: 0.0 for outcome in base_weights}
+        for _, bowl_skill, bat_skill, selection_weight in delivery_options:
+            adjusted = self._apply_impact_factors(
+                base_weights, bowling_attr.bowler_type, bowl_skill, bat_skill,
+                wicketkeeping_attr, fielding_avg
+            )
+            total = sum(adjusted.values())
+            share = selection_weight / total_selection
+            for outcome, weight in adjusted.items():
+                probabilities[outcome] += share * weight / total
+        
+        return probabilities
     
     def _get_pitch_help(self, delivery_type: str) -> int:
         """Get pitch assistance for delivery type."""
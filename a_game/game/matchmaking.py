@@ -0,0 +1,144 @@
+# matchmaking.py - Rating-based opponent pairing for queued teams
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Min, OuterRef, Q, Subquery
+from django.utils import timezone
+from .models import Match, MatchmakingTicket, Team, UserProfile
+
+
+class Matchmaker:
+    """
+    Pair queued teams whose owners have close ratings and create friendly
+    matches for them.
+
+    A pass reads every queued ticket in rating order from the queue index
+    and walks the list once, pairing each ticket with its nearest unpaired
+    neighbour when the gap fits either ticket's window. Windows start at
+    BASE_WINDOW and widen the longer a team waits, so outliers are
+    eventually matched. Matches are created with a bulk insert and the
+    tickets closed with a single UPDATE per BATCH_SIZE pairs, so a pass
+    over thousands of tickets costs a handful of queries.
+    """
+
+    BASE_WINDOW = 50.0  # Rating points
+    WIDEN_PER_SECOND = 5.0
+    MAX_WINDOW = 400.0
+    MIN_SQUAD = 11
+    BATCH_SIZE = 500  # Pairs written per insert/update
+
+    @classmethod
+    def enqueue(cls, team: Team) -> MatchmakingTicket:
+        """Queue a team at its owner's current rating"""
+        if team.owner_id is None:
+            raise ValueError('Team has no owner')
+        if team.players.count() < cls.MIN_SQUAD:
+            raise ValueError(f'Team needs at least {cls.MIN_SQUAD} players to be matched')
+
+        rating = UserProfile.objects.filter(user_id=team.owner_id).values_list(
+            'current_rating', flat=True
+        ).first()
+        if rating is None:
+            rating = Decimal(str(UserProfile._meta.get_field('current_rating').default))
+
+        try:
+            with transaction.atomic():
+                return MatchmakingTicket.objects.create(team=team, owner_id=team.owner_id, rating=rating)
+        except IntegrityError:
+            raise ValueError('Team is already queued')
+
+    @classmethod
+    def cancel(cls, team: Team) -> bool:
+        """Take a team out of the queue; False if it was not queued"""
+        return bool(
+            MatchmakingTicket.objects.filter(team=team, status='QUEUED').update(status='CANCELLED')
+        )
+
+    @classmethod
+    def window(cls, ticket: MatchmakingTicket, now: datetime) -> float:
+        """Largest rating gap a ticket accepts after waiting until now"""
+        waited = max((now - ticket.enqueued_at).total_seconds(), 0)
+        return min(cls.BASE_WINDOW + cls.WIDEN_PER_SECOND * waited, cls.MAX_WINDOW)
+
+    @classmethod
+    def pair(cls, tickets: List[MatchmakingTicket],
+             now: datetime) -> List[Tuple[MatchmakingTicket, MatchmakingTicket]]:
+        """
+        Pair tickets sorted by rating. Each ticket is only compared with the
+        closest unpaired ticket below it, and two teams of the same owner
+        are never paired.
+        """
+        pairs = []
+        waiting = None
+        for ticket in tickets:
+            if waiting is not None and waiting.owner_id != ticket.owner_id:
+                gap = float(ticket.rating - waiting.rating)
+                if gap <= max(cls.window(waiting, now), cls.window(ticket, now)):
+                    pairs.append((waiting, ticket))
+                    waiting = None
+                    continue
+            waiting = ticket
+        return pairs
+
+    @classmethod
+    def run(cls, now: Optional[datetime] = None) -> Dict[str, int]:
+        """One matchmaking pass over the whole queue"""
+        now = now or timezone.now()
+        with transaction.atomic():
+            # Tickets locked by a concurrent pass are skipped, not waited on
+            tickets = list(
+                MatchmakingTicket.objects.filter(status='QUEUED')
+                .select_for_update(skip_locked=True)
+                .only('id', 'team_id', 'owner_id', 'rating', 'enqueued_at')
+                .order_by('rating', 'id')
+            )
+            pairs = cls.pair(tickets, now)
+            for start in range(0, len(pairs), cls.BATCH_SIZE):
+                batch = pairs[start:start + cls.BATCH_SIZE]
+                matches = Match.objects.bulk_create(
+                    [Match(team1_id=a.team_id, team2_id=b.team_id) for a, b in batch]
+                )
+                # Each ticket's match is the new match its team plays in
+                created = Match.objects.filter(id__in=[match.id for match in matches])
+                MatchmakingTicket.objects.filter(
+                    id__in=[ticket.id for pair in batch for ticket in pair]
+                ).update(
+                    status='MATCHED',
+                    matched_at=now,
+                    match=Subquery(
+                        created.filter(
+                            Q(team1_id=OuterRef('team_id')) | Q(team2_id=OuterRef('team_id'))
+                        ).values('id')[:1]
+                    )
+                )
+
+        return {'matched': len(pairs), 'queued': len(tickets) - 2 * len(pairs)}
+
+    @classmethod
+    def metrics(cls, since_seconds: int = 3600) -> Dict:
+        """Queue depth and wait times (in seconds) of teams queued and recently matched"""
+        now = timezone.now()
+        queued = MatchmakingTicket.objects.filter(status='QUEUED').aggregate(
+            depth=Count('id'), oldest=Min('enqueued_at')
+        )
+        wait = ExpressionWrapper(F('matched_at') - F('enqueued_at'), output_field=DurationField())
+        matched = MatchmakingTicket.objects.filter(
+            status='MATCHED', matched_at__gte=now - timedelta(seconds=since_seconds)
+        ).aggregate(count=Count('id'), average=Avg(wait), longest=Max(wait))
+
+        return {
+            'queue_depth': queued['depth'],
+            'oldest_wait_seconds': (
+                round((now - queued['oldest']).total_seconds(), 1) if queued['oldest'] else 0.0
+            ),
+            'matched_teams': matched['count'],
+            'average_wait_seconds': (
+                round(matched['average'].total_seconds(), 1) if matched['average'] else 0.0
+            ),
+            'longest_wait_seconds': (
+                round(matched['longest'].total_seconds(), 1) if matched['longest'] else 0.0
+            ),
+            'window_seconds': since_seconds
+        }
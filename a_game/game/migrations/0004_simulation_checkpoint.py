@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0003_innings_tournament_match_match_type_match_overs_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimulationCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "innings_type",
+                    models.CharField(
+                        choices=[
+                            ("FIRST", "First Innings"),
+                            ("SECOND", "Second Innings"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("overs_completed", models.IntegerField(default=0)),
+                ("state", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "match",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="simulation_checkpoint",
+                        to="game.match",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "simulation_checkpoints",
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0004_simulation_checkpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeamStrength",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("player_ids", models.JSONField(default=list)),
+                ("batting", models.JSONField(default=dict)),
+                ("bowling_mix", models.JSONField(default=dict)),
+                ("bowling_skill", models.JSONField(default=dict)),
+                ("fielding_avg", models.FloatField(default=50)),
+                ("keeper_skill", models.IntegerField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "team",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="strength",
+                        to="game.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "team_strengths",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0005_team_strength"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ratinghistory",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:43
+
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_leaderboard(apps, schema_editor):
+    UserProfile = apps.get_model("game", "UserProfile")
+    LeaderboardEntry = apps.get_model("game", "LeaderboardEntry")
+    LeaderboardBucket = apps.get_model("game", "LeaderboardBucket")
+    ratings = list(UserProfile.objects.values_list("user_id", "current_rating"))
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(user_id=user_id, rating=rating)
+            for user_id, rating in ratings
+        ],
+        batch_size=1000,
+    )
+    counts = {}
+    for _, rating in ratings:
+        counts[math.floor(rating)] = counts.get(math.floor(rating), 0) + 1
+    LeaderboardBucket.objects.bulk_create(
+        [
+            LeaderboardBucket(rating=bucket, entries=count)
+            for bucket, count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("game", "0006_rating_history_created_at_default"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rating", models.DecimalField(decimal_places=2, max_digits=6)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entry",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "leaderboard",
+                "ordering": ["-rating", "user"],
+                "indexes": [
+                    models.Index(
+                        fields=["-rating", "user"], name="leaderboard_rating_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="LeaderboardBucket",
+            fields=[
+                ("rating", models.IntegerField(primary_key=True, serialize=False)),
+                ("entries", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "leaderboard_buckets",
+            },
+        ),
+        migrations.RunPython(build_leaderboard, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("game", "0007_leaderboard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserCareerStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("season", models.PositiveIntegerField(default=0)),
+                ("matches", models.IntegerField(default=0)),
+                ("innings", models.IntegerField(default=0)),
+                ("runs", models.IntegerField(default=0)),
+                ("balls_faced", models.IntegerField(default=0)),
+                ("fours", models.IntegerField(default=0)),
+                ("sixes", models.IntegerField(default=0)),
+                ("dismissals", models.IntegerField(default=0)),
+                ("highest_score", models.IntegerField(default=0)),
+                ("balls_bowled", models.IntegerField(default=0)),
+                ("runs_conceded", models.IntegerField(default=0)),
+                ("wickets", models.IntegerField(default=0)),
+                ("maidens", models.IntegerField(default=0)),
+                ("catches", models.IntegerField(default=0)),
+                ("stumpings", models.IntegerField(default=0)),
+                ("run_outs", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="career_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "user_career_stats",
+                "unique_together": {("user", "season")},
+            },
+        ),
+        migrations.CreateModel(
+            name="PlayerCareerStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("season", models.PositiveIntegerField(default=0)),
+                ("matches", models.IntegerField(default=0)),
+                ("innings", models.IntegerField(default=0)),
+                ("runs", models.IntegerField(default=0)),
+                ("balls_faced", models.IntegerField(default=0)),
+                ("fours", models.IntegerField(default=0)),
+                ("sixes", models.IntegerField(default=0)),
+                ("dismissals", models.IntegerField(default=0)),
+                ("highest_score", models.IntegerField(default=0)),
+                ("balls_bowled", models.IntegerField(default=0)),
+                ("runs_conceded", models.IntegerField(default=0)),
+                ("wickets", models.IntegerField(default=0)),
+                ("maidens", models.IntegerField(default=0)),
+                ("catches", models.IntegerField(default=0)),
+                ("stumpings", models.IntegerField(default=0)),
+                ("run_outs", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="career_stats",
+                        to="game.player",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "player_career_stats",
+                "unique_together": {("player", "season")},
+            },
+        ),
+    ]
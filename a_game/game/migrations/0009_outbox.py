@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0008_career_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[("MATCH_COMPLETED", "Match Completed")], max_length=30
+                    ),
+                ),
+                ("payload", models.JSONField(default=dict)),
+                ("attempts", models.IntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("processed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "match",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outbox_events",
+                        to="game.match",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "outbox_events",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["processed_at", "id"], name="outbox_pending_idx"
+                    )
+                ],
+            },
+        ),
+    ]
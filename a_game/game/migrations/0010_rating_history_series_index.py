@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0009_outbox"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ratinghistory",
+            index=models.Index(
+                fields=["user", "created_at", "id"],
+                include=("new_rating",),
+                name="rating_history_series_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("game", "0010_rating_history_series_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MatchmakingTicket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rating", models.DecimalField(decimal_places=2, max_digits=6)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("QUEUED", "Queued"),
+                            ("MATCHED", "Matched"),
+                            ("CANCELLED", "Cancelled"),
+                        ],
+                        default="QUEUED",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "enqueued_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("matched_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "match",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="matchmaking_tickets",
+                        to="game.match",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="matchmaking_tickets",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="matchmaking_tickets",
+                        to="game.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "matchmaking_tickets",
+                "ordering": ["enqueued_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "rating", "id"], name="matchmaking_queue_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="matchmakingticket",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "QUEUED")),
+                fields=("team",),
+                name="matchmaking_one_ticket_per_team",
+            ),
+        ),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 4.2.7 on 2026-10-19 18:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_lots(apps, schema_editor):
+    Bid = apps.get_model("game", "Bid")
+    AuctionLot = apps.get_model("game", "AuctionLot")
+    lots = {}
+    bids = Bid.objects.order_by("auction_id", "player_id", "amount", "id").values_list(
+        "id", "auction_id", "player_id", "team_id", "amount", "status"
+    )
+    for bid_id, auction_id, player_id, team_id, amount, status in bids.iterator():
+        lot = lots.setdefault(
+            (auction_id, player_id),
+            AuctionLot(auction_id=auction_id, player_id=player_id),
+        )
+        lot.bid_count += 1
+        if status in ("ACTIVE", "WON"):
+            lot.highest_bid_id = bid_id
+            lot.highest_team_id = team_id
+            lot.highest_amount = amount
+    AuctionLot.objects.bulk_create(lots.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0011_matchmaking_ticket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuctionLot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("highest_amount", models.IntegerField(default=0)),
+                ("bid_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "auction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lots",
+                        to="game.auction",
+                    ),
+                ),
+                (
+                    "highest_bid",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="game.bid",
+                    ),
+                ),
+                (
+                    "highest_team",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="game.team",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="auction_lots",
+                        to="game.player",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "auction_lots",
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="auctionlot",
+            constraint=models.UniqueConstraint(
+                fields=("auction", "player"), name="auction_lot_per_player"
+            ),
+        ),
+        migrations.RunPython(build_lots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:01
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0012_auction_lot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProxyBid",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "max_amount",
+                    models.IntegerField(
+                        validators=[django.core.validators.MinValueValidator(0)]
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "auction",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="proxy_bids",
+                        to="game.auction",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="proxy_bids",
+                        to="game.player",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="proxy_bids",
+                        to="game.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "proxy_bids",
+                "ordering": ["created_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="proxybid",
+            constraint=models.UniqueConstraint(
+                fields=("auction", "player", "team"), name="proxy_bid_per_team"
+            ),
+        ),
+    ]
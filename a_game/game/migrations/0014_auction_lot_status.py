@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:03
+
+from django.db import migrations, models
+
+
+def mark_sold_lots(apps, schema_editor):
+    AuctionLot = apps.get_model("game", "AuctionLot")
+    AuctionLot.objects.filter(highest_bid__status="WON").update(status="SOLD")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0013_proxy_bid"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="auctionlot",
+            name="closes_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="auctionlot",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("PENDING", "Pending"),
+                    ("OPEN", "Open"),
+                    ("SOLD", "Sold"),
+                    ("UNSOLD", "Unsold"),
+                ],
+                default="PENDING",
+                max_length=10,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auctionlot",
+            index=models.Index(
+                fields=["auction", "status", "id"], name="auction_lot_status_idx"
+            ),
+        ),
+        migrations.RunPython(mark_sold_lots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def reserve_leading_bids(apps, schema_editor):
+    Team = apps.get_model("game", "Team")
+    AuctionLot = apps.get_model("game", "AuctionLot")
+    BudgetReservation = apps.get_model("game", "BudgetReservation")
+    reserved = dict(
+        AuctionLot.objects.filter(highest_bid__status="ACTIVE")
+        .exclude(status__in=("SOLD", "UNSOLD"))
+        .values("highest_team_id")
+        .annotate(total=models.Sum("highest_amount"))
+        .values_list("highest_team_id", "total")
+    )
+    BudgetReservation.objects.bulk_create(
+        [
+            BudgetReservation(team_id=team_id, reserved=reserved.get(team_id, 0))
+            for team_id in Team.objects.values_list("id", flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0014_auction_lot_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BudgetReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("reserved", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "team",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservation",
+                        to="game.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "budget_reservations",
+            },
+        ),
+        migrations.RunPython(reserve_leading_bids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0015_budget_reservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PlayerValuation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fingerprint", models.CharField(max_length=32)),
+                ("runs_added", models.FloatField(default=0)),
+                ("runs_saved", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "player",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="valuation",
+                        to="game.player",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "player_valuations",
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0016_player_valuation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BidHistory",
+            fields=[
+                ("bid_id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("amount", models.IntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ACTIVE", "Active"),
+                            ("OUTBID", "Outbid"),
+                            ("WON", "Won"),
+                            ("WITHDRAWN", "Withdrawn"),
+                        ],
+                        max_length=15,
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("superseded_at", models.DateTimeField()),
+                (
+                    "auction",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="game.auction",
+                    ),
+                ),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="game.player",
+                    ),
+                ),
+                (
+                    "team",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="game.team",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "bid_history",
+                "ordering": ["created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["auction", "player", "created_at"],
+                        name="bid_history_lot_idx",
+                    )
+                ],
+            },
+        ),
+    ]
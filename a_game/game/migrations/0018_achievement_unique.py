@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:28
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicates(apps, schema_editor):
+    Achievement = apps.get_model("game", "Achievement")
+    keep = set()
+    for achievements, fields in (
+        (
+            Achievement.objects.filter(match__isnull=False),
+            ("user", "match", "achievement_type", "title"),
+        ),
+        (
+            Achievement.objects.filter(achievement_type="RATING_MILESTONE"),
+            ("user", "title"),
+        ),
+    ):
+        first = achievements.values(*fields).annotate(first=Min("id"))
+        keep.update(first.values_list("first", flat=True))
+        achievements.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0017_bid_history"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="achievement",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("match__isnull", False)),
+                fields=("user", "match", "achievement_type", "title"),
+                name="achievement_match_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="achievement",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("achievement_type", "RATING_MILESTONE")),
+                fields=("user", "title"),
+                name="achievement_milestone_unique",
+            ),
+        ),
+    ]
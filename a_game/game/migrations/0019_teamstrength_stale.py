@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("game", "0018_achievement_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teamstrength",
+            name="stale",
+            field=models.BooleanField(default=False),
+        ),
+    ]
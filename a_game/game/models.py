@@ -1,6 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -75,6 +76,27 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username} - Rating: {self.current_rating}"
 
+class LeaderboardBucket(models.Model):
+    """Number of leaderboard entries per whole rating point"""
+    rating = models.IntegerField(primary_key=True)  # Entries rated [rating, rating + 1)
+    entries = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'leaderboard_buckets'
+
+class LeaderboardEntry(models.Model):
+    """User ratings in leaderboard order: rating (desc) then user id"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='leaderboard_entry')
+    rating = models.DecimalField(max_digits=6, decimal_places=2)
+    
+    class Meta:
+        db_table = 'leaderboard'
+        ordering = ['-rating', 'user']
+        indexes = [models.Index(fields=['-rating', 'user'], name='leaderboard_rating_idx')]
+    
+    def __str__(self):
+        return f"{self.user.username} ({self.rating})"
+
 class Tournament(models.Model):
     TOURNAMENT_TYPES = [
         ('LEAGUE', 'League'),
@@ -148,6 +170,26 @@ class Team(models.Model):
         return f"{self.name} ({self.owner.username})"
     
 
+class TeamStrength(models.Model):
+    """Denormalized strength vector for a team's current playing eleven"""
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='strength')
+    player_ids = models.JSONField(default=list)  # Current XI
+    
+    batting = models.JSONField(default=dict)  # Attribute -> XI average (vs each delivery + general)
+    bowling_mix = models.JSONField(default=dict)  # Bowler type -> number of bowlers
+    bowling_skill = models.JSONField(default=dict)  # Bowler type -> average bowling skill
+    fielding_avg = models.FloatField(default=50)
+    keeper_skill = models.IntegerField(null=True, blank=True)
+    stale = models.BooleanField(default=False)  # Set by signals; recomputed on next read
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'team_strengths'
+    
+    def __str__(self):
+        return f"{self.team.name} - Strength"
+
 class Player(models.Model):
     PLAYER_TYPES = [
         ('BATSMAN', 'Batsman'),
@@ -408,6 +450,75 @@ class PlayerPerformance(models.Model):
     def __str__(self):
         return f"{self.player.name} - {self.match}"
 
+class CareerStats(models.Model):
+    """Career totals accumulated from PlayerPerformance rows"""
+    season = models.PositiveIntegerField(default=0)  # Match year; 0 = whole career
+    
+    matches = models.IntegerField(default=0)
+    
+    # Batting
+    innings = models.IntegerField(default=0)
+    runs = models.IntegerField(default=0)
+    balls_faced = models.IntegerField(default=0)
+    fours = models.IntegerField(default=0)
+    sixes = models.IntegerField(default=0)
+    dismissals = models.IntegerField(default=0)
+    highest_score = models.IntegerField(default=0)
+    
+    # Bowling
+    balls_bowled = models.IntegerField(default=0)
+    runs_conceded = models.IntegerField(default=0)
+    wickets = models.IntegerField(default=0)
+    maidens = models.IntegerField(default=0)
+    
+    # Fielding
+    catches = models.IntegerField(default=0)
+    stumpings = models.IntegerField(default=0)
+    run_outs = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        abstract = True
+    
+    @property
+    def batting_average(self) -> float:
+        return self.runs / self.dismissals if self.dismissals > 0 else float(self.runs)
+    
+    @property
+    def strike_rate(self) -> float:
+        return self.runs / self.balls_faced * 100 if self.balls_faced > 0 else 0.0
+    
+    @property
+    def bowling_average(self) -> float:
+        return self.runs_conceded / self.wickets if self.wickets > 0 else 0.0
+    
+    @property
+    def economy(self) -> float:
+        return self.runs_conceded / self.balls_bowled * 6 if self.balls_bowled > 0 else 0.0
+
+class UserCareerStats(CareerStats):
+    """Career statistics across every player a user has fielded"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='career_stats')
+    
+    class Meta:
+        db_table = 'user_career_stats'
+        unique_together = ['user', 'season']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.season or 'Career'}"
+
+class PlayerCareerStats(CareerStats):
+    """Career statistics for a single player"""
+    player = models.ForeignKey('Player', on_delete=models.CASCADE, related_name='career_stats')
+    
+    class Meta:
+        db_table = 'player_career_stats'
+        unique_together = ['player', 'season']
+    
+    def __str__(self):
+        return f"{self.player.name} - {self.season or 'Career'}"
+
 class Over(models.Model):
     """Ball-by-ball tracking"""
     innings = models.ForeignKey(Innings, on_delete=models.CASCADE, related_name='overs')
@@ -465,6 +576,75 @@ class Ball(models.Model):
     def __str__(self):
         return f"Ball {self.ball_number} - {self.outcome}"
 
+class SimulationCheckpoint(models.Model):
+    """Periodic snapshot of match engine state used to resume a simulation"""
+    match = models.OneToOneField(Match, on_delete=models.CASCADE, related_name='simulation_checkpoint')
+    innings_type = models.CharField(max_length=10, choices=Innings.INNINGS_TYPES)
+    overs_completed = models.IntegerField(default=0)
+    state = models.JSONField()  # RNG state, innings progress, player stats
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'simulation_checkpoints'
+
+    def __str__(self):
+        return f"Checkpoint {self.match_id} - {self.innings_type} ({self.overs_completed} overs)"
+
+class OutboxEvent(models.Model):
+    """Work recorded in the same transaction as a state change, applied later by a consumer"""
+    EVENT_TYPES = [
+        ('MATCH_COMPLETED', 'Match Completed'),
+    ]
+    
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, null=True, blank=True, related_name='outbox_events')
+    payload = models.JSONField(default=dict)
+    
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        indexes = [models.Index(fields=['processed_at', 'id'], name='outbox_pending_idx')]
+    
+    def __str__(self):
+        return f"{self.event_type} #{self.id} ({'processed' if self.processed_at else 'pending'})"
+
+class MatchmakingTicket(models.Model):
+    """A team waiting for a rated opponent; kept after pairing for wait-time metrics"""
+    TICKET_STATUS = [
+        ('QUEUED', 'Queued'),
+        ('MATCHED', 'Matched'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+    
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='matchmaking_tickets')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='matchmaking_tickets')
+    rating = models.DecimalField(max_digits=6, decimal_places=2)  # Owner's rating when queued
+    status = models.CharField(max_length=10, choices=TICKET_STATUS, default='QUEUED')
+    match = models.ForeignKey(Match, on_delete=models.SET_NULL, null=True, blank=True, related_name='matchmaking_tickets')
+    
+    enqueued_at = models.DateTimeField(default=timezone.now)
+    matched_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'matchmaking_tickets'
+        ordering = ['enqueued_at']
+        indexes = [models.Index(fields=['status', 'rating', 'id'], name='matchmaking_queue_idx')]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['team'], condition=models.Q(status='QUEUED'), name='matchmaking_one_ticket_per_team'
+            )
+        ]
+    
+    def __str__(self):
+        return f"{self.team.name} ({self.status})"
+
 class RatingHistory(models.Model):
     """Track rating changes over time"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rating_history')
@@ -476,11 +656,19 @@ class RatingHistory(models.Model):
     rating_change = models.DecimalField(max_digits=6, decimal_places=2)
     reason = models.CharField(max_length=200)  # "Won vs Team X", "Lost vs Team Y", etc.
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add so rating replays can keep the original timestamps
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'rating_history'
         ordering = ['-created_at']
+        indexes = [
+            # Covers the rating time-series query (index-only scan on PostgreSQL)
+            models.Index(
+                fields=['user', 'created_at', 'id'], include=['new_rating'],
+                name='rating_history_series_idx'
+            )
+        ]
     
     def __str__(self):
         return f"{self.user.username}: {self.old_rating} -> {self.new_rating}"
@@ -506,6 +694,17 @@ class Achievement(models.Model):
     class Meta:
         db_table = 'achievements'
         ordering = ['-earned_at']
+        constraints = [
+            # Awards are written with ignore_conflicts, so a replayed match or milestone is skipped
+            models.UniqueConstraint(
+                fields=['user', 'match', 'achievement_type', 'title'], condition=models.Q(match__isnull=False),
+                name='achievement_match_unique'
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'title'], condition=models.Q(achievement_type='RATING_MILESTONE'),
+                name='achievement_milestone_unique'
+            )
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
@@ -537,6 +736,12 @@ class Auction(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def close(self):
+        """Sell every remaining lot to its highest bid and complete the auction"""
+        from .bidding import BiddingSystem  # bidding imports these models
+        
+        return BiddingSystem.close_auction(self)
 
 class Bid(models.Model):
     BID_STATUS = [
@@ -563,3 +768,106 @@ class Bid(models.Model):
     
     def __str__(self):
         return f"{self.team.name} - {self.player.name} - ${self.amount}"
+
+class BidHistory(models.Model):
+    """A superseded bid, moved out of the live bids table by compaction; rows are only ever appended"""
+    bid_id = models.BigIntegerField(primary_key=True)  # Its id in the bids table
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='+', db_index=False)
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='+')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+    
+    amount = models.IntegerField()
+    status = models.CharField(max_length=15, choices=Bid.BID_STATUS)
+    
+    created_at = models.DateTimeField()
+    superseded_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'bid_history'
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['auction', 'player', 'created_at'], name='bid_history_lot_idx')]
+    
+    def __str__(self):
+        return f"{self.team.name} - {self.player.name} - ${self.amount} ({self.status})"
+
+class ProxyBid(models.Model):
+    """A team's maximum for a lot; the server bids on its behalf up to this amount"""
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='proxy_bids')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='proxy_bids')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='proxy_bids')
+    
+    max_amount = models.IntegerField(validators=[MinValueValidator(0)])
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'proxy_bids'
+        ordering = ['created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['auction', 'player', 'team'], name='proxy_bid_per_team')
+        ]
+    
+    def __str__(self):
+        return f"{self.team.name} - {self.player.name} - up to ${self.max_amount}"
+
+class AuctionLot(models.Model):
+    """Current highest bid for one player in one auction, updated with every accepted bid"""
+    LOT_STATUS = [
+        ('PENDING', 'Pending'),
+        ('OPEN', 'Open'),
+        ('SOLD', 'Sold'),
+        ('UNSOLD', 'Unsold'),
+    ]
+    
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='lots')
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='auction_lots')
+    status = models.CharField(max_length=10, choices=LOT_STATUS, default='PENDING')
+    closes_at = models.DateTimeField(null=True, blank=True)  # Set while the lot is open; late bids push it back
+    
+    highest_bid = models.ForeignKey(Bid, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    highest_team = models.ForeignKey(Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    highest_amount = models.IntegerField(default=0)
+    bid_count = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'auction_lots'
+        ordering = ['id']
+        indexes = [models.Index(fields=['auction', 'status', 'id'], name='auction_lot_status_idx')]
+        constraints = [
+            models.UniqueConstraint(fields=['auction', 'player'], name='auction_lot_per_player')
+        ]
+    
+    def __str__(self):
+        return f"{self.auction.name} - {self.player.name} - ${self.highest_amount}"
+
+class BudgetReservation(models.Model):
+    """Money a team has committed to the lots it currently leads, kept in step with every accepted bid"""
+    team = models.OneToOneField(Team, on_delete=models.CASCADE, related_name='reservation')
+    reserved = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'budget_reservations'
+    
+    def __str__(self):
+        return f"{self.team.name} - ${self.reserved} reserved"
+
+class PlayerValuation(models.Model):
+    """A player's expected runs added and saved per match over a reference eleven"""
+    player = models.OneToOneField(Player, on_delete=models.CASCADE, related_name='valuation')
+    fingerprint = models.CharField(max_length=32)  # Hash of the player's and the reference eleven's inputs
+    
+    runs_added = models.FloatField(default=0)  # With the bat
+    runs_saved = models.FloatField(default=0)  # With the ball, in the field and behind the stumps
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'player_valuations'
+    
+    def __str__(self):
+        return f"{self.player.name} - {self.runs_added + self.runs_saved:+.1f} runs"
@@ -0,0 +1,128 @@
+# outbox.py - Transactional outbox for deferred match processing
+
+import logging
+from typing import Dict, List, Tuple
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Achievement, Match, OutboxEvent
+from .rating_system import RatingSystem, AchievementSystem
+from .achievement_tracker import AchievementTracker
+
+logger = logging.getLogger(__name__)
+
+
+class MatchOutbox:
+    """
+    Defer rating updates and achievements for completed matches.
+
+    The engine publishes a MATCH_COMPLETED event inside the transaction that
+    stores the result, so an event exists exactly when the match does. The
+    consumer (manage.py process_outbox) claims pending events in id order
+    and applies a whole batch at once: one rating pass over all its
+    matches, one achievement insert and one update marking the events done.
+
+    Run a single consumer so ratings are applied in completion order;
+    further consumers are safe (claims skip locked rows) but may apply
+    matches of the same owner out of order.
+    """
+
+    BATCH_SIZE = 100
+    MAX_ATTEMPTS = 5
+
+    @classmethod
+    def publish_match_completed(cls, match: Match, tracker: AchievementTracker,
+                                players: Dict[int, Tuple[str, int]]) -> OutboxEvent:
+        """Record a completed match; call inside the transaction that saves it"""
+        return OutboxEvent.objects.create(
+            event_type='MATCH_COMPLETED',
+            match=match,
+            payload={
+                'achievements': tracker.get_state(),
+                'players': {str(player_id): list(player) for player_id, player in players.items()}
+            }
+        )
+
+    @classmethod
+    def _pending(cls):
+        return OutboxEvent.objects.filter(
+            processed_at__isnull=True, attempts__lt=cls.MAX_ATTEMPTS
+        ).order_by('id')
+
+    @classmethod
+    def _apply(cls, events: List[OutboxEvent]):
+        """Apply a batch of MATCH_COMPLETED events in the current transaction"""
+        matches = Match.objects.select_related(
+            'team1', 'team2', 'tournament'
+        ).in_bulk([event.match_id for event in events])
+
+        ordered = [matches[event.match_id] for event in events if event.match_id in matches]
+        rating_changes = RatingSystem.update_ratings_for_matches(ordered)
+
+        achievements = []
+        for event in events:
+            match = matches.get(event.match_id)
+            if match is None:
+                continue
+            players = {
+                int(player_id): tuple(player)
+                for player_id, player in event.payload.get('players', {}).items()
+            }
+            tracker = AchievementTracker(event.payload.get('achievements'))
+            achievements.extend(AchievementSystem.match_awards(match, tracker, players))
+
+        achievements.extend(AchievementSystem.milestone_awards(
+            (user_id, old, new)
+            for match in ordered
+            for user_id, (old, new) in rating_changes.get(match.id, {}).items()
+        ))
+        Achievement.objects.bulk_create(achievements, ignore_conflicts=True)
+
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+            processed_at=timezone.now()
+        )
+
+    @classmethod
+    def process_batch(cls, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """
+        Claim and apply up to batch_size pending events. If the batch fails,
+        its events are retried one by one so a single bad event cannot hold
+        up the rest; failures are counted and given up after MAX_ATTEMPTS.
+        """
+        try:
+            with transaction.atomic():
+                events = list(cls._pending().select_for_update(skip_locked=True)[:batch_size])
+                if events:
+                    cls._apply(events)
+                return {'processed': len(events), 'failed': 0}
+        except Exception:
+            # Rolled back; fall back to one event per transaction below
+            logger.exception('Outbox batch failed; retrying its events one at a time')
+
+        processed = failed = 0
+        for event_id in cls._pending().values_list('id', flat=True)[:batch_size]:
+            try:
+                with transaction.atomic():
+                    event = cls._pending().select_for_update(skip_locked=True).filter(id=event_id).first()
+                    if event:
+                        cls._apply([event])
+                        processed += 1
+            except Exception as e:
+                OutboxEvent.objects.filter(id=event_id).update(
+                    attempts=F('attempts') + 1, last_error=f'{type(e).__name__}: {e}'
+                )
+                failed += 1
+
+        return {'processed': processed, 'failed': failed}
+
+    @classmethod
+    def process(cls, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """Process batches until no pending events are left"""
+        totals = {'processed': 0, 'failed': 0, 'batches': 0}
+        while True:
+            result = cls.process_batch(batch_size)
+            if not result['processed'] and not result['failed']:
+                return totals
+            totals['processed'] += result['processed']
+            totals['failed'] += result['failed']
+            totals['batches'] += 1
@@ -0,0 +1,193 @@
+# player_valuation.py - Price players by the runs they add to a reference eleven
+
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import django
+from django.db.models import QuerySet
+from .models import Match, Player, PlayerValuation, Team
+from .lineup_optimizer import LineupOptimizer
+from .match_engine import MatchEngine
+
+
+class _ReferenceModel(LineupOptimizer):
+    """
+    LineupOptimizer's expected innings model without a squad to search:
+    scores elevens against a fixed reference side in neutral conditions.
+    """
+
+    def __init__(self, reference: List[Player], max_overs: int):
+        # Unsaved match with no conditions: neutral pitch and weather
+        self.engine = MatchEngine(Match(team1=Team(), team2=Team()))
+        self.max_overs = max_overs
+        self.reference = reference
+        self._over_cache = {}
+        self.scored, self.conceded = self.score(reference)
+
+    def score(self, eleven: List[Player]) -> Tuple[float, float]:
+        """Expected runs an eleven scores and concedes against the reference"""
+        return (
+            self.expected_innings_runs(eleven, self.reference),
+            self.expected_innings_runs(self.reference, eleven)
+        )
+
+    def value(self, player: Player, slot: int) -> Tuple[float, float]:
+        """Runs added and saved by putting a player in the reference eleven's slot"""
+        eleven = list(self.reference)
+        eleven[slot] = player
+        scored, conceded = self.score(eleven)
+        return scored - self.scored, self.conceded - conceded
+
+
+def _value_players(reference: List[Player], jobs: List[Tuple[Player, int]],
+                   max_overs: int) -> Dict[int, Tuple[float, float]]:
+    """Value a batch of (player, slot) jobs; runs in a worker process"""
+    model = _ReferenceModel(reference, max_overs)
+    return {player.id: model.value(player, slot) for player, slot in jobs}
+
+
+class PlayerValuator:
+    """
+    Value players by their marginal contribution to a match: the expected
+    runs a reference eleven scores and saves with the player in it, minus
+    what it manages without.
+
+    The reference eleven is a replacement-level side, the median-skilled
+    players of each role in the whole player pool. A player takes the slot
+    of the reference player in the same role, and both elevens play the
+    reference side. Innings are scored with LineupOptimizer's model, the
+    exact expectation of MatchEngine's ball-by-ball outcome probabilities,
+    so valuations carry no sampling noise.
+
+    Valuations are stored with a fingerprint of every input they depend on
+    (the player's skills and attributes and the reference eleven's), so a
+    request only recomputes players whose fingerprint has changed. Large
+    batches are spread over a process pool using every core.
+    """
+
+    ROLE_SLOTS = [('BATSMAN', 4), ('WICKET_KEEPER', 1), ('ALL_ROUNDER', 2), ('BOWLER', 4)]  # In batting order
+    INPUT_FIELDS = ['player_type', 'overall_skill', 'batting', 'bowling', 'fielding', 'wicketkeeping']
+    MAX_OVERS = 20
+    PARALLEL_MIN = 50  # Fewer players than this are valued in-process
+    CHUNKS_PER_WORKER = 4
+
+    @staticmethod
+    def _role(player_type: str) -> str:
+        return 'WICKET_KEEPER' if player_type.startswith('WICKET_KEEPER') else player_type
+
+    @classmethod
+    def reference_eleven(cls) -> Tuple[List[Player], Dict[str, int]]:
+        """
+        The reference eleven in batting order, and the slot each role's
+        newcomer takes. Raises ValueError if there are fewer than 11 players.
+        """
+        pool = list(Player.objects.order_by('overall_skill', 'id').values_list('id', 'player_type'))
+        if len(pool) < 11:
+            raise ValueError('At least 11 players are needed for a reference eleven')
+
+        by_role = {}
+        for player_id, player_type in pool:
+            by_role.setdefault(cls._role(player_type), []).append(player_id)
+
+        chosen = []
+        slots = {}
+        for role, count in cls.ROLE_SLOTS:
+            candidates = by_role.get(role, [])
+            start = max(0, len(candidates) // 2 - count // 2)
+            picked = candidates[start:start + count]
+            if picked:
+                slots[role] = len(chosen) + len(picked) // 2
+            chosen.extend(picked)
+
+        # Roles short of players are filled with the pool's median players
+        if len(chosen) < 11:
+            rest = [player_id for player_id, _ in pool if player_id not in set(chosen)]
+            start = max(0, len(rest) // 2 - (11 - len(chosen)) // 2)
+            chosen.extend(rest[start:start + 11 - len(chosen)])
+
+        players = Player.objects.select_related(*LineupOptimizer.PLAYER_ATTRIBUTES).in_bulk(chosen)
+        return [players[player_id] for player_id in chosen], slots
+
+    @classmethod
+    def _inputs(cls, player: Player) -> Tuple:
+        """Everything about a player the outcome model reads"""
+        values = [getattr(player, field) for field in cls.INPUT_FIELDS]
+        for relation in LineupOptimizer.PLAYER_ATTRIBUTES:
+            attributes = getattr(player, relation, None)
+            values.append(None if attributes is None else tuple(
+                getattr(attributes, field.attname) for field in attributes._meta.concrete_fields
+                if field.attname not in ('id', 'player_id', 'created_at', 'updated_at')
+            ))
+        return tuple(values)
+
+    @staticmethod
+    def _hash(value) -> str:
+        return hashlib.md5(repr(value).encode()).hexdigest()
+
+    @classmethod
+    def _slot(cls, player: Player, reference: List[Player], slots: Dict[str, int]) -> int:
+        for slot, member in enumerate(reference):
+            if member.id == player.id:
+                return slot  # A reference player is replacement level: worth nothing extra
+        return slots.get(cls._role(player.player_type), len(reference) - 1)
+
+    @classmethod
+    def _compute(cls, reference: List[Player], jobs: List[Tuple[Player, int]]) -> Dict[int, Tuple[float, float]]:
+        workers = os.cpu_count() or 1
+        if len(jobs) < cls.PARALLEL_MIN or workers == 1:
+            return _value_players(reference, jobs, cls.MAX_OVERS)
+
+        # Chunks share one over cache each; several per worker keep the cores evenly busy
+        size = -(-len(jobs) // (workers * cls.CHUNKS_PER_WORKER))
+        chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+        values = {}
+        # Spawned (not forked) workers are safe to start from a threaded server
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=django.setup) as pool:
+            for chunk in pool.map(_value_players, [reference] * len(chunks), chunks, [cls.MAX_OVERS] * len(chunks)):
+                values.update(chunk)
+        return values
+
+    @classmethod
+    def for_players(cls, players: QuerySet) -> List[PlayerValuation]:
+        """
+        Valuations of the given players, most valuable first. Only players
+        whose inputs (or the reference eleven) changed are recomputed.
+        """
+        reference, slots = cls.reference_eleven()
+        reference_key = cls._hash((cls.MAX_OVERS, [(p.id, cls._inputs(p)) for p in reference]))
+
+        players = list(players.select_related(*LineupOptimizer.PLAYER_ATTRIBUTES))
+        fingerprints = {p.id: cls._hash((reference_key, p.id, cls._inputs(p))) for p in players}
+        valuations = {
+            valuation.player_id: valuation
+            for valuation in PlayerValuation.objects.filter(player_id__in=fingerprints)
+        }
+
+        stale = [
+            p for p in players
+            if p.id not in valuations or valuations[p.id].fingerprint != fingerprints[p.id]
+        ]
+        if stale:
+            values = cls._compute(reference, [(p, cls._slot(p, reference, slots)) for p in stale])
+            fresh = [
+                PlayerValuation(
+                    player=p, fingerprint=fingerprints[p.id],
+                    runs_added=values[p.id][0], runs_saved=values[p.id][1]
+                )
+                for p in stale
+            ]
+            PlayerValuation.objects.bulk_create(
+                fresh, update_conflicts=True, unique_fields=['player'],
+                update_fields=['fingerprint', 'runs_added', 'runs_saved', 'updated_at']
+            )
+            valuations.update({valuation.player_id: valuation for valuation in fresh})
+
+        for player in players:
+            valuations[player.id].player = player
+        return sorted(
+            (valuations[p.id] for p in players),
+            key=lambda valuation: valuation.runs_added + valuation.runs_saved, reverse=True
+        )
@@ -0,0 +1,111 @@
+# rating_projection.py - What-if rating changes between tournament teams
+
+import hashlib
+from typing import Dict, List, Optional
+from django.core.cache import cache
+from django.db.models import Count, Max
+from .models import PlayerPerformance, Team, Tournament, UserProfile
+from .rating_system import RatingSystem
+
+
+class RatingProjection:
+    """
+    Project how many rating points each team's owner would gain or lose
+    against every other team in a tournament.
+
+    Each team is credited with the average performance score its players
+    have put up in the tournament's completed matches (0.5 before it has
+    played), unless the caller assumes one score for everyone.
+
+    The matrices are computed in one vectorized pass and cached under a key
+    built from the tournament's rating factor, every participant's current
+    rating and the tournament's performance rows, so a rating change, a
+    newly played match, or a team joining or leaving makes the next request
+    recompute without any explicit invalidation.
+    """
+
+    CACHE_TIMEOUT = 60 * 60
+
+    @classmethod
+    def _participants(cls, tournament: Tournament):
+        return list(
+            Team.objects.filter(tournament=tournament, owner__isnull=False).order_by('id').values_list(
+                'id', 'name', 'owner_id', 'owner__cricket_profile__current_rating'
+            )
+        )
+
+    @staticmethod
+    def _performances(tournament: Tournament):
+        return PlayerPerformance.objects.filter(match__tournament=tournament, match__status='COMPLETED')
+
+    @classmethod
+    def team_performances(cls, tournament: Tournament, team_ids: List[int]) -> List[float]:
+        """Each team's average performance score in the tournament so far"""
+        averages = RatingSystem.performance_averages(
+            cls._performances(tournament).filter(team_id__in=team_ids).values_list(
+                'team_id', *RatingSystem.PERFORMANCE_COLUMNS
+            )
+        )
+        return [averages.get(team_id, 0.5) for team_id in team_ids]
+
+    @classmethod
+    def cache_key(cls, tournament: Tournament, participants) -> str:
+        played = cls._performances(tournament).aggregate(rows=Count('id'), last=Max('id'))
+        fingerprint = repr((tournament.rating_factor, participants, played)).encode()
+        return f'rating_projection:{tournament.id}:{hashlib.md5(fingerprint).hexdigest()}'
+
+    @classmethod
+    def for_tournament(cls, tournament: Tournament, performance: Optional[float] = None) -> Dict:
+        """
+        Win and loss matrices for a tournament: win[i][j] is the change for
+        teams[i]'s owner after beating teams[j]. Pairings of teams with the
+        same owner are null. `performance`, if given, is an assumed average
+        individual performance score (0-1) used for every team instead of
+        its measured one.
+        """
+        if performance is not None:
+            performance = min(max(performance, 0.0), 1.0)
+        initial_rating = float(UserProfile._meta.get_field('current_rating').default)
+        participants = cls._participants(tournament)
+
+        key = f'{cls.cache_key(tournament, participants)}:{performance}'
+        projection = cache.get(key)
+        if projection is not None:
+            return projection
+
+        ratings = [float(rating) if rating is not None else initial_rating for *_, rating in participants]
+        if performance is None:
+            performances = cls.team_performances(tournament, [team_id for team_id, *_ in participants])
+        else:
+            performances = [performance] * len(participants)
+        k_factor = RatingSystem.get_k_factor(tournament.rating_factor)
+        win, loss = RatingSystem.projected_change_matrices(ratings, k_factor, performances)
+
+        # A team never plays its owner's other teams (or itself)
+        teams_by_owner = {}
+        for i, (_, _, owner_id, _) in enumerate(participants):
+            teams_by_owner.setdefault(owner_id, []).append(i)
+        for indices in teams_by_owner.values():
+            for i in indices:
+                for j in indices:
+                    win[i][j] = loss[i][j] = None
+
+        projection = {
+            'tournament_id': tournament.id,
+            'rating_factor': float(tournament.rating_factor),
+            'k_factor': k_factor,
+            'performance': performance,
+            'teams': [
+                {
+                    'team_id': team_id, 'team_name': name, 'owner_id': owner_id,
+                    'rating': rating, 'performance': team_performance
+                }
+                for (team_id, name, owner_id, _), rating, team_performance in zip(
+                    participants, ratings, performances
+                )
+            ],
+            'win': win,
+            'loss': loss
+        }
+        cache.set(key, projection, cls.CACHE_TIMEOUT)
+        return projection
@@ -0,0 +1,125 @@
+# rating_series.py - Downsampled rating history for charts
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+from django.core.cache import cache
+from django.db import transaction
+from .models import RatingHistory
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; lttb falls back to Python
+    np = None
+
+
+class RatingSeries:
+    """
+    Serve a user's rating over time as at most `points` points.
+
+    Rows are read in time order from the (user, created_at, id) index, which
+    includes new_rating, and reduced with Largest-Triangle-Three-Buckets,
+    which keeps the peaks and troughs a chart needs. Series are cached per
+    user at a fixed set of resolutions (LEVELS); a request is served from the
+    smallest cached level that covers it, reduced again if it asks for
+    fewer points. The cache is dropped whenever new history rows are
+    written for that user.
+    """
+
+    DEFAULT_POINTS = 200
+    MAX_POINTS = 2000
+    LEVELS = (50, 200, 500, MAX_POINTS)
+    CACHE_TIMEOUT = 60 * 60
+
+    @staticmethod
+    def cache_key(user_id: int) -> str:
+        return f'rating_series:{user_id}'
+
+    @classmethod
+    def invalidate(cls, user_ids: Iterable[int]):
+        """Drop cached series once the current transaction commits"""
+        keys = [cls.cache_key(user_id) for user_id in set(user_ids)]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @classmethod
+    def lttb(cls, xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+        """Indices of the points Largest-Triangle-Three-Buckets keeps"""
+        n = len(xs)
+        threshold = max(threshold, 3)
+        if threshold >= n:
+            return list(range(n))
+
+        if np is not None:
+            xs = np.asarray(xs, dtype=float)
+            ys = np.asarray(ys, dtype=float)
+
+        selected = [0]
+        bucket_size = (n - 2) / (threshold - 2)
+        a = 0
+
+        for i in range(threshold - 2):
+            start = int(i * bucket_size) + 1
+            end = int((i + 1) * bucket_size) + 1
+
+            # Average of the next bucket (or the last point) is the third corner
+            next_start = end
+            next_end = min(int((i + 2) * bucket_size) + 1, n)
+            if np is not None:
+                avg_x = xs[next_start:next_end].mean()
+                avg_y = ys[next_start:next_end].mean()
+                areas = np.abs(
+                    (xs[a] - avg_x) * (ys[start:end] - ys[a])
+                    - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+                )
+                a = start + int(areas.argmax())
+            else:
+                count = next_end - next_start
+                avg_x = sum(xs[next_start:next_end]) / count
+                avg_y = sum(ys[next_start:next_end]) / count
+                a = max(
+                    range(start, end),
+                    key=lambda j: abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+                )
+            selected.append(a)
+
+        selected.append(n - 1)
+        return selected
+
+    @classmethod
+    def _load(cls, user_id: int) -> Tuple[List, List[float]]:
+        rows = RatingHistory.objects.filter(user_id=user_id).order_by('created_at', 'id').values_list(
+            'created_at', 'new_rating'
+        )
+        times = []
+        ratings = []
+        for created_at, rating in rows.iterator(chunk_size=5000):
+            times.append(created_at)
+            ratings.append(float(rating))
+        return times, ratings
+
+    @classmethod
+    def get(cls, user_id: int, points: int = DEFAULT_POINTS) -> Dict:
+        """A user's downsampled rating series, from cache when possible"""
+        points = max(3, min(points, cls.MAX_POINTS))
+        level = next(level for level in cls.LEVELS if level >= points)
+        key = cls.cache_key(user_id)
+        cached = cache.get(key) or {}
+
+        if level not in cached:
+            times, ratings = cls._load(user_id)
+            indices = cls.lttb([t.timestamp() for t in times], ratings, level)
+            cached[level] = {
+                'total': len(times),
+                'series': [
+                    {'t': times[i].isoformat(), 'rating': ratings[i]}
+                    for i in indices
+                ],
+                'x': [times[i].timestamp() for i in indices]
+            }
+            cache.set(key, cached, cls.CACHE_TIMEOUT)
+
+        series = cached[level]['series']
+        if points < len(series):
+            series = [
+                series[i] for i in cls.lttb(cached[level]['x'], [p['rating'] for p in series], points)
+            ]
+        return {'user_id': user_id, 'points': len(series), 'total': cached[level]['total'], 'series': series}
@@ -2,9 +2,22 @@
 
 import math
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Sequence, Tuple
 from django.contrib.auth.models import User
-from .models import UserProfile, Match, Tournament, RatingHistory, PlayerPerformance
+from django.db import transaction
+from django.db.models import Avg, Case, Exists, F, FloatField, OuterRef, Q, QuerySet, Value, When
+from django.db.models.functions import Cast, Greatest, Least
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the array helpers fall back to Python
+    np = None
+
+from .models import UserProfile, Match, Tournament, RatingHistory, PlayerPerformance, OutboxEvent
+from .leaderboard import Leaderboard
+from .rating_series import RatingSeries
+from .career_stats import CareerStatsCalculator
+from .achievement_tracker import AchievementTracker
 
 class RatingSystem:
     """
@@ -21,42 +34,87 @@ class RatingSystem:
         """Calculate expected score using ELO formula"""
         return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
     
+    @classmethod
+    def get_k_factor(cls, rating_factor=None) -> float:
+        """K-factor for a match; friendly matches (no tournament) use the base value"""
+        return cls.BASE_K_FACTOR * float(rating_factor if rating_factor is not None else 1)
+    
+    @staticmethod
+    def round_rating(value: float) -> Decimal:
+        """Round a rating or rating change to two decimal places"""
+        return Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    
+    @classmethod
+    def calculate_rating_changes(cls, team1_rating: float, team2_rating: float, team1_won: bool,
+                                 team1_perf_avg: float, team2_perf_avg: float,
+                                 k_factor: float) -> Tuple[float, float]:
+        """
+        Calculate both teams' rating changes from the result and the
+        average individual performance scores.
+        """
+        # Calculate expected scores
+        team1_expected = cls.calculate_expected_score(team1_rating, team2_rating)
+        team2_expected = 1 - team1_expected
+        
+        # Determine actual scores (1 for win, 0 for loss)
+        team1_actual = 1.0 if team1_won else 0.0
+        team2_actual = 1.0 - team1_actual
+        
+        # Combine team result and individual performance
+        team1_combined_score = (cls.TEAM_WEIGHT * team1_actual) + (cls.PERFORMANCE_WEIGHT * team1_perf_avg)
+        team2_combined_score = (cls.TEAM_WEIGHT * team2_actual) + (cls.PERFORMANCE_WEIGHT * team2_perf_avg)
+        
+        return (
+            k_factor * (team1_combined_score - team1_expected),
+            k_factor * (team2_combined_score - team2_expected)
+        )
+    
     @classmethod
     def calculate_performance_score(cls, performance: PlayerPerformance) -> float:
         """
         Calculate individual performance score (0-1) based on match statistics.
         Higher score = better performance.
         """
+        return cls.score_performance_values(
+            performance.runs_scored, performance.balls_faced,
+            float(performance.overs_bowled), performance.runs_conceded,
+            performance.wickets_taken,
+            performance.catches + performance.stumpings + performance.run_outs
+        )
+    
+    @classmethod
+    def score_performance_values(cls, runs_scored: int, balls_faced: int, overs_bowled: float,
+                                 runs_conceded: int, wickets_taken: int, total_fielding: int) -> float:
+        """Performance score (0-1) from raw statistics, for callers without model rows"""
         batting_score = 0
         bowling_score = 0
         fielding_score = 0
         
         # Batting performance (0-1 scale)
-        if performance.balls_faced > 0:
-            strike_rate = (performance.runs_scored / performance.balls_faced) * 100
-            runs_contribution = min(performance.runs_scored / 100, 1.0)  # Cap at 100 runs
+        if balls_faced > 0:
+            strike_rate = (runs_scored / balls_faced) * 100
+            runs_contribution = min(runs_scored / 100, 1.0)  # Cap at 100 runs
             batting_score = (runs_contribution * 0.6) + (min(strike_rate / 150, 1.0) * 0.4)
         
         # Bowling performance (0-1 scale)
-        if performance.overs_bowled > 0:
-            economy = performance.runs_conceded / float(performance.overs_bowled)
-            wicket_contribution = min(performance.wickets_taken / 5, 1.0)  # Cap at 5 wickets
+        if overs_bowled > 0:
+            economy = runs_conceded / float(overs_bowled)
+            wicket_contribution = min(wickets_taken / 5, 1.0)  # Cap at 5 wickets
             economy_score = max(0, 1 - (economy / 10))  # Better economy = higher score
             bowling_score = (wicket_contribution * 0.6) + (economy_score * 0.4)
         
         # Fielding performance (0-1 scale)
-        total_fielding = performance.catches + performance.stumpings + performance.run_outs
         fielding_score = min(total_fielding / 3, 1.0)  # Cap at 3 fielding contributions
         
         # Weight the scores based on player involvement
         total_score = 0
         weights = 0
         
-        if performance.balls_faced > 0:
+        if balls_faced > 0:
             total_score += batting_score * 0.5
             weights += 0.5
         
-        if performance.overs_bowled > 0:
+        if overs_bowled > 0:
             total_score += bowling_score * 0.4
             weights += 0.4
         
@@ -67,213 +125,582 @@ class RatingSystem:
         return total_score / weights if weights > 0 else 0.5
     
     @classmethod
-    def update_ratings_after_match(cls, match: Match) -> Dict[int, Tuple[Decimal, Decimal]]:
+    def performance_score_expression(cls):
         """
-        Update user ratings after a match.
-        Returns dict of user_id -> (old_rating, new_rating)
+        Database expression equivalent to calculate_performance_score, for
+        annotate() and aggregate() over PlayerPerformance rows.
         """
-        if match.status != 'COMPLETED' or not match.winner:
-            return {}
+        def as_float(expression):
+            return Cast(expression, FloatField())
         
-        tournament = match.tournament
-        k_factor = cls.BASE_K_FACTOR * float(tournament.rating_factor)
+        def when(condition, then, default=0.0):
+            return Case(When(condition, then=then), default=Value(default), output_field=FloatField())
         
-        # Get team owners and their ratings
-        team1_user = match.team1.owner
-        team2_user = match.team2.owner
+        runs = as_float(F('runs_scored'))
+        balls = as_float(F('balls_faced'))
+        overs = as_float(F('overs_bowled'))
+        total_fielding = as_float(F('catches') + F('stumpings') + F('run_outs'))
         
-        team1_profile = team1_user.cricket_profile
-        team2_profile = team2_user.cricket_profile
+        bats = Q(balls_faced__gt=0)
+        bowls = Q(overs_bowled__gt=0)
+        fields = Q(catches__gt=0) | Q(stumpings__gt=0) | Q(run_outs__gt=0)
         
-        team1_old_rating = float(team1_profile.current_rating)
-        team2_old_rating = float(team2_profile.current_rating)
-        
-        # Calculate expected scores
-        team1_expected = cls.calculate_expected_score(team1_old_rating, team2_old_rating)
-        team2_expected = 1 - team1_expected
+        batting_score = (
+            Least(runs / Value(100.0), Value(1.0)) * Value(0.6)
+            + Least(runs / balls * Value(100.0) / Value(150.0), Value(1.0)) * Value(0.4)
+        )
+        bowling_score = (
+            Least(as_float(F('wickets_taken')) / Value(5.0), Value(1.0)) * Value(0.6)
+            + Greatest(Value(0.0), Value(1.0) - as_float(F('runs_conceded')) / overs / Value(10.0)) * Value(0.4)
+        )
+        fielding_score = Least(total_fielding / Value(3.0), Value(1.0))
         
-        # Determine actual scores (1 for win, 0 for loss)
-        team1_actual = 1.0 if match.winner == match.team1 else 0.0
-        team2_actual = 1.0 - team1_actual
+        total_score = (
+            when(bats, batting_score * Value(0.5))
+            + when(bowls, bowling_score * Value(0.4))
+            + when(fields, fielding_score * Value(0.1))
+        )
+        weights = when(bats, Value(0.5)) + when(bowls, Value(0.4)) + when(fields, Value(0.1))
         
-        # Get individual performances
-        team1_performances = match.player_performances.filter(team=match.team1)
-        team2_performances = match.player_performances.filter(team=match.team2)
+        # Players with no involvement score 0.5, as in score_performance_values
+        return when(bats | bowls | fields, total_score / weights, default=0.5)
+    
+    @classmethod
+    def team_performance_averages(cls, performances: QuerySet) -> Dict[Tuple[int, int], float]:
+        """Average performance score per (match_id, team_id), computed in one query"""
+        rows = performances.order_by().values('match_id', 'team_id').annotate(
+            average=Avg(cls.performance_score_expression())
+        ).values_list('match_id', 'team_id', 'average')
+        return {(match_id, team_id): average for match_id, team_id, average in rows}
+    
+    @classmethod
+    def score_performance_arrays(cls, runs_scored: Sequence, balls_faced: Sequence,
+                                 overs_bowled: Sequence, runs_conceded: Sequence,
+                                 wickets_taken: Sequence, total_fielding: Sequence) -> Sequence[float]:
+        """
+        Vectorized score_performance_values over equal-length columns, for bulk
+        jobs that already hold the statistics in memory. Uses NumPy when it is
+        installed and returns a list otherwise.
+        """
+        if np is None:
+            return [
+                cls.score_performance_values(*row)
+                for row in zip(runs_scored, balls_faced, overs_bowled,
+                               runs_conceded, wickets_taken, total_fielding)
+            ]
+        
+        runs = np.asarray(runs_scored, dtype=float)
+        balls = np.asarray(balls_faced, dtype=float)
+        overs = np.asarray(overs_bowled, dtype=float)
+        conceded = np.asarray(runs_conceded, dtype=float)
+        wickets = np.asarray(wickets_taken, dtype=float)
+        fielding = np.asarray(total_fielding, dtype=float)
+        
+        bats = balls > 0
+        bowls = overs > 0
+        fields = fielding > 0
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            strike_rate = np.where(bats, runs / balls * 100, 0)
+            economy = np.where(bowls, conceded / overs, 0)
+        
+        batting_score = np.minimum(runs / 100, 1.0) * 0.6 + np.minimum(strike_rate / 150, 1.0) * 0.4
+        bowling_score = np.minimum(wickets / 5, 1.0) * 0.6 + np.maximum(0, 1 - economy / 10) * 0.4
+        fielding_score = np.minimum(fielding / 3, 1.0)
+        
+        total_score = bats * batting_score * 0.5 + bowls * bowling_score * 0.4 + fields * fielding_score * 0.1
+        weights = bats * 0.5 + bowls * 0.4 + fields * 0.1
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(weights > 0, total_score / weights, 0.5)
+    
+    # Stat columns score_performance_arrays takes, as values_list() arguments
+    PERFORMANCE_COLUMNS = (
+        'runs_scored', 'balls_faced', 'overs_bowled', 'runs_conceded', 'wickets_taken',
+        F('catches') + F('stumpings') + F('run_outs')
+    )
+    
+    @classmethod
+    def performance_averages(cls, rows: Iterable[Sequence]) -> Dict:
+        """
+        Average performance score per key over in-memory rows of
+        (key, *PERFORMANCE_COLUMNS), scored in one score_performance_arrays pass
+        """
+        rows = list(rows)
+        if not rows:
+            return {}
         
-        # Calculate average performance scores
-        team1_perf_avg = sum(cls.calculate_performance_score(p) for p in team1_performances) / len(team1_performances) if team1_performances else 0.5
-        team2_perf_avg = sum(cls.calculate_performance_score(p) for p in team2_performances) / len(team2_performances) if team2_performances else 0.5
+        keys = [row[0] for row in rows]
+        scores = cls.score_performance_arrays(*zip(*(row[1:] for row in rows)))
+        totals = {}
+        for key, score in zip(keys, scores):
+            total, count = totals.get(key, (0.0, 0))
+            totals[key] = (total + float(score), count + 1)
+        return {key: total / count for key, (total, count) in totals.items()}
+    
+    @classmethod
+    def projected_change_matrices(cls, ratings: Sequence[float], k_factor: float,
+                                  performance=0.5) -> Tuple[List[List[float]], List[List[float]]]:
+        """
+        Rating change for every pairing of the given ratings, as (win, loss)
+        matrices: entry [i][j] is what player i gains by beating j or loses
+        by losing to j, given an average individual performance: one score
+        for everyone, or one per player (e.g. from performance_averages).
+        Uses NumPy when it is installed.
+        """
+        if np is None:
+            performances = performance if isinstance(performance, Sequence) else [performance] * len(ratings)
+            expected = [[cls.calculate_expected_score(a, b) for b in ratings] for a in ratings]
+            return (
+                [
+                    [round(k_factor * (cls.TEAM_WEIGHT + cls.PERFORMANCE_WEIGHT * p - e), 2) for e in row]
+                    for p, row in zip(performances, expected)
+                ],
+                [
+                    [round(k_factor * (cls.PERFORMANCE_WEIGHT * p - e), 2) for e in row]
+                    for p, row in zip(performances, expected)
+                ]
+            )
+        
+        performance = np.asarray(performance, dtype=float)
+        if performance.ndim:
+            performance = performance[:, np.newaxis]  # One score per row player
+        win_score = cls.TEAM_WEIGHT + cls.PERFORMANCE_WEIGHT * performance
+        loss_score = cls.PERFORMANCE_WEIGHT * performance
+        
+        ratings = np.asarray(ratings, dtype=float)
+        expected = 1 / (1 + 10 ** ((ratings[np.newaxis, :] - ratings[:, np.newaxis]) / 400))
+        return (
+            np.round(k_factor * (win_score - expected), 2).tolist(),
+            np.round(k_factor * (loss_score - expected), 2).tolist()
+        )
+    
+    @classmethod
+    def lock_profiles(cls, user_ids) -> Dict[int, UserProfile]:
+        """
+        Lock and re-read the given users' profiles for the current transaction.
+        Rows are locked in user id order so that concurrent matches sharing
+        owners wait for each other instead of deadlocking.
+        """
+        profiles = UserProfile.objects.select_for_update().filter(
+            user_id__in=set(user_ids)
+        ).order_by('user_id')
+        return {profile.user_id: profile for profile in profiles}
+    
+    @classmethod
+    def update_ratings_after_match(cls, match: Match) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """
+        Update user ratings after a match.
+        Returns dict of user_id -> (old_rating, new_rating)
+        """
+        return cls.update_ratings_for_matches([match]).get(match.id, {})
+    
+    @classmethod
+    @transaction.atomic
+    def update_ratings_for_matches(cls, matches: List[Match]) -> Dict[int, Dict[int, Tuple[Decimal, Decimal]]]:
+        """
+        Apply several completed matches to ratings, in the order given.
+        Returns dict of match_id -> {user_id: (old_rating, new_rating)}
+        
+        All owners' profiles are locked before their ratings are read, so
+        matches finishing concurrently in other workers apply in turn rather
+        than overwriting each other's changes. Performance averages, profile,
+        history and match writes are each a single query however many
+        matches are applied.
+        """
+        matches = [
+            match for match in matches
+            if match.status == 'COMPLETED' and match.winner_id
+            and match.team1.owner_id and match.team2.owner_id
+        ]
+        if not matches:
+            return {}
         
-        # Combine team result and individual performance
-        team1_combined_score = (cls.TEAM_WEIGHT * team1_actual) + (cls.PERFORMANCE_WEIGHT * team1_perf_avg)
-        team2_combined_score = (cls.TEAM_WEIGHT * team2_actual) + (cls.PERFORMANCE_WEIGHT * team2_perf_avg)
+        # Average performance scores per team, aggregated in the database
+        performance = cls.team_performance_averages(
+            PlayerPerformance.objects.filter(match__in=matches)
+        )
         
-        # Calculate rating changes
-        team1_rating_change = k_factor * (team1_combined_score - team1_expected)
-        team2_rating_change = k_factor * (team2_combined_score - team2_expected)
-        
-        team1_new_rating = Decimal(str(team1_old_rating + team1_rating_change)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        team2_new_rating = Decimal(str(team2_old_rating + team2_rating_change)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        
-        # Update profiles
-        team1_profile.current_rating = team1_new_rating
-        team2_profile.current_rating = team2_new_rating
-        
-        # Update peak ratings if needed
-        if team1_new_rating > team1_profile.peak_rating:
-            team1_profile.peak_rating = team1_new_rating
-        if team2_new_rating > team2_profile.peak_rating:
-            team2_profile.peak_rating = team2_new_rating
-        
-        # Update career stats
-        team1_profile.career_matches += 1
-        team2_profile.career_matches += 1
-        
-        if match.winner == match.team1:
-            team1_profile.career_wins += 1
-            team2_profile.career_losses += 1
-        else:
-            team1_profile.career_losses += 1
-            team2_profile.career_wins += 1
-        
-        team1_profile.save()
-        team2_profile.save()
-        
-        # Create rating history records
-        RatingHistory.objects.create(
-            user=team1_user,
-            match=match,
-            tournament=tournament,
-            old_rating=Decimal(str(team1_old_rating)),
-            new_rating=team1_new_rating,
-            rating_change=Decimal(str(team1_rating_change)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
-            reason=f"{'Won' if match.winner == match.team1 else 'Lost'} vs {match.team2.name}"
+        # Read ratings under lock; cached profiles may be stale
+        profiles = cls.lock_profiles(
+            user_id for match in matches for user_id in (match.team1.owner_id, match.team2.owner_id)
         )
         
-        RatingHistory.objects.create(
-            user=team2_user,
-            match=match,
-            tournament=tournament,
-            old_rating=Decimal(str(team2_old_rating)),
-            new_rating=team2_new_rating,
-            rating_change=Decimal(str(team2_rating_change)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
-            reason=f"{'Won' if match.winner == match.team2 else 'Lost'} vs {match.team1.name}"
+        history = []
+        changes = {}
+        
+        for match in matches:
+            team1_won = match.winner_id == match.team1_id
+            team1_profile = profiles[match.team1.owner_id]
+            team2_profile = profiles[match.team2.owner_id]
+            
+            team1_old_rating = team1_profile.current_rating
+            team2_old_rating = team2_profile.current_rating
+            
+            # Friendly matches (no tournament) use the base K-factor
+            tournament = match.tournament
+            k_factor = cls.get_k_factor(tournament.rating_factor if tournament else None)
+            
+            # Calculate rating changes
+            team1_rating_change, team2_rating_change = cls.calculate_rating_changes(
+                float(team1_old_rating), float(team2_old_rating), team1_won,
+                performance.get((match.id, match.team1_id), 0.5),
+                performance.get((match.id, match.team2_id), 0.5),
+                k_factor
+            )
+            
+            team1_new_rating = cls.round_rating(float(team1_old_rating) + team1_rating_change)
+            team2_new_rating = cls.round_rating(float(team2_old_rating) + team2_rating_change)
+            
+            # Update profiles, peaks and career results
+            for profile, new_rating, won in (
+                (team1_profile, team1_new_rating, team1_won),
+                (team2_profile, team2_new_rating, not team1_won),
+            ):
+                profile.current_rating = new_rating
+                profile.peak_rating = max(profile.peak_rating, new_rating)
+                profile.career_matches += 1
+                if won:
+                    profile.career_wins += 1
+                else:
+                    profile.career_losses += 1
+            
+            # Rating history records
+            for profile, old_rating, new_rating, change, won, opponent in (
+                (team1_profile, team1_old_rating, team1_new_rating, team1_rating_change, team1_won, match.team2),
+                (team2_profile, team2_old_rating, team2_new_rating, team2_rating_change, not team1_won, match.team1),
+            ):
+                history.append(RatingHistory(
+                    user_id=profile.user_id,
+                    match=match,
+                    tournament=tournament,
+                    old_rating=old_rating,
+                    new_rating=new_rating,
+                    rating_change=cls.round_rating(change),
+                    reason=f"{'Won' if won else 'Lost'} vs {opponent.name}"
+                ))
+            
+            match.team1_rating_change = cls.round_rating(team1_rating_change)
+            match.team2_rating_change = cls.round_rating(team2_rating_change)
+            
+            changes[match.id] = {
+                team1_profile.user_id: (team1_old_rating, team1_new_rating),
+                team2_profile.user_id: (team2_old_rating, team2_new_rating)
+            }
+        
+        UserProfile.objects.bulk_update(
+            profiles.values(),
+            ['current_rating', 'peak_rating', 'career_matches', 'career_wins', 'career_losses']
         )
+        RatingHistory.objects.bulk_create(history)
+        Match.objects.bulk_update(matches, ['team1_rating_change', 'team2_rating_change'])
+        
+        for user_id, profile in profiles.items():
+            Leaderboard.move(user_id, profile.current_rating)
+        RatingSeries.invalidate(profiles)
         
-        # Update match with rating changes
-        match.team1_rating_change = Decimal(str(team1_rating_change)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        match.team2_rating_change = Decimal(str(team2_rating_change)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-        match.save()
+        return changes
+
+class RatingReplay:
+    """
+    Recompute all ratings from scratch by replaying every completed match in
+    chronological order in memory, e.g. after changing BASE_K_FACTOR,
+    PERFORMANCE_WEIGHT or a tournament's rating_factor.
+    
+    Performance averages are scored in one vectorized pass over the stat
+    columns, ratings are kept in lists indexed by user, and profiles, rating
+    history and match rating changes are written back with bulk operations.
+    The leaderboard is rebuilt afterwards.
+    """
+    
+    BATCH_SIZE = 1000
+    
+    @classmethod
+    def run(cls, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """
+        Replay all completed matches and rewrite every rating.
+        Returns counts of matches replayed, profiles updated and history rows written.
+        """
+        with transaction.atomic():
+            performance = RatingSystem.performance_averages(
+                ((match_id, team_id), *stats)
+                for match_id, team_id, *stats in PlayerPerformance.objects.filter(
+                    match__status='COMPLETED'
+                ).values_list(
+                    'match_id', 'team_id', *RatingSystem.PERFORMANCE_COLUMNS
+                ).iterator(chunk_size=10000)
+            )
+            
+            # Matches still waiting in the outbox are left to its consumer
+            pending = OutboxEvent.objects.filter(match=OuterRef('pk'), processed_at__isnull=True)
+            matches = Match.objects.filter(
+                status='COMPLETED', winner__isnull=False
+            ).exclude(Exists(pending)).order_by('created_at', 'id').values_list(
+                'id', 'team1_id', 'team2_id', 'winner_id', 'tournament_id',
+                'tournament__rating_factor', 'team1__owner_id', 'team2__owner_id',
+                'team1__name', 'team2__name', 'updated_at',
+                'team1_rating_change', 'team2_rating_change'
+            )
+            
+            # Ratings and career counters held in lists indexed by user
+            # Locked (in the same order as lock_profiles) so no incremental
+            # update lands between the replay's read and its write
+            profiles = list(UserProfile.objects.select_for_update().only(
+                'id', 'user_id', 'current_rating', 'peak_rating',
+                'career_matches', 'career_wins', 'career_losses'
+            ).order_by('user_id'))
+            index = {profile.user_id: i for i, profile in enumerate(profiles)}
+            initial_rating = Decimal(str(UserProfile._meta.get_field('current_rating').default))
+            ratings = [initial_rating] * len(profiles)
+            peaks = [initial_rating] * len(profiles)
+            played = [0] * len(profiles)
+            wins = [0] * len(profiles)
+            losses = [0] * len(profiles)
+            
+            # Keep the original timestamp of history rows being rewritten
+            recorded_at = {
+                (user_id, match_id): created_at
+                for user_id, match_id, created_at in RatingHistory.objects.filter(
+                    match__isnull=False
+                ).values_list('user_id', 'match_id', 'created_at').iterator(chunk_size=10000)
+            }
+            
+            history = []
+            match_updates = []
+            replayed = 0
+            
+            for (match_id, team1_id, team2_id, winner_id, tournament_id, rating_factor,
+                 owner1_id, owner2_id, team1_name, team2_name, updated_at,
+                 stored_change1, stored_change2) in matches.iterator(chunk_size=10000):
+                if owner1_id not in index or owner2_id not in index:
+                    continue
+                replayed += 1
+                
+                i, j = index[owner1_id], index[owner2_id]
+                old1, old2 = ratings[i], ratings[j]
+                team1_won = winner_id == team1_id
+                
+                change1, change2 = RatingSystem.calculate_rating_changes(
+                    float(old1), float(old2), team1_won,
+                    performance.get((match_id, team1_id), 0.5),
+                    performance.get((match_id, team2_id), 0.5),
+                    RatingSystem.get_k_factor(rating_factor)
+                )
+                
+                new1 = RatingSystem.round_rating(float(old1) + change1)
+                new2 = RatingSystem.round_rating(float(old2) + change2)
+                ratings[i], ratings[j] = new1, new2
+                peaks[i], peaks[j] = max(peaks[i], new1), max(peaks[j], new2)
+                played[i] += 1
+                played[j] += 1
+                if team1_won:
+                    wins[i] += 1
+                    losses[j] += 1
+                else:
+                    losses[i] += 1
+                    wins[j] += 1
+                
+                for user_id, old, new, change, opponent_name, won in (
+                    (owner1_id, old1, new1, change1, team2_name, team1_won),
+                    (owner2_id, old2, new2, change2, team1_name, not team1_won),
+                ):
+                    history.append(RatingHistory(
+                        user_id=user_id,
+                        match_id=match_id,
+                        tournament_id=tournament_id,
+                        old_rating=old,
+                        new_rating=new,
+                        rating_change=RatingSystem.round_rating(change),
+                        reason=f"{'Won' if won else 'Lost'} vs {opponent_name}",
+                        created_at=recorded_at.get((user_id, match_id), updated_at)
+                    ))
+                
+                # Only write back matches whose stored changes differ
+                change1 = RatingSystem.round_rating(change1)
+                change2 = RatingSystem.round_rating(change2)
+                if (stored_change1, stored_change2) != (change1, change2):
+                    match_updates.append(Match(
+                        id=match_id, team1_rating_change=change1, team2_rating_change=change2
+                    ))
+            
+            for i, profile in enumerate(profiles):
+                profile.current_rating = ratings[i]
+                profile.peak_rating = peaks[i]
+                profile.career_matches = played[i]
+                profile.career_wins = wins[i]
+                profile.career_losses = losses[i]
+            
+            UserProfile.objects.bulk_update(
+                profiles,
+                ['current_rating', 'peak_rating', 'career_matches', 'career_wins', 'career_losses'],
+                batch_size=batch_size
+            )
+            Match.objects.bulk_update(
+                match_updates, ['team1_rating_change', 'team2_rating_change'], batch_size=batch_size
+            )
+            
+            RatingHistory.objects.filter(match__isnull=False).delete()
+            RatingHistory.objects.bulk_create(history, batch_size=batch_size)
+            
+            Leaderboard.rebuild(batch_size)
+            RatingSeries.invalidate(index)
         
         return {
-            team1_user.id: (Decimal(str(team1_old_rating)), team1_new_rating),
-            team2_user.id: (Decimal(str(team2_old_rating)), team2_new_rating)
+            'matches_replayed': replayed,
+            'profiles_updated': len(profiles),
+            'history_rows': len(history)
         }
 
 class AchievementSystem:
     """System for tracking and awarding achievements"""
     
+    RATING_MILESTONES = [1200, 1400, 1600, 1800, 2000, 2200]
+    
     @classmethod
-    def check_match_achievements(cls, match: Match):
-        """Check for achievements after a match"""
+    def match_awards(cls, match: Match, tracker: AchievementTracker,
+                     players: Dict[int, Tuple[str, int]]) -> List:
+        """
+        Unsaved achievements for a tracker's awards, credited to the owner
+        of the player's team.
+        
+        Args:
+            players: player id -> (name, team id) for the match
+        """
         from .models import Achievement
         
-        for performance in match.player_performances.all():
-            user = performance.team.owner
-            
-            # Century achievement
-            if performance.runs_scored >= 100:
-                Achievement.objects.get_or_create(
-                    user=user,
-                    achievement_type='CENTURY',
-                    match=match,
-                    defaults={
-                        'title': f'Century - {performance.runs_scored} runs',
-                        'description': f'Scored {performance.runs_scored} runs in {match.team1.name} vs {match.team2.name}',
-                        'tournament': match.tournament
-                    }
-                )
+        owners = {match.team1_id: match.team1.owner_id, match.team2_id: match.team2.owner_id}
+        fixture = f'{match.team1.name} vs {match.team2.name}'
+        achievements = []
+        
+        for award in tracker.awards:
+            player_id = award['player_id']
+            name, team_id = players[player_id]
+            user_id = owners.get(team_id)
+            if not user_id:
+                continue
             
-            # Five wickets achievement
-            if performance.wickets_taken >= 5:
-                Achievement.objects.get_or_create(
-                    user=user,
-                    achievement_type='FIVE_WICKETS',
-                    match=match,
-                    defaults={
-                        'title': f'Five-wicket haul - {performance.wickets_taken} wickets',
-                        'description': f'Took {performance.wickets_taken} wickets in {match.team1.name} vs {match.team2.name}',
-                        'tournament': match.tournament
-                    }
-                )
+            if award['type'] == 'CENTURY':
+                runs = tracker.runs[player_id]
+                title = f'Century - {runs} runs'
+                description = f'{name} scored {runs} runs in {fixture}'
+            elif award['type'] == 'FIVE_WICKETS':
+                wickets = tracker.wickets[player_id]
+                title = f'Five-wicket haul - {wickets} wickets'
+                description = f'{name} took {wickets} wickets in {fixture}'
+            else:
+                title = f'Hat-trick - {name}'
+                description = f'{name} took wickets with three consecutive deliveries in {fixture}'
             
-            # Check for hat-trick (would need ball-by-ball data)
-            # This is simplified - in reality you'd check consecutive wickets
-            if performance.wickets_taken >= 3:
-                # Placeholder for hat-trick logic
-                pass
+            achievements.append(Achievement(
+                user_id=user_id, achievement_type=award['type'], title=title,
+                description=description, match=match, tournament=match.tournament
+            ))
+        
+        return achievements
     
     @classmethod
-    def check_rating_achievements(cls, user: User, old_rating: Decimal, new_rating: Decimal):
-        """Check for rating milestone achievements"""
+    def milestone_awards(cls, rating_changes: Iterable[Tuple[int, Decimal, Decimal]]) -> List:
+        """
+        Unsaved rating milestone achievements for (user id, old, new) changes.
+        A milestone is only awarded once per user, even if the rating dips
+        and recovers; already earned ones are found with a single query.
+        """
         from .models import Achievement
         
-        milestones = [1200, 1400, 1600, 1800, 2000, 2200]
-        
-        for milestone in milestones:
-            if old_rating < milestone <= new_rating:
-                Achievement.objects.get_or_create(
-                    user=user,
-                    achievement_type='RATING_MILESTONE',
-                    defaults={
-                        'title': f'Rating Milestone: {milestone}',
-                        'description': f'Reached a rating of {milestone} points'
-                    }
-                )
+        crossed = [
+            (user_id, f'Rating Milestone: {milestone}', milestone)
+            for user_id, old_rating, new_rating in rating_changes
+            for milestone in cls.RATING_MILESTONES
+            if old_rating < milestone <= new_rating
+        ]
+        if not crossed:
+            return []
+        
+        earned = set(Achievement.objects.filter(
+            user_id__in={user_id for user_id, _, _ in crossed},
+            achievement_type='RATING_MILESTONE'
+        ).values_list('user_id', 'title'))
+        
+        achievements = []
+        for user_id, title, milestone in crossed:
+            if (user_id, title) in earned:
+                continue
+            earned.add((user_id, title))
+            achievements.append(Achievement(
+                user_id=user_id, achievement_type='RATING_MILESTONE', title=title,
+                description=f'Reached a rating of {milestone} points'
+            ))
+        
+        return achievements
+    
+    @classmethod
+    def award_match(cls, match: Match, tracker: AchievementTracker,
+                    players: Dict[int, Tuple[str, int]],
+                    rating_changes: Dict[int, Tuple[Decimal, Decimal]]) -> List:
+        """
+        Write a match's achievements with one bulk_create: the tracker's
+        awards and any rating milestones the owners passed.
+        
+        Args:
+            players: player id -> (name, team id) for the match
+            rating_changes: user id -> (old rating, new rating)
+        """
+        from .models import Achievement
+        
+        return Achievement.objects.bulk_create(
+            cls.match_awards(match, tracker, players)
+            + cls.milestone_awards((user_id, old, new) for user_id, (old, new) in rating_changes.items()),
+            ignore_conflicts=True  # Already awarded, e.g. a match checked twice
+        )
+    
+    @classmethod
+    def check_match_achievements(cls, match: Match):
+        """
+        Check for achievements after a match from its stored balls, for
+        matches that were not tracked while being simulated
+        """
+        from .models import Ball
+        
+        balls = Ball.objects.filter(over__innings__match=match).order_by(
+            'over__innings__innings_type', 'over__over_number', 'ball_number'
+        ).values_list('bowler_id', 'batsman_id', 'outcome', 'runs', 'is_wicket', 'dismissal_type')
+        tracker = AchievementTracker.from_balls(balls)
+        
+        players = {
+            player_id: (name, team_id)
+            for player_id, name, team_id in match.player_performances.values_list(
+                'player_id', 'player__name', 'team_id'
+            )
+        }
+        tracker.awards = [award for award in tracker.awards if award['player_id'] in players]
+        return cls.award_match(match, tracker, players, {})
 
 class StatisticsCalculator:
-    """Calculate various cricket statistics"""
+    """Calculate various cricket statistics from the materialized career stats"""
     
     @classmethod
     def calculate_batting_average(cls, user: User) -> float:
         """Calculate career batting average"""
-        performances = PlayerPerformance.objects.filter(team__owner=user, runs_scored__gt=0)
-        if not performances.exists():
-            return 0.0
-        
-        total_runs = sum(p.runs_scored for p in performances)
-        dismissals = sum(1 for p in performances if p.how_out and p.how_out != 'not out')
-        
-        return total_runs / dismissals if dismissals > 0 else float(total_runs)
+        career, _ = CareerStatsCalculator.for_user(user)
+        return career.batting_average
     
     @classmethod
     def calculate_bowling_average(cls, user: User) -> float:
         """Calculate career bowling average"""
-        performances = PlayerPerformance.objects.filter(team__owner=user, wickets_taken__gt=0)
-        if not performances.exists():
-            return 0.0
-        
-        total_runs = sum(p.runs_conceded for p in performances)
-        total_wickets = sum(p.wickets_taken for p in performances)
-        
-        return total_runs / total_wickets if total_wickets > 0 else 0.0
+        career, _ = CareerStatsCalculator.for_user(user)
+        return career.bowling_average
     
     @classmethod
     def calculate_strike_rate(cls, user: User) -> float:
         """Calculate career strike rate"""
-        performances = PlayerPerformance.objects.filter(team__owner=user, balls_faced__gt=0)
-        if not performances.exists():
-            return 0.0
-        
-        total_runs = sum(p.runs_scored for p in performances)
-        total_balls = sum(p.balls_faced for p in performances)
-        
-        return (total_runs / total_balls) * 100 if total_balls > 0 else 0.0
+        career, _ = CareerStatsCalculator.for_user(user)
+        return career.strike_rate
     
     @classmethod
     def get_career_stats(cls, user: User) -> Dict:
         """Get comprehensive career statistics"""
         profile = user.cricket_profile
+        career, seasons = CareerStatsCalculator.for_user(user)
         
         return {
             'rating': {
@@ -291,12 +718,13 @@ class StatisticsCalculator:
                 'won': profile.tournaments_won
             },
             'batting': {
-                'average': cls.calculate_batting_average(user),
-                'strike_rate': cls.calculate_strike_rate(user),
-                'total_runs': profile.career_runs
+                'average': career.batting_average,
+                'strike_rate': career.strike_rate,
+                'total_runs': career.runs
             },
             'bowling': {
-                'average': cls.calculate_bowling_average(user),
-                'total_wickets': profile.career_wickets
-            }
+                'average': career.bowling_average,
+                'total_wickets': career.wickets
+            },
+            'seasons': [CareerStatsCalculator.summary(season) for season in seasons]
         }
@@ -11,6 +11,24 @@ class TeamSerializer(serializers.ModelSerializer):
     def get_players_count(self, obj):
         return obj.players.count()
 
+class TeamStrengthSerializer(serializers.ModelSerializer):
+    team_name = serializers.CharField(source='team.name', read_only=True)
+    
+    class Meta:
+        model = TeamStrength
+        fields = [
+            'team', 'team_name', 'player_ids', 'batting', 'bowling_mix',
+            'bowling_skill', 'fielding_avg', 'keeper_skill', 'updated_at'
+        ]
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    rank = serializers.IntegerField(read_only=True)  # Set by Leaderboard.page() and position()
+    username = serializers.CharField(source='user.username', read_only=True)
+    
+    class Meta:
+        model = LeaderboardEntry
+        fields = ['rank', 'user', 'username', 'rating']
+
 class BowlingAttributesSerializer(serializers.ModelSerializer):
     class Meta:
         model = BowlingAttributes
@@ -141,3 +159,54 @@ class BidSerializer(serializers.ModelSerializer):
             'id', 'auction', 'auction_name', 'player', 'player_name', 
             'team', 'team_name', 'amount', 'status', 'created_at'
         ]
+
+class PlayerValuationSerializer(serializers.ModelSerializer):
+    player_name = serializers.CharField(source='player.name', read_only=True)
+    player_type = serializers.CharField(source='player.player_type', read_only=True)
+    base_price = serializers.IntegerField(source='player.base_price', read_only=True)
+    runs_per_match = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = PlayerValuation
+        fields = [
+            'player', 'player_name', 'player_type', 'base_price',
+            'runs_added', 'runs_saved', 'runs_per_match', 'updated_at'
+        ]
+    
+    def get_runs_per_match(self, obj):
+        return round(obj.runs_added + obj.runs_saved, 2)
+
+class BidHistorySerializer(serializers.Serializer):
+    """A live or archived bid, as read by BidArchive.history"""
+    id = serializers.IntegerField()
+    player = serializers.IntegerField(source='player_id')
+    team = serializers.IntegerField(source='team_id')
+    amount = serializers.IntegerField()
+    status = serializers.CharField()
+    created_at = serializers.DateTimeField()
+
+class ProxyBidSerializer(serializers.ModelSerializer):
+    team_name = serializers.CharField(source='team.name', read_only=True)
+    player_name = serializers.CharField(source='player.name', read_only=True)
+    
+    class Meta:
+        model = ProxyBid
+        fields = [
+            'id', 'auction', 'player', 'player_name', 'team', 'team_name',
+            'max_amount', 'created_at', 'updated_at'
+        ]
+
+class BallSerializer(serializers.ModelSerializer):
+    innings_type = serializers.CharField(source='over.innings.innings_type', read_only=True)
+    over_number = serializers.IntegerField(source='over.over_number', read_only=True)
+    bowler_name = serializers.CharField(source='bowler.name', read_only=True)
+    batsman_name = serializers.CharField(source='batsman.name', read_only=True)
+    fielder_name = serializers.CharField(source='fielder.name', read_only=True, default=None)
+    
+    class Meta:
+        model = Ball
+        fields = [
+            'id', 'innings_type', 'over_number', 'ball_number',
+            'bowler', 'bowler_name', 'batsman', 'batsman_name',
+            'outcome', 'runs', 'is_wicket', 'dismissal_type', 'fielder', 'fielder_name'
+        ]
@@ -0,0 +1,60 @@
+# signals.py - Keep denormalized tables in step with player and profile changes
+
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from .models import (
+    Player, BowlingAttributes, BattingAttributes,
+    WicketKeepingAttributes, UserProfile, TeamStrength
+)
+from .team_strength import TeamStrengthCalculator
+from .leaderboard import Leaderboard
+
+
+@receiver(pre_save, sender=Player)
+def invalidate_team_strength_for_player(sender, instance, update_fields=None, **kwargs):
+    """
+    A player joined or changed a field the strength vector reads: mark the
+    team they are in, and any team they are leaving, stale.
+    """
+    fields = TeamStrengthCalculator.PLAYER_FIELDS
+    if update_fields is not None:
+        update_fields = {'team_id' if field == 'team' else field for field in update_fields}
+        if not update_fields & set(fields):
+            return
+
+    if instance._state.adding:
+        TeamStrengthCalculator.invalidate([instance.team_id])
+        return
+
+    stored = Player.objects.filter(pk=instance.pk).values_list(*fields).first()
+    if stored is None or stored != tuple(getattr(instance, field) for field in fields):
+        TeamStrengthCalculator.invalidate({instance.team_id, stored[0] if stored else None})
+
+
+@receiver(post_delete, sender=Player)
+def invalidate_team_strength_for_removed_player(sender, instance, **kwargs):
+    TeamStrengthCalculator.invalidate([instance.team_id])
+
+
+@receiver(post_save, sender=BowlingAttributes)
+@receiver(post_save, sender=BattingAttributes)
+@receiver(post_save, sender=WicketKeepingAttributes)
+@receiver(post_delete, sender=BowlingAttributes)
+@receiver(post_delete, sender=BattingAttributes)
+@receiver(post_delete, sender=WicketKeepingAttributes)
+def invalidate_team_strength_for_attributes(sender, instance, **kwargs):
+    """Mark the player's team stale (fielding attributes don't feed the vector)"""
+    TeamStrength.objects.filter(team__players=instance.player_id, stale=False).update(stale=True)
+
+
+@receiver(post_save, sender=UserProfile)
+def add_profile_to_leaderboard(sender, instance, created, **kwargs):
+    """New profiles enter the leaderboard at their starting rating"""
+    if created:
+        Leaderboard.add(instance.user_id, instance.current_rating)
+
+
+@receiver(pre_delete, sender=UserProfile)
+def remove_profile_from_leaderboard(sender, instance, **kwargs):
+    """Take the user off the leaderboard before the profile (or its user) goes"""
+    Leaderboard.remove(instance.user_id)
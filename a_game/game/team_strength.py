@@ -0,0 +1,159 @@
+# team_strength.py - Denormalized team strength vectors for previews and matchmaking
+
+from typing import Dict, Iterable, List, Optional
+from django.core.exceptions import ObjectDoesNotExist
+from .models import Player, Team, TeamStrength, BattingAttributes
+from .match_engine import MatchEngine
+from .enhanced_match_engine import EnhancedMatchEngine
+
+
+class TeamStrengthCalculator:
+    """
+    Build and maintain each team's strength vector: batting against every
+    delivery, bowling type mix, fielding average and keeper skill for the
+    current playing eleven.
+
+    Signals mark a team's vector stale when a player or attribute it reads
+    changes; get() recomputes stale vectors on the next read, so a burst
+    of player edits costs one recomputation rather than one per save.
+    """
+
+    BATTING_FIELDS = [
+        'off_break', 'arm_ball', 'doosra', 'carrom_ball', 'leg_break',
+        'googly', 'slider', 'flipper', 'top_spin', 'pace', 'swing', 'seam',
+        'bouncer', 'yorkers', 'power_hitting', 'technique', 'footwork',
+        'shot_selection'
+    ]
+
+    PLAYER_ATTRIBUTES = [
+        'bowling_attributes', 'batting_attributes',
+        'wicketkeeping_attributes', 'fielding_attributes'
+    ]
+
+    # Player fields compute() reads; saves touching none of them keep the vector
+    PLAYER_FIELDS = ['team_id', 'first_eleven', 'overall_skill', 'bowling', 'fielding', 'wicketkeeping']
+
+    @classmethod
+    def compute(cls, team: Team, players: Optional[List[Player]] = None) -> Dict:
+        """Calculate the strength vector for a team's playing eleven"""
+        if players is None:
+            players = list(Player.objects.filter(team=team).select_related(*cls.PLAYER_ATTRIBUTES))
+
+        try:
+            eleven = EnhancedMatchEngine.select_playing_eleven(team, players)
+        except ValueError:
+            eleven = []
+
+        # Batting against each delivery (players without attributes count as default)
+        batting = {}
+        for field in cls.BATTING_FIELDS:
+            default = BattingAttributes._meta.get_field(field).default
+            values = []
+            for player in eleven:
+                attributes = player.batting_attributes if cls._has(player, 'batting_attributes') else None
+                values.append(getattr(attributes, field) if attributes else default)
+            batting[field] = round(sum(values) / len(values), 2) if values else 0
+
+        # Bowling type mix among players who bowl
+        bowling_mix = {}
+        bowling_totals = {}
+        for player in eleven:
+            if not (player.bowling and player.bowling > 0):
+                continue
+            bowler_type = player.bowling_attributes.bowler_type if cls._has(player, 'bowling_attributes') else 'MEDIUM'
+            bowling_mix[bowler_type] = bowling_mix.get(bowler_type, 0) + 1
+            bowling_totals[bowler_type] = bowling_totals.get(bowler_type, 0) + player.bowling
+
+        fielding_scores = [p.fielding for p in eleven if p.fielding is not None]
+
+        keeper_skill = None
+        for player in eleven:
+            if player.wicketkeeping and player.wicketkeeping > 0:
+                keeper_skill = (
+                    player.wicketkeeping_attributes.overall_skill
+                    if cls._has(player, 'wicketkeeping_attributes') else player.wicketkeeping
+                )
+                break
+
+        return {
+            'player_ids': [p.id for p in eleven],
+            'batting': batting,
+            'bowling_mix': bowling_mix,
+            'bowling_skill': {
+                bowler_type: round(total / bowling_mix[bowler_type], 2)
+                for bowler_type, total in bowling_totals.items()
+            },
+            'fielding_avg': round(sum(fielding_scores) / len(fielding_scores), 2) if fielding_scores else 50,
+            'keeper_skill': keeper_skill
+        }
+
+    @staticmethod
+    def _has(player: Player, relation: str) -> bool:
+        """Check a reverse one-to-one without raising DoesNotExist"""
+        try:
+            getattr(player, relation)
+            return True
+        except ObjectDoesNotExist:
+            return False
+
+    @classmethod
+    def refresh(cls, team_ids: Iterable[int]):
+        """Recompute and store the strength vectors of the given teams"""
+        team_ids = {team_id for team_id in team_ids if team_id}
+        if not team_ids:
+            return
+
+        players_by_team = {team_id: [] for team_id in team_ids}
+        for player in Player.objects.filter(team_id__in=team_ids).select_related(*cls.PLAYER_ATTRIBUTES):
+            players_by_team[player.team_id].append(player)
+
+        for team in Team.objects.filter(id__in=team_ids):
+            TeamStrength.objects.update_or_create(
+                team=team, defaults={**cls.compute(team, players_by_team[team.id]), 'stale': False}
+            )
+
+    @classmethod
+    def invalidate(cls, team_ids: Iterable[int]):
+        """Mark the given teams' vectors stale without recomputing them"""
+        team_ids = {team_id for team_id in team_ids if team_id}
+        if team_ids:
+            TeamStrength.objects.filter(team_id__in=team_ids, stale=False).update(stale=True)
+
+    @classmethod
+    def get(cls, team: Team) -> TeamStrength:
+        """Get a team's strength vector, building it on first use or when stale"""
+        try:
+            strength = team.strength
+        except TeamStrength.DoesNotExist:
+            strength = None
+
+        if strength is None or strength.stale:
+            cls.refresh([team.id])
+            strength = TeamStrength.objects.get(team=team)
+        return strength
+
+    @classmethod
+    def matchup(cls, strength: TeamStrength, opponent: TeamStrength) -> Dict:
+        """
+        Compare a team's batting with the deliveries the opponent bowls.
+
+        Batting is averaged over the opponent's bowler types (weighted by how
+        many of each it has) and set against the opponent's bowling skill.
+        """
+        total_bowlers = sum(opponent.bowling_mix.values())
+        if not total_bowlers:
+            return {'batting_vs_attack': None, 'attack_skill': None, 'edge': None}
+
+        batting_vs_attack = 0.0
+        attack_skill = 0.0
+        for bowler_type, count in opponent.bowling_mix.items():
+            deliveries = MatchEngine.DELIVERY_TYPES.get(bowler_type, [])
+            skill = sum(strength.batting.get(d, 50) for d in deliveries) / len(deliveries) if deliveries else 50
+            batting_vs_attack += skill * count / total_bowlers
+            attack_skill += opponent.bowling_skill.get(bowler_type, 50) * count / total_bowlers
+
+        return {
+            'batting_vs_attack': round(batting_vs_attack, 2),
+            'attack_skill': round(attack_skill, 2),
+            'edge': round(batting_vs_attack - attack_skill, 2)
+        }
@@ -0,0 +1,624 @@
+# tests.py - Tests for match simulation, auctions, the outbox, the leaderboard and API validation
+
+import random
+from decimal import Decimal
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from .models import *
+from .enhanced_match_engine import EnhancedMatchEngine, SimulationConflict
+from .auction_stream import AuctionStream
+from .bidding import BiddingSystem
+from .leaderboard import Leaderboard
+from .lineup_optimizer import LineupOptimizer
+from .outbox import MatchOutbox
+from .team_strength import TeamStrengthCalculator
+from .views import MatchViewSet
+
+
+class GameTestCase(TestCase):
+    """Four owned teams of twelve players, plus twelve unsold players, from create_sample_data"""
+
+    TEAMS = 4
+    SQUAD = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        random.seed(0)
+        call_command('create_sample_data', teams=cls.TEAMS, players=cls.TEAMS * cls.SQUAD + 12, stdout=StringIO())
+
+        now = timezone.now()
+        cls.tournament = Tournament.objects.create(
+            name='League', tournament_type='LEAGUE',
+            registration_start=now, registration_end=now, tournament_start=now
+        )
+        cls.pitch = PitchCondition.objects.first()
+        cls.weather = WeatherCondition.objects.first()
+
+        cls.teams = list(Team.objects.order_by('id'))
+        players = list(Player.objects.order_by('id'))
+        for i, team in enumerate(cls.teams):
+            team.owner = User.objects.create_user(f'owner{i}')
+            team.tournament = cls.tournament
+            team.save()
+            UserProfile.objects.create(user=team.owner)
+            Player.objects.filter(id__in=[p.id for p in players[i * cls.SQUAD:(i + 1) * cls.SQUAD]]).update(team=team)
+        cls.free_players = players[cls.TEAMS * cls.SQUAD:]
+
+    def new_match(self, team1=None, team2=None) -> Match:
+        return Match.objects.create(
+            tournament=self.tournament,
+            team1=team1 or self.teams[0], team2=team2 or self.teams[1],
+            pitch_condition=self.pitch, weather_condition=self.weather
+        )
+
+
+class SimulationResumeTests(GameTestCase):
+
+    def _ball_record(self, match):
+        return list(Ball.objects.filter(over__innings__match=match).order_by(
+            'over__innings__innings_type', 'over__over_number', 'ball_number'
+        ).values_list('over__innings__innings_type', 'over__over_number', 'outcome', 'runs', 'bowler_id', 'batsman_id'))
+
+    def _interrupt(self, match, seed, after_overs):
+        """Run a simulation that dies after a number of overs, as a crashed worker would"""
+        simulate_over = EnhancedMatchEngine.simulate_over
+        bowled = []
+
+        def failing_over(engine, *args, **kwargs):
+            if len(bowled) == after_overs:
+                raise RuntimeError('worker died')
+            bowled.append(1)
+            return simulate_over(engine, *args, **kwargs)
+
+        with mock.patch.object(EnhancedMatchEngine, 'simulate_over', failing_over):
+            with self.assertRaises(RuntimeError):
+                EnhancedMatchEngine(match, seed=seed).simulate_match(max_overs=10)
+
+    def _expire_lease(self, match):
+        Match.objects.filter(id=match.id).update(
+            updated_at=timezone.now() - timedelta(seconds=EnhancedMatchEngine.LEASE_SECONDS + 1)
+        )
+
+    def test_checkpoint_saved_during_simulation(self):
+        match = self.new_match()
+        self._interrupt(match, seed=7, after_overs=7)
+
+        checkpoint = SimulationCheckpoint.objects.get(match=match)
+        self.assertEqual(checkpoint.innings_type, 'FIRST')
+        self.assertEqual(checkpoint.overs_completed, EnhancedMatchEngine.CHECKPOINT_INTERVAL)
+        self.assertNotIn('over_summaries', checkpoint.state['progress'])
+        self.assertEqual(Match.objects.get(id=match.id).status, 'IN_PROGRESS')
+
+    def test_seeded_resume_matches_uninterrupted_run(self):
+        uninterrupted = self.new_match()
+        expected = EnhancedMatchEngine(uninterrupted, seed=7).simulate_match(max_overs=10)
+
+        # Mid first innings and mid second innings; the resumed engine's own seed is unused
+        for after_overs in (7, 13):
+            with self.subTest(after_overs=after_overs):
+                match = self.new_match()
+                self._interrupt(match, seed=7, after_overs=after_overs)
+                self._expire_lease(match)
+
+                result = EnhancedMatchEngine(Match.objects.get(id=match.id), seed=99).simulate_match(max_overs=10)
+
+                self.assertEqual(result['winner'], expected['winner'])
+                self.assertEqual(result['margin'], expected['margin'])
+                for innings in ('first_innings', 'second_innings'):
+                    self.assertEqual(result[innings]['total_runs'], expected[innings]['total_runs'])
+                    self.assertEqual(result[innings]['over_summaries'], expected[innings]['over_summaries'])
+                self.assertEqual(self._ball_record(match), self._ball_record(uninterrupted))
+                self.assertFalse(SimulationCheckpoint.objects.filter(match=match).exists())
+
+    def test_interruption_before_first_checkpoint_starts_over(self):
+        uninterrupted = self.new_match()
+        expected = EnhancedMatchEngine(uninterrupted, seed=7).simulate_match(max_overs=10)
+
+        match = self.new_match()
+        self._interrupt(match, seed=7, after_overs=3)
+        self.assertFalse(SimulationCheckpoint.objects.filter(match=match).exists())
+        self._expire_lease(match)
+
+        result = EnhancedMatchEngine(Match.objects.get(id=match.id), seed=7).simulate_match(max_overs=10)
+        self.assertEqual(result['margin'], expected['margin'])
+        self.assertEqual(self._ball_record(match), self._ball_record(uninterrupted))
+
+    def test_running_simulation_is_not_claimed_twice(self):
+        match = self.new_match()
+        self._interrupt(match, seed=7, after_overs=7)
+
+        with self.assertRaises(SimulationConflict):
+            EnhancedMatchEngine(Match.objects.get(id=match.id)).simulate_match(max_overs=10)
+
+        self._expire_lease(match)
+        result = EnhancedMatchEngine(Match.objects.get(id=match.id)).simulate_match(max_overs=10, compact=True)
+        self.assertEqual(Match.objects.get(id=match.id).status, 'COMPLETED')
+        self.assertEqual(result['match_id'], match.id)
+
+
+class AuctionTestCase(GameTestCase):
+
+    def setUp(self):
+        self.auction = Auction.objects.create(name='Auction', status='ACTIVE', start_time=timezone.now())
+        self.auction.participating_teams.add(*self.teams)
+        self.auction.players_pool.add(*self.free_players)
+        BiddingSystem.open_lots(self.auction, self.free_players)
+        self.player = self.free_players[0]
+
+    def lot(self, player=None) -> AuctionLot:
+        return AuctionLot.objects.get(auction=self.auction, player=player or self.player)
+
+    def bid(self, team, amount, player=None) -> Bid:
+        return BiddingSystem.place_bid(self.auction, player or self.player, team, amount)
+
+    def reserved(self, team) -> int:
+        return BudgetReservation.objects.filter(team=team).values_list('reserved', flat=True).first() or 0
+
+
+class BidTests(AuctionTestCase):
+
+    def test_first_bid_leads_the_lot(self):
+        bid = self.bid(self.teams[0], 100000)
+
+        lot = self.lot()
+        self.assertEqual(bid.status, 'ACTIVE')
+        self.assertEqual((lot.highest_bid_id, lot.highest_team_id, lot.highest_amount), (bid.id, self.teams[0].id, 100000))
+        self.assertEqual(lot.bid_count, 1)
+
+    def test_bid_must_beat_the_highest(self):
+        self.bid(self.teams[0], 100000)
+
+        for amount in (100000, 50000):
+            with self.subTest(amount=amount), self.assertRaises(ValueError):
+                self.bid(self.teams[1], amount)
+        self.assertEqual(self.lot().bid_count, 1)
+
+    def test_higher_bid_outbids_the_leader(self):
+        first = self.bid(self.teams[0], 100000)
+        broker = mock.Mock()
+        with mock.patch.object(AuctionStream, 'broker', return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                second = self.bid(self.teams[1], 150000)
+
+        first.refresh_from_db()
+        lot = self.lot()
+        self.assertEqual(first.status, 'OUTBID')
+        self.assertEqual(second.status, 'ACTIVE')
+        self.assertEqual((lot.highest_bid_id, lot.highest_amount, lot.bid_count), (second.id, 150000, 2))
+
+        events = [message for _, message in (call.args for call in broker.publish.call_args_list)]
+        self.assertEqual([event['type'] for event in events], ['outbid', 'bid'])
+        self.assertEqual((events[0]['bid_id'], events[0]['team_id']), (first.id, self.teams[0].id))
+
+    def test_finalize_sells_the_lot_once(self):
+        bid = self.bid(self.teams[0], 100000)
+        money_left = self.teams[0].money_left
+
+        player = BiddingSystem.finalize(bid)
+
+        bid.refresh_from_db()
+        self.assertEqual(bid.status, 'WON')
+        self.assertEqual(player.team_id, self.teams[0].id)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).money_left, money_left - 100000)
+        self.assertEqual(self.lot().status, 'SOLD')
+        with self.assertRaises(ValueError):
+            BiddingSystem.finalize(bid)
+        with self.assertRaises(ValueError):
+            self.bid(self.teams[1], 200000)
+
+
+class BudgetReservationTests(AuctionTestCase):
+
+    def test_leading_bids_hold_their_amount(self):
+        self.bid(self.teams[0], 100000)
+        self.assertEqual(self.reserved(self.teams[0]), 100000)
+
+        # Raising its own bid holds only the new amount, not both
+        self.bid(self.teams[0], 150000)
+        self.assertEqual(self.reserved(self.teams[0]), 150000)
+
+        self.bid(self.teams[0], 50000, player=self.free_players[1])
+        self.assertEqual(self.reserved(self.teams[0]), 200000)
+
+    def test_outbid_releases_the_previous_leader(self):
+        self.bid(self.teams[0], 100000)
+        self.bid(self.teams[1], 150000)
+
+        self.assertEqual(self.reserved(self.teams[0]), 0)
+        self.assertEqual(self.reserved(self.teams[1]), 150000)
+
+    def test_reservations_cap_what_a_team_can_lead_with(self):
+        Team.objects.filter(id=self.teams[0].id).update(money_left=250000)
+        self.bid(self.teams[0], 200000)
+
+        with self.assertRaisesMessage(ValueError, 'Insufficient budget'):
+            self.bid(self.teams[0], 100000, player=self.free_players[1])
+        self.bid(self.teams[0], 50000, player=self.free_players[1])
+        self.assertEqual(self.reserved(self.teams[0]), 250000)
+
+        # Losing a lot frees its money for another
+        self.bid(self.teams[1], 210000)
+        self.bid(self.teams[0], 200000, player=self.free_players[2])
+        self.assertEqual(self.reserved(self.teams[0]), 250000)
+
+    def test_closing_a_lot_releases_its_reservation(self):
+        sold = self.bid(self.teams[0], 100000)
+        self.bid(self.teams[0], 60000, player=self.free_players[1])
+        money_left = self.teams[0].money_left
+
+        BiddingSystem.finalize(sold)
+        self.assertEqual(self.reserved(self.teams[0]), 60000)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).money_left, money_left - 100000)
+
+        BiddingSystem.pass_lot(AuctionLot.objects.select_for_update().get(id=self.lot(self.free_players[1]).id))
+        self.assertEqual(self.reserved(self.teams[0]), 0)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).money_left, money_left - 100000)
+
+
+class ProxyBidTests(AuctionTestCase):
+
+    def proxy(self, team, max_amount, player=None):
+        return BiddingSystem.place_proxy_bid(self.auction, player or self.player, team, max_amount)
+
+    def test_lone_proxy_leads_one_increment_above_the_price(self):
+        self.bid(self.teams[1], 100000)
+        result = self.proxy(self.teams[0], 300000)
+
+        self.assertTrue(result['leading'])
+        self.assertEqual(result['highest_amount'], 100000 + BiddingSystem.PROXY_INCREMENT)
+        self.assertEqual(self.lot().highest_team_id, self.teams[0].id)
+
+    def test_highest_maximum_wins_at_runner_up_plus_increment(self):
+        self.proxy(self.teams[0], 300000)
+        result = self.proxy(self.teams[1], 200000)
+
+        self.assertFalse(result['leading'])
+        lot = self.lot()
+        self.assertEqual((lot.highest_team_id, lot.highest_amount), (self.teams[0].id, 210000))
+        # Only the resolved price is written, however many proxies competed
+        self.assertEqual(Bid.objects.filter(auction=self.auction, player=self.player).count(), 2)
+
+    def test_equal_maximums_go_to_the_earlier_proxy(self):
+        self.proxy(self.teams[0], 200000)
+        self.proxy(self.teams[1], 200000)
+
+        lot = self.lot()
+        self.assertEqual((lot.highest_team_id, lot.highest_amount), (self.teams[0].id, 200000))
+
+    def test_proxy_answers_a_manual_bid(self):
+        self.proxy(self.teams[0], 300000)
+        bid = self.bid(self.teams[1], 150000)
+
+        self.assertEqual(bid.status, 'OUTBID')
+        lot = self.lot()
+        self.assertEqual((lot.highest_team_id, lot.highest_amount), (self.teams[0].id, 160000))
+
+    def test_proxy_stops_at_the_budget_left_uncommitted(self):
+        Team.objects.filter(id=self.teams[0].id).update(money_left=250000)
+        self.proxy(self.teams[0], 200000)
+        self.bid(self.teams[0], 200000, player=self.free_players[1])
+
+        self.bid(self.teams[1], 100000)
+
+        lot = self.lot()
+        self.assertEqual((lot.highest_team_id, lot.highest_amount), (self.teams[1].id, 100000))
+        self.assertEqual(self.reserved(self.teams[0]), 200000)
+
+    def test_proxy_must_beat_the_price_and_fit_the_budget(self):
+        self.bid(self.teams[1], 100000)
+
+        with self.assertRaises(ValueError):
+            self.proxy(self.teams[0], 100000)
+        with self.assertRaisesMessage(ValueError, 'Insufficient budget'):
+            self.proxy(self.teams[0], self.teams[0].money_left + 1)
+
+
+class CloseAuctionTests(AuctionTestCase):
+
+    def test_close_sells_every_lot_to_its_leading_bid(self):
+        won = self.bid(self.teams[0], 100000)
+        lost = self.bid(self.teams[1], 50000, player=self.free_players[1])
+        leading = self.bid(self.teams[2], 80000, player=self.free_players[1])
+        money_left = {team.id: team.money_left for team in self.teams}
+
+        summary = self.auction.close()
+
+        self.assertEqual(summary, {'sold': 2, 'unsold': len(self.free_players) - 2, 'spent': {
+            self.teams[0].id: 100000, self.teams[2].id: 80000
+        }})
+        self.assertEqual(Auction.objects.get(id=self.auction.id).status, 'COMPLETED')
+        self.assertEqual(
+            dict(Bid.objects.filter(id__in=[won.id, lost.id, leading.id]).values_list('id', 'status')),
+            {won.id: 'WON', lost.id: 'OUTBID', leading.id: 'WON'}
+        )
+        self.assertEqual(Player.objects.get(id=self.player.id).team_id, self.teams[0].id)
+        self.assertEqual(Player.objects.get(id=self.free_players[1].id).sold_price, 80000)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).money_left, money_left[self.teams[0].id] - 100000)
+        self.assertEqual(Team.objects.get(id=self.teams[1].id).money_left, money_left[self.teams[1].id])
+        self.assertEqual(self.lot().status, 'SOLD')
+        self.assertEqual(self.lot(self.free_players[2]).status, 'UNSOLD')
+        self.assertFalse(BudgetReservation.objects.exclude(reserved=0).exists())
+
+    def test_team_short_of_money_buys_in_pool_order(self):
+        self.bid(self.teams[0], 200000)
+        self.bid(self.teams[0], 100000, player=self.free_players[1])
+        Team.objects.filter(id=self.teams[0].id).update(money_left=250000)  # Spent elsewhere since
+
+        summary = self.auction.close()
+
+        self.assertEqual(summary['sold'], 1)
+        self.assertEqual(Team.objects.get(id=self.teams[0].id).money_left, 50000)
+        self.assertEqual(self.lot().status, 'SOLD')
+        self.assertEqual(self.lot(self.free_players[1]).status, 'UNSOLD')
+        self.assertIsNone(Player.objects.get(id=self.free_players[1].id).team_id)
+
+    def test_close_marks_buying_teams_strength_stale(self):
+        TeamStrengthCalculator.get(self.teams[0])
+        self.bid(self.teams[0], 100000)
+
+        self.auction.close()
+
+        self.assertTrue(TeamStrength.objects.get(team=self.teams[0]).stale)
+        strength = TeamStrengthCalculator.get(Team.objects.get(id=self.teams[0].id))
+        self.assertFalse(strength.stale)
+
+    def test_statement_count_does_not_grow_with_lots(self):
+        def close_with_sales(auction, players):
+            for i, player in enumerate(players):
+                BiddingSystem.place_bid(auction, player, self.teams[i % len(self.teams)], 100000)
+            with CaptureQueriesContext(connection) as queries:
+                auction.close()
+            return len(queries)
+
+        few = close_with_sales(self.auction, self.free_players[:2])
+        other = Auction.objects.create(name='Other', status='ACTIVE', start_time=timezone.now())
+        BiddingSystem.open_lots(other, self.free_players)
+        self.assertEqual(close_with_sales(other, self.free_players[2:10]), few)
+
+    def test_closed_auction_cannot_close_again(self):
+        self.auction.close()
+        with self.assertRaises(ValueError):
+            self.auction.close()
+
+
+class OutboxTests(GameTestCase):
+
+    def complete_match(self, team1=None, team2=None, seed=1) -> Match:
+        match = self.new_match(team1, team2)
+        EnhancedMatchEngine(match, seed=seed, defer_processing=True).simulate_match(max_overs=2, compact=True)
+        return match
+
+    def test_completed_match_is_rated_when_its_event_is_processed(self):
+        match = self.complete_match()
+
+        event = OutboxEvent.objects.get(match=match)
+        self.assertIsNone(event.processed_at)
+        self.assertFalse(RatingHistory.objects.filter(match=match).exists())
+
+        self.assertEqual(MatchOutbox.process(), {'processed': 1, 'failed': 0, 'batches': 1})
+
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(RatingHistory.objects.filter(match=match).count(), 2)
+        winner = UserProfile.objects.get(user_id=match.winner.owner_id)
+        self.assertGreater(winner.current_rating, 1000)
+        self.assertEqual(MatchOutbox.process(), {'processed': 0, 'failed': 0, 'batches': 0})
+
+    def test_failed_batch_is_retried_event_by_event(self):
+        good = self.complete_match(seed=1)
+        bad = self.complete_match(self.teams[2], self.teams[3], seed=2)
+        OutboxEvent.objects.filter(match=bad).update(payload={'players': {'1': 5}})
+
+        with self.assertLogs('game.outbox', 'ERROR'):
+            result = MatchOutbox.process_batch()
+
+        self.assertEqual(result, {'processed': 1, 'failed': 1})
+        self.assertTrue(RatingHistory.objects.filter(match=good).exists())
+        self.assertFalse(RatingHistory.objects.filter(match=bad).exists())
+        event = OutboxEvent.objects.get(match=bad)
+        self.assertIsNone(event.processed_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('TypeError', event.last_error)
+
+    def test_event_is_given_up_after_max_attempts(self):
+        bad = self.complete_match()
+        OutboxEvent.objects.filter(match=bad).update(payload={'players': {'1': 5}})
+
+        with self.assertLogs('game.outbox', 'ERROR'):
+            totals = MatchOutbox.process()
+
+        self.assertEqual(totals['failed'], MatchOutbox.MAX_ATTEMPTS)
+        self.assertEqual(OutboxEvent.objects.get(match=bad).attempts, MatchOutbox.MAX_ATTEMPTS)
+        self.assertEqual(MatchOutbox.process_batch(), {'processed': 0, 'failed': 0})
+
+
+class LeaderboardTests(GameTestCase):
+
+    RATINGS = ['1012.50', '1012.25', '998.00', '1012.50', '1250.75', '998.99', '1000.00', '740.10']
+
+    def setUp(self):
+        # Profiles join the leaderboard at their starting rating
+        for i, rating in enumerate(self.RATINGS):
+            UserProfile.objects.create(user=User.objects.create_user(f'player{i}'), current_rating=Decimal(rating))
+
+    def rate(self, user_id, rating):
+        UserProfile.objects.filter(user_id=user_id).update(current_rating=Decimal(rating))
+        Leaderboard.move(user_id, Decimal(rating))
+
+    def expected_order(self):
+        return list(UserProfile.objects.order_by('-current_rating', 'user_id').values_list('user_id', flat=True))
+
+    def test_pages_follow_rating_then_user_order(self):
+        expected = self.expected_order()
+        self.assertEqual(Leaderboard.total(), len(expected))
+
+        for page_size in (1, 3, 5, len(expected)):
+            with self.subTest(page_size=page_size):
+                entries = []
+                for page in range(1, len(expected) // page_size + 2):
+                    entries.extend(Leaderboard.page(page, page_size))
+                self.assertEqual([entry.user_id for entry in entries], expected)
+                self.assertEqual([entry.rank for entry in entries], list(range(1, len(expected) + 1)))
+
+    def test_rank_counts_buckets_above_and_ties_within(self):
+        for rank, user_id in enumerate(self.expected_order(), start=1):
+            rating = LeaderboardEntry.objects.get(user_id=user_id).rating
+            self.assertEqual(Leaderboard.rank(rating, user_id), rank)
+
+    def test_moves_keep_ranks_and_buckets_consistent(self):
+        users = self.expected_order()
+        self.rate(users[-1], '1300.00')
+        self.rate(users[0], '1012.40')
+        User.objects.get(id=users[1]).delete()
+
+        expected = self.expected_order()
+        self.assertEqual(expected[0], users[-1])
+        self.assertNotIn(users[1], expected)
+        self.assertEqual([entry.user_id for entry in Leaderboard.page(1, 100)], expected)
+        position = Leaderboard.position(users[0], around=2)
+        self.assertEqual(position['entry'].rank, expected.index(users[0]) + 1)
+        self.assertEqual(
+            [entry.user_id for entry in position['neighbours']],
+            expected[max(0, position['entry'].rank - 3):position['entry'].rank + 2]
+        )
+
+        buckets = dict(LeaderboardBucket.objects.filter(entries__gt=0).values_list('rating', 'entries'))
+        Leaderboard.rebuild()
+        self.assertEqual(dict(LeaderboardBucket.objects.values_list('rating', 'entries')), buckets)
+
+
+class OptimizeElevenValidationTests(GameTestCase):
+
+    def optimize(self, **params):
+        params.setdefault('opponent', self.teams[1].id)
+        return self.client.get(f'/api/teams/{self.teams[0].id}/optimize_eleven/', params)
+
+    def test_rejects_bad_parameters(self):
+        cases = [
+            {'opponent': ''},
+            {'opponent': 'x'},
+            {'pitch_condition': 'x'},
+            {'max_overs': 'x'},
+            {'max_overs': 0},
+            {'max_overs': 51},
+        ]
+        for params in cases:
+            with self.subTest(**params):
+                self.assertEqual(self.optimize(**params).status_code, 400)
+
+    def test_unknown_opponent_is_not_found(self):
+        self.assertEqual(self.optimize(opponent=999999).status_code, 404)
+
+    def test_valid_request_picks_an_eleven(self):
+        response = self.optimize(max_overs=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['playing_eleven']), 11)
+
+    def test_swap_search_is_capped_for_large_squads(self):
+        Player.objects.filter(id__in=[p.id for p in self.free_players]).update(team=self.teams[0])
+        optimizer = LineupOptimizer(self.teams[0], self.teams[1], max_overs=5)
+        self.assertEqual(len(optimizer.squad), self.SQUAD + len(self.free_players))
+
+        with mock.patch.object(LineupOptimizer, 'MAX_BENCH', 3):
+            result = optimizer.optimize()
+
+        # Only the default eleven and the three strongest reserves are ever tried
+        default = EnhancedMatchEngine.select_playing_eleven(self.teams[0], optimizer.squad)
+        reserves = sorted(
+            (p for p in optimizer.squad if p not in default), key=lambda p: p.overall_skill, reverse=True
+        )[:3]
+        self.assertLessEqual({p.id for p in result['playing_eleven']}, {p.id for p in default + reserves})
+
+
+class SimulateValidationTests(GameTestCase):
+
+    def simulate(self, match, **data):
+        return self.client.post(f'/api/matches/{match.id}/simulate/', data, content_type='application/json')
+
+    def test_rejects_bad_max_overs(self):
+        match = self.new_match()
+        for max_overs in ('x', None, 0, 51):
+            with self.subTest(max_overs=max_overs):
+                self.assertEqual(self.simulate(match, max_overs=max_overs).status_code, 400)
+        self.assertEqual(Match.objects.get(id=match.id).status, 'SCHEDULED')
+
+    def test_completed_match_cannot_be_simulated_again(self):
+        match = self.new_match()
+        self.assertEqual(self.simulate(match, max_overs=2, compact=True).status_code, 200)
+        self.assertEqual(self.simulate(match, max_overs=2, compact=True).status_code, 400)
+
+    def test_match_being_simulated_is_a_conflict(self):
+        match = self.new_match()
+        self.assertTrue(EnhancedMatchEngine.claim(match))
+
+        self.assertEqual(self.simulate(match, max_overs=2).status_code, 409)
+
+    def test_compact_result_links_ball_detail(self):
+        match = self.new_match()
+        response = self.simulate(match, max_overs=2, compact=True)
+
+        self.assertEqual(response.status_code, 200)
+        innings = response.json()['innings']
+        self.assertEqual(len(innings), 2)
+        balls = self.client.get(innings[0]['balls_url'])
+        self.assertEqual(balls.status_code, 200)
+        self.assertGreater(balls.json()['count'], 0)
+
+
+class SimulateBatchValidationTests(GameTestCase):
+
+    def simulate_batch(self, **data):
+        return self.client.post('/api/matches/simulate_batch/', data, content_type='application/json')
+
+    def test_rejects_bad_parameters(self):
+        match = self.new_match()
+        cases = [
+            {},
+            {'match_ids': match.id},
+            {'match_ids': ['1']},
+            {'match_ids': [True]},
+            {'match_ids': list(range(1, MatchViewSet.MAX_BATCH + 2))},
+            {'tournament_id': 'x'},
+            {'match_ids': [match.id], 'max_overs': 'x'},
+            {'match_ids': [match.id], 'max_overs': 0},
+            {'match_ids': [match.id], 'max_overs': MatchViewSet.MAX_OVERS + 1},
+        ]
+        for data in cases:
+            with self.subTest(**data):
+                self.assertEqual(self.simulate_batch(**data).status_code, 400)
+        self.assertEqual(Match.objects.get(id=match.id).status, 'SCHEDULED')
+
+    def test_reports_each_match_outcome(self):
+        completes = self.new_match()
+        empty = Team.objects.create(name='Empty', tournament=self.tournament)
+        fails = self.new_match(self.teams[2], empty)
+
+        response = self.simulate_batch(match_ids=[completes.id, fails.id], max_overs=2)
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [(outcome['match_id'], outcome['status']) for outcome in body['matches']],
+            [(completes.id, 'COMPLETED'), (fails.id, 'FAILED')]
+        )
+        self.assertIn('balls_url', body['matches'][0]['result']['innings'][0])
+        self.assertIn('no players', body['matches'][1]['error'])
+        self.assertEqual((body['completed'], body['failed'], body['remaining']), (1, 1, 1))
+        self.assertEqual(Match.objects.get(id=fails.id).status, 'SCHEDULED')
+
+    def test_tournament_batch_is_capped(self):
+        for _ in range(3):
+            self.new_match()
+
+        with mock.patch.object(MatchViewSet, 'MAX_BATCH', 2):
+            body = self.simulate_batch(tournament_id=self.tournament.id, max_overs=1).json()
+
+        self.assertEqual((body['completed'], body['remaining']), (2, 1))
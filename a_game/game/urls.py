@@ -8,6 +8,11 @@ router.register(r'players', views.PlayerViewSet)
 router.register(r'matches', views.MatchViewSet)
 router.register(r'auctions', views.AuctionViewSet)
 router.register(r'bids', views.BidViewSet)
+router.register(r'ratings', views.RatingViewSet, basename='rating')
+router.register(r'leaderboard', views.LeaderboardViewSet, basename='leaderboard')
+router.register(r'profiles', views.ProfileViewSet, basename='profile')
+router.register(r'users', views.UserViewSet, basename='user')
+router.register(r'matchmaking', views.MatchmakingViewSet, basename='matchmaking')
 router.register(r'pitch-conditions', views.PitchConditionViewSet)
 router.register(r'weather-conditions', views.WeatherConditionViewSet)
 
@@ -2,11 +2,33 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.http import Http404
+from django.contrib.auth.models import User
+from django.urls import reverse
 from django.db.models import Q
 from .models import *
 from .serializers import *
 from .match_engine import MatchEngine
+from .enhanced_match_engine import EnhancedMatchEngine, SimulationConflict
+from .lineup_optimizer import LineupOptimizer
+from .team_strength import TeamStrengthCalculator
+from .rating_system import RatingReplay, StatisticsCalculator
+from .career_stats import CareerStatsCalculator
+from .leaderboard import Leaderboard
+from .rating_series import RatingSeries
+from .rating_projection import RatingProjection
+from .matchmaking import Matchmaker
+from .bidding import BiddingSystem
+from .player_valuation import PlayerValuator
+from .bid_archive import BidArchive
+
+class BallPagination(PageNumberPagination):
+    page_size = 60  # Ten overs of legal deliveries
+    page_size_query_param = 'page_size'
+    max_page_size = 300
 
 class TeamViewSet(viewsets.ModelViewSet):
     queryset = Team.objects.all()
@@ -24,16 +46,119 @@ class TeamViewSet(viewsets.ModelViewSet):
     def playing_eleven(self, request, pk=None):
         """Get the playing eleven for a team"""
         team = self.get_object()
-        players = team.players.filter(first_eleven=True)
-        if players.count() < 11:
-            # Add more players based on overall skill
-            additional_players = team.players.filter(first_eleven=False).order_by('-overall_skill')[:11-players.count()]
-            players = list(players) + list(additional_players)
-        elif players.count() > 11:
-            players = players.order_by('-overall_skill')[:11]
+        try:
+            players = EnhancedMatchEngine.select_playing_eleven(team)
+        except ValueError:
+            players = []
         
         serializer = PlayerSerializer(players, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def optimize_eleven(self, request, pk=None):
+        """Find the best playing eleven and batting order against an opponent"""
+        team = self.get_object()
+        opponent_id = request.query_params.get('opponent')
+        pitch_id = request.query_params.get('pitch_condition')
+        weather_id = request.query_params.get('weather_condition')
+        
+        if not opponent_id:
+            return Response(
+                {'error': 'opponent is required'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            opponent_id = int(opponent_id)
+            pitch_id = int(pitch_id) if pitch_id else None
+            weather_id = int(weather_id) if weather_id else None
+            max_overs = int(request.query_params.get('max_overs', 20))
+        except ValueError:
+            return Response(
+                {'error': 'opponent, pitch_condition, weather_condition and max_overs must be integers'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 1 <= max_overs <= MatchViewSet.MAX_OVERS:
+            return Response(
+                {'error': f'max_overs must be between 1 and {MatchViewSet.MAX_OVERS}'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            opponent = Team.objects.get(id=opponent_id)
+            pitch_condition = PitchCondition.objects.get(id=pitch_id) if pitch_id else None
+            weather_condition = WeatherCondition.objects.get(id=weather_id) if weather_id else None
+        except (Team.DoesNotExist, PitchCondition.DoesNotExist, WeatherCondition.DoesNotExist):
+            return Response(
+                {'error': 'Opponent or condition not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            optimizer = LineupOptimizer(team, opponent, pitch_condition, weather_condition, max_overs)
+            result = optimizer.optimize()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result['playing_eleven'] = PlayerSerializer(result['playing_eleven'], many=True).data
+        return Response(result)
+
+    @action(detail=True, methods=['get'])
+    def strength(self, request, pk=None):
+        """Get the cached strength vector for a team's playing eleven"""
+        team = self.get_object()
+        serializer = TeamStrengthSerializer(TeamStrengthCalculator.get(team))
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def preview(self, request, pk=None):
+        """Preview a fixture from both teams' cached strength vectors"""
+        team = self.get_object()
+        opponent_id = request.query_params.get('opponent')
+        
+        try:
+            opponent = Team.objects.get(id=opponent_id)
+        except (Team.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'Opponent not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        strength = TeamStrengthCalculator.get(team)
+        opponent_strength = TeamStrengthCalculator.get(opponent)
+        
+        return Response({
+            'team': TeamStrengthSerializer(strength).data,
+            'opponent': TeamStrengthSerializer(opponent_strength).data,
+            'team_batting': TeamStrengthCalculator.matchup(strength, opponent_strength),
+            'opponent_batting': TeamStrengthCalculator.matchup(opponent_strength, strength)
+        })
+
+    @action(detail=True, methods=['post', 'delete'])
+    def queue(self, request, pk=None):
+        """Queue a team for a rated friendly (POST) or take it out of the queue (DELETE)"""
+        team = self.get_object()
+        
+        if request.method == 'DELETE':
+            if not Matchmaker.cancel(team):
+                return Response(
+                    {'error': 'Team is not queued'}, 
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            return Response({'message': f'{team.name} left the matchmaking queue'})
+        
+        try:
+            ticket = Matchmaker.enqueue(team)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'ticket_id': ticket.id,
+            'team_id': team.id,
+            'rating': float(ticket.rating),
+            'enqueued_at': ticket.enqueued_at
+        }, status=status.HTTP_201_CREATED)
 
 class PlayerViewSet(viewsets.ModelViewSet):
     queryset = Player.objects.all().select_related(
@@ -67,6 +192,19 @@ class PlayerViewSet(viewsets.ModelViewSet):
         players = self.queryset.filter(team__isnull=True)
         serializer = PlayerSerializer(players, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def career(self, request, pk=None):
+        """Get a player's career statistics with a season breakdown"""
+        player = get_object_or_404(Player, pk=pk)
+        career, seasons = CareerStatsCalculator.for_player(player)
+        
+        return Response({
+            'player_id': player.id,
+            'player_name': player.name,
+            'career': CareerStatsCalculator.summary(career),
+            'seasons': [CareerStatsCalculator.summary(season) for season in seasons]
+        })
 
 class MatchViewSet(viewsets.ModelViewSet):
     queryset = Match.objects.all().select_related(
@@ -76,30 +214,162 @@ class MatchViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def simulate(self, request, pk=None):
-        """Simulate a match"""
+        """Simulate a match (resuming from its last checkpoint if interrupted)"""
         match = self.get_object()
         
-        if match.status != 'SCHEDULED':
+        if match.status not in ('SCHEDULED', 'IN_PROGRESS'):
             return Response(
-                {'error': 'Match must be in scheduled state to simulate'}, 
+                {'error': 'Match must be scheduled or in progress to simulate'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Get max overs from request (default 20)
-        max_overs = request.data.get('max_overs', 20)
+        try:
+            max_overs = int(request.data.get('max_overs', 20))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'max_overs must be an integer'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= max_overs <= self.MAX_OVERS:
+            return Response(
+                {'error': f'max_overs must be between 1 and {self.MAX_OVERS}'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        compact = str(request.data.get('compact', False)).lower() in ('true', '1')
         
         try:
-            # Initialize match engine and simulate
-            engine = MatchEngine(match)
-            result = engine.simulate_match(max_overs=max_overs)
+            # Compact results and resumed matches need the checkpointing engine
+            if compact or match.status == 'IN_PROGRESS':
+                engine = EnhancedMatchEngine(match)
+                result = engine.simulate_match(max_overs=max_overs, compact=compact)
+            else:
+                if not EnhancedMatchEngine.claim(match):
+                    raise SimulationConflict(f'Match {match.id} is already being simulated')
+                engine = MatchEngine(match)
+                result = engine.simulate_match(max_overs=max_overs)
+            
+            if compact:
+                self._add_balls_links(request, result)
             
             return Response(result)
+        except SimulationConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response(
                 {'error': f'Simulation failed: {str(e)}'}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    MAX_BATCH = 20  # Matches simulated per simulate_batch request
+    MAX_OVERS = 50
+    
+    @action(detail=False, methods=['post'])
+    def simulate_batch(self, request):
+        """
+        Simulate many matches (by id list or tournament) in one request.
+        Each match commits on its own, so the response lists every match's
+        outcome (COMPLETED with its result, or FAILED with the error) and
+        callers retry just the failures. At most MAX_BATCH matches run per
+        request; `remaining` counts the selected matches still left to
+        simulate.
+        """
+        match_ids = request.data.get('match_ids')
+        tournament_id = request.data.get('tournament_id')
+        
+        if not match_ids and not tournament_id:
+            return Response(
+                {'error': 'match_ids or tournament_id is required'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if match_ids and not (
+            isinstance(match_ids, list)
+            and all(isinstance(match_id, int) and not isinstance(match_id, bool) for match_id in match_ids)
+        ):
+            return Response(
+                {'error': 'match_ids must be a list of integers'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if match_ids and len(match_ids) > self.MAX_BATCH:
+            return Response(
+                {'error': f'At most {self.MAX_BATCH} matches can be simulated per request'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            tournament_id = int(tournament_id) if tournament_id else None
+            max_overs = int(request.data.get('max_overs', 20))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'tournament_id and max_overs must be integers'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= max_overs <= self.MAX_OVERS:
+            return Response(
+                {'error': f'max_overs must be between 1 and {self.MAX_OVERS}'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        matches = Match.objects.filter(
+            status__in=['SCHEDULED', 'IN_PROGRESS']
+        ).select_related('tournament', 'pitch_condition', 'weather_condition')
+        
+        if match_ids:
+            matches = matches.filter(id__in=match_ids)
+        if tournament_id:
+            matches = matches.filter(tournament_id=tournament_id)
+        
+        matches = matches.order_by('created_at', 'id')
+        outcomes = EnhancedMatchEngine.simulate_matches(list(matches[:self.MAX_BATCH]), max_overs=max_overs)
+        
+        for outcome in outcomes:
+            if outcome['status'] == 'COMPLETED':
+                self._add_balls_links(request, outcome['result'])
+        
+        completed = sum(outcome['status'] == 'COMPLETED' for outcome in outcomes)
+        return Response({
+            'matches': outcomes,
+            'completed': completed,
+            'failed': len(outcomes) - completed,
+            # Selected matches still to simulate: beyond the cap, or failed in this batch
+            'remaining': matches.count()
+        })
+    
+    def _add_balls_links(self, request, result):
+        """Attach ball-detail links to each innings of a compact result"""
+        balls_url = request.build_absolute_uri(
+            reverse('match-balls', kwargs={'pk': result['match_id']})
+        )
+        for innings in result['innings']:
+            innings['balls_url'] = f"{balls_url}?innings={innings['innings_type']}"
+    
+    @action(detail=True, methods=['get'])
+    def balls(self, request, pk=None):
+        """Get paginated ball-by-ball detail for a simulated match"""
+        match = self.get_object()
+        innings_type = request.query_params.get('innings', None)
+        from_over = request.query_params.get('from_over', None)
+        
+        balls = Ball.objects.filter(over__innings__match=match).select_related(
+            'over__innings', 'bowler', 'batsman', 'fielder'
+        ).order_by('over__innings__innings_type', 'over__over_number', 'ball_number')
+        
+        if innings_type:
+            balls = balls.filter(over__innings__innings_type=innings_type.upper())
+        if from_over:
+            try:
+                balls = balls.filter(over__over_number__gte=int(from_over))
+            except ValueError:
+                return Response(
+                    {'error': 'from_over must be an integer'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        paginator = BallPagination()
+        page = paginator.paginate_queryset(balls, request, view=self)
+        serializer = BallSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
     @action(detail=True, methods=['post'])
     def simulate_ball(self, request, pk=None):
         """Simulate a single ball"""
@@ -170,6 +440,7 @@ class AuctionViewSet(viewsets.ModelViewSet):
         try:
             player = Player.objects.get(id=player_id)
             auction.players_pool.add(player)
+            BiddingSystem.open_lots(auction, [player])
             return Response({'message': f'{player.name} added to auction pool'})
         except Player.DoesNotExist:
             return Response(
@@ -182,15 +453,70 @@ class AuctionViewSet(viewsets.ModelViewSet):
         """Get current bids for all players in auction"""
         auction = self.get_object()
         
-        # Get highest bid for each player
-        bids = Bid.objects.filter(auction=auction, status='ACTIVE').order_by('player', '-amount').distinct('player')
+        # Highest bid for each player, read from the auction's lots
+        bids = BiddingSystem.current_bids(auction)
         serializer = BidSerializer(bids, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Get every bid placed in the auction, including archived ones, oldest first"""
+        auction = self.get_object()
+        player_id = request.query_params.get('player', None)
+        
+        if player_id is not None:
+            try:
+                player_id = int(player_id)
+            except ValueError:
+                return Response(
+                    {'error': 'player must be an integer'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        history = BidArchive.history(auction, player_id)
+        page = self.paginate_queryset(history)
+        serializer = BidHistorySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def valuations(self, request, pk=None):
+        """Expected runs each player in the pool adds per match over a reference eleven"""
+        auction = self.get_object()
+        
+        try:
+            valuations = PlayerValuator.for_players(auction.players_pool.all())
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(PlayerValuationSerializer(valuations, many=True).data)
+    
+    @action(detail=True, methods=['post'])
+    def close(self, request, pk=None):
+        """Sell every remaining lot to its highest bid and complete the auction"""
+        auction = self.get_object()
+        
+        try:
+            summary = auction.close()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(summary)
 
 class BidViewSet(viewsets.ModelViewSet):
     queryset = Bid.objects.all().select_related('auction', 'player', 'team')
     serializer_class = BidSerializer
     
+    def retrieve(self, request, *args, **kwargs):
+        """Get a bid, falling back to the history table once it has been compacted"""
+        try:
+            bid = self.get_object()
+        except Http404:
+            bid = BidArchive.find(kwargs[self.lookup_field])
+            if bid is None:
+                raise
+        
+        return Response(self.get_serializer(bid).data)
+    
     def create(self, request, *args, **kwargs):
         """Create a new bid"""
         serializer = self.get_serializer(data=request.data)
@@ -201,71 +527,196 @@ class BidViewSet(viewsets.ModelViewSet):
         team = serializer.validated_data['team']
         amount = serializer.validated_data['amount']
         
-        # Check if team has enough budget
-        if team.money_left < amount:
-            return Response(
-                {'error': 'Insufficient budget'}, 
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        try:
+            bid = BiddingSystem.place_bid(auction, player, team, amount)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Check if bid is higher than current highest bid
-        current_highest = Bid.objects.filter(
-            auction=auction, player=player, status='ACTIVE'
-        ).order_by('-amount').first()
+        return Response(BidSerializer(bid).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def proxy(self, request):
+        """Bid automatically for a team up to max_amount"""
+        serializer = ProxyBidSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        if current_highest and amount <= current_highest.amount:
-            return Response(
-                {'error': f'Bid must be higher than current highest bid of ${current_highest.amount}'}, 
-                status=status.HTTP_400_BAD_REQUEST
+        try:
+            result = BiddingSystem.place_proxy_bid(
+                serializer.validated_data['auction'],
+                serializer.validated_data['player'],
+                serializer.validated_data['team'],
+                serializer.validated_data['max_amount']
             )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Mark previous bids as outbid
-        Bid.objects.filter(
-            auction=auction, player=player, status='ACTIVE'
-        ).update(status='OUTBID')
-        
-        # Create new bid
-        bid = serializer.save()
-        
-        return Response(BidSerializer(bid).data, status=status.HTTP_201_CREATED)
+        return Response({
+            'proxy': ProxyBidSerializer(result['proxy']).data,
+            'leading': result['leading'],
+            'highest_amount': result['highest_amount'],
+            'highest_bid': BidSerializer(result['highest_bid']).data if result['highest_bid'] else None
+        }, status=status.HTTP_201_CREATED)
     
     @action(detail=True, methods=['post'])
     def finalize(self, request, pk=None):
         """Finalize a bid (assign player to team)"""
         bid = self.get_object()
         
-        if bid.status != 'ACTIVE':
+        try:
+            player = BiddingSystem.finalize(bid)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'message': f'{player.name} sold to {bid.team.name} for ${bid.amount}',
+            'player': PlayerSerializer(player).data
+        })
+
+class RatingViewSet(viewsets.ViewSet):
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def recompute(self, request):
+        """Recompute all ratings by replaying completed matches"""
+        summary = RatingReplay.run()
+        return Response(summary)
+    
+    @action(detail=False, methods=['get'])
+    def projection(self, request):
+        """Rating change for each team's owner on beating or losing to every other team in a tournament"""
+        tournament_id = request.query_params.get('tournament')
+        if not tournament_id:
             return Response(
-                {'error': 'Only active bids can be finalized'}, 
+                {'error': 'tournament is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Assign player to team
-        player = bid.player
-        team = bid.team
-        amount = bid.amount
+        try:
+            tournament = Tournament.objects.get(id=tournament_id)
+        except (Tournament.DoesNotExist, ValueError):
+            return Response(
+                {'error': 'Tournament not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        performance = request.query_params.get('performance')
+        try:
+            performance = float(performance) if performance is not None else None
+        except ValueError:
+            return Response(
+                {'error': 'performance must be a number between 0 and 1'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        player.team = team
-        player.sold_price = amount
-        player.save()
+        return Response(RatingProjection.for_tournament(tournament, performance))
+
+class ProfileViewSet(viewsets.ViewSet):
+    
+    def retrieve(self, request, pk=None):
+        """Get a user's rating, results and career statistics"""
+        user = get_object_or_404(User.objects.select_related('cricket_profile'), pk=pk)
+        if not hasattr(user, 'cricket_profile'):
+            return Response(
+                {'error': 'User has no cricket profile'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        return Response({
+            'user_id': user.id,
+            'username': user.username,
+            **StatisticsCalculator.get_career_stats(user)
+        })
+
+class MatchmakingViewSet(viewsets.ViewSet):
+    
+    def list(self, request):
+        """Queue depth and wait times; ?since= sets the window in seconds for matched teams"""
+        try:
+            since = int(request.query_params.get('since', 3600))
+        except ValueError:
+            return Response(
+                {'error': 'since must be an integer'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(Matchmaker.metrics(since))
+    
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def run(self, request):
+        """Run one matchmaking pass now"""
+        return Response(Matchmaker.run())
+
+class UserViewSet(viewsets.ViewSet):
+    
+    @action(detail=True, methods=['get'])
+    def rating_history(self, request, pk=None):
+        """Get a user's rating over time, downsampled to ?points= points"""
+        user = get_object_or_404(User, pk=pk)
+        try:
+            points = int(request.query_params.get('points', RatingSeries.DEFAULT_POINTS))
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'points must be an integer'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Update team budget
-        team.money_left -= amount
-        team.save()
+        return Response(RatingSeries.get(user.id, points))
+
+class LeaderboardViewSet(viewsets.ViewSet):
+    """Leaderboard pages and user positions, served from the rating index"""
+    
+    def _int_param(self, request, name, default):
+        value = request.query_params.get(name, default)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be an integer')
+    
+    def _position_response(self, request, user_id):
+        try:
+            around = self._int_param(request, 'around', 5)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update bid status
-        bid.status = 'WON'
-        bid.save()
+        position = Leaderboard.position(user_id, around)
+        if position is None:
+            return Response(
+                {'error': 'User is not on the leaderboard'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-        # Mark other bids for this player as outbid
-        Bid.objects.filter(
-            auction=bid.auction, player=player
-        ).exclude(id=bid.id).update(status='OUTBID')
+        return Response({
+            **LeaderboardEntrySerializer(position['entry']).data,
+            'total': position['total'],
+            'percentile': position['percentile'],
+            'neighbours': LeaderboardEntrySerializer(position['neighbours'], many=True).data
+        })
+    
+    def list(self, request):
+        """Get a page of the leaderboard (?page=&page_size=)"""
+        try:
+            page = self._int_param(request, 'page', 1)
+            page_size = self._int_param(request, 'page_size', 20)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
+        entries = Leaderboard.page(page, page_size)
         return Response({
-            'message': f'{player.name} sold to {team.name} for ${amount}',
-            'player': PlayerSerializer(player).data
+            'count': Leaderboard.total(),
+            'page': page,
+            'results': LeaderboardEntrySerializer(entries, many=True).data
         })
+    
+    def retrieve(self, request, pk=None):
+        """Get a user's rank, percentile and neighbours (?around=)"""
+        try:
+            user_id = int(pk)
+        except ValueError:
+            return Response({'error': 'Invalid user id'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._position_response(request, user_id)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def me(self, request):
+        """Get the requesting user's rank, percentile and neighbours (?around=)"""
+        return self._position_response(request, request.user.id)
 
 class PitchConditionViewSet(viewsets.ModelViewSet):
     queryset = PitchCondition.objects.all()